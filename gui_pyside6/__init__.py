@@ -2,28 +2,136 @@
 
 from __future__ import annotations
 
+import atexit
+import itertools
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 
 LOG_ENABLED = os.getenv("CODEX_GUI_LOGGING", "1") != "0"
 
+# Per-subsystem levels, e.g. "output=WARNING,backend=DEBUG"
+LOG_LEVELS = os.getenv("CODEX_GUI_LOG_LEVELS", "")
+# Only every Nth INFO record of these subsystems is written to the log file,
+# e.g. "output=10"; the Debug Console still shows all of them
+LOG_SAMPLING = os.getenv("CODEX_GUI_LOG_SAMPLING", "output=10")
+
 logger = logging.getLogger("gui_pyside6")
 logger.setLevel(logging.INFO)
 
+# Fields callers may attach with ``extra=`` that end up in the JSON records
+_CONTEXT_FIELDS = ("session", "agent", "elapsed")
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Return the logger of a subsystem such as ``"output"`` or ``"backend"``."""
+    return logger.getChild(subsystem)
+
+
+def _parse_pairs(spec: str) -> dict[str, str]:
+    pairs = {}
+    for part in spec.split(","):
+        name, sep, value = part.partition("=")
+        if sep and name.strip() and value.strip():
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 3),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created)),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for name in _CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                data[name] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Let through every Nth INFO record of the configured loggers.
+
+    Warnings and errors always pass, as do records of other loggers.
+    """
+
+    def __init__(self, rates: dict[str, int]) -> None:
+        super().__init__()
+        self.rates = {name: rate for name, rate in rates.items() if rate > 1}
+        self._counters = {name: itertools.count() for name in self.rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.name)
+        if rate is None or record.levelno > logging.INFO:
+            return True
+        return next(self._counters[record.name]) % rate == 0
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Queue records with as little work as possible on the calling thread.
+
+    ``QueueHandler.prepare`` formats and copies every record. Here a copy is
+    only made to merge ``%`` arguments and exception details, which may not
+    survive the trip to another thread; JSON formatting happens in the
+    listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args or record.exc_info:
+            record = logging.makeLogRecord(record.__dict__)
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+        return record
+
+
+for _name, _level in _parse_pairs(LOG_LEVELS).items():
+    try:
+        get_logger(_name).setLevel(_level.upper())
+    except ValueError:
+        pass
+
+listener: QueueListener | None = None
+
 if LOG_ENABLED:
     log_dir = Path(__file__).resolve().parent / "logs"
     log_dir.mkdir(exist_ok=True)
     file_handler = RotatingFileHandler(
-        log_dir / "gui.log", maxBytes=1_000_000, backupCount=3
-    )
-    file_handler.setFormatter(
-        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        log_dir / "gui.log", maxBytes=1_000_000, backupCount=3, encoding="utf-8"
     )
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(JsonFormatter())
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _NonBlockingQueueHandler(log_queue)
+    _rates = {}
+    for _name, _rate in _parse_pairs(LOG_SAMPLING).items():
+        try:
+            _rates[get_logger(_name).name] = int(_rate)
+        except ValueError:
+            pass
+    queue_handler.addFilter(SamplingFilter(_rates))
+    logger.addHandler(queue_handler)
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    # Write out what is still queued when the application exits
+    atexit.register(listener.stop)
 else:
     logger.addHandler(logging.NullHandler())
 
-__all__ = ["logger"]
+__all__ = ["logger", "get_logger"]
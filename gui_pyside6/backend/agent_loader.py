@@ -1,4 +1,8 @@
+from __future__ import annotations
+
 import json
+import os
+import threading
 from pathlib import Path
 
 # Resolve the agents directory relative to this module so the GUI can be run
@@ -6,15 +10,91 @@ from pathlib import Path
 AGENTS_DIR = (
     Path(__file__).resolve().parent.parent / "resources" / "agents"
 )
+# User presets live next to the other user configuration files
+USER_AGENTS_DIR = Path(__file__).resolve().parent.parent / "config" / "agents"
 
-def load_agents() -> list[dict]:
-    agents = []
-    for file in AGENTS_DIR.glob("*.json"):
-        with file.open("r", encoding="utf-8") as f:
+# Parsed agents shared by every AgentManager: path -> ((mtime_ns, size), agent)
+_cache: dict[str, tuple[tuple[int, int], dict]] = {}
+_cache_lock = threading.Lock()
+
+
+def _parse_agent(path: str) -> dict | None:
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Failed to parse agent: {os.path.basename(path)}")
+            return None
+    if not isinstance(data, dict):
+        return None
+    data["_path"] = path
+    return data
+
+
+def scan_agents(directories: list[Path] | None = None) -> list[dict]:
+    """Return the agents stored in ``directories``.
+
+    Files are only re-parsed when their modification time or size changed
+    since the previous scan; unchanged files reuse the cached dictionaries.
+    Agents are ordered by directory, then by file name.
+    """
+    if directories is None:
+        directories = [AGENTS_DIR, USER_AGENTS_DIR]
+    agents: list[dict] = []
+    seen: set[str] = set()
+    for directory in directories:
+        try:
+            entries = sorted(
+                (e for e in os.scandir(directory) if e.name.endswith(".json")),
+                key=lambda e: e.name,
+            )
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            path = str(Path(entry.path))
+            seen.add(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            with _cache_lock:
+                cached = _cache.get(path)
+            if cached is not None and cached[0] == stamp:
+                agents.append(cached[1])
+                continue
             try:
-                data = json.load(f)
-                data["_path"] = str(file)
-                agents.append(data)
-            except json.JSONDecodeError:
-                print(f"Failed to parse agent: {file.name}")
+                data = _parse_agent(path)
+            except OSError:
+                continue
+            if data is None:
+                continue
+            with _cache_lock:
+                _cache[path] = (stamp, data)
+            agents.append(data)
+    with _cache_lock:
+        scanned = {str(Path(d)) for d in directories}
+        for path in list(_cache):
+            if path not in seen and str(Path(path).parent) in scanned:
+                del _cache[path]
     return agents
+
+
+def remember_agent(path: Path, agent: dict) -> None:
+    """Record ``agent`` as the current content of ``path`` after a write."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return
+    with _cache_lock:
+        _cache[str(path)] = ((stat.st_mtime_ns, stat.st_size), agent)
+
+
+def forget_agent(path: Path) -> None:
+    """Drop ``path`` from the parse cache."""
+    with _cache_lock:
+        _cache.pop(str(path), None)
+
+
+def load_agents() -> list[dict]:
+    return scan_agents()
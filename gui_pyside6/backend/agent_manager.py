@@ -3,15 +3,43 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-from .agent_loader import load_agents, AGENTS_DIR
+from .agent_loader import (
+    AGENTS_DIR,
+    USER_AGENTS_DIR,
+    forget_agent,
+    remember_agent,
+    scan_agents,
+)
 
 
 class AgentManager:
-    """Manage available agents and the active selection."""
+    """Manage available agents and the active selection.
 
-    def __init__(self) -> None:
-        self._agents: list[dict] = load_agents()
-        self._active_index: int = 0 if self._agents else -1
+    Agents are indexed by name for constant-time lookups. :meth:`reload`
+    rescans the agent directories but only re-parses files whose modification
+    time changed, and the save/rename/delete helpers update the index in place
+    instead of rescanning.
+    """
+
+    def __init__(self, directories: list[Path] | None = None) -> None:
+        self.directories: list[Path] = (
+            list(directories) if directories is not None
+            else [AGENTS_DIR, USER_AGENTS_DIR]
+        )
+        self._agents: list[dict] = []
+        self._by_name: dict[str, dict] = {}
+        self._by_path: dict[str, dict] = {}
+        self._active: dict | None = None
+        self._set_agents(scan_agents(self.directories))
+        self._active = self._agents[0] if self._agents else None
+
+    def _set_agents(self, agents: list[dict]) -> None:
+        self._agents = agents
+        self._by_path = {str(Path(a["_path"])): a for a in agents if "_path" in a}
+        self._by_name = {}
+        for agent in agents:
+            # Keep the first agent for duplicate names, matching list order
+            self._by_name.setdefault(agent.get("name", ""), agent)
 
     def is_default(self, agent: dict) -> bool:
         """Return ``True`` if the agent comes from the bundled presets."""
@@ -31,42 +59,80 @@ class AgentManager:
     @property
     def active_agent(self) -> dict | None:
         """Return the currently active agent dictionary, if any."""
-        if 0 <= self._active_index < len(self._agents):
-            return self._agents[self._active_index]
-        return None
+        return self._active
+
+    def get_agent(self, name: str) -> dict | None:
+        """Return the agent called ``name``, if loaded."""
+        return self._by_name.get(name)
 
     def set_active_agent(self, name: str) -> bool:
         """Set the active agent by its ``name``. Returns ``True`` if found."""
-        for idx, agent in enumerate(self._agents):
-            if agent.get("name") == name:
-                self._active_index = idx
-                return True
-        return False
+        agent = self._by_name.get(name)
+        if agent is None:
+            return False
+        self._active = agent
+        return True
 
     def reload(self) -> None:
         """Reload agents from disk, keeping the previous active agent if possible."""
-        previous = self.active_agent.get("name") if self.active_agent else None
-        self._agents = load_agents()
-        self._active_index = 0 if self._agents else -1
+        previous = self._active.get("name") if self._active else None
+        self._set_agents(scan_agents(self.directories))
+        self._active = self._agents[0] if self._agents else None
         if previous:
             self.set_active_agent(previous)
 
+    def _update_index(self, previous_path: str | None, agent: dict) -> None:
+        """Insert or replace ``agent`` without rescanning the directories."""
+        previous = self._by_path.get(previous_path) if previous_path else None
+        agents = [a for a in self._agents if a is not previous]
+        new_path = str(Path(agent["_path"]))
+        existing = self._by_path.get(new_path)
+        if existing is not None and existing is not previous:
+            agents = [a for a in agents if a is not existing]
+        in_dirs = any(
+            Path(new_path).parent == Path(d) for d in self.directories
+        )
+        if in_dirs:
+            agents.append(agent)
+            agents.sort(key=self._sort_key)
+        was_active = self._active is previous or self._active is existing
+        self._set_agents(agents)
+        if was_active:
+            self._active = agent if in_dirs else (agents[0] if agents else None)
+
+    def _sort_key(self, agent: dict) -> tuple[int, str]:
+        path = Path(agent.get("_path", ""))
+        for idx, directory in enumerate(self.directories):
+            if path.parent == Path(directory):
+                return idx, path.name
+        return len(self.directories), path.name
+
     def save_agent(self, agent: dict, path: Path | None = None) -> Path:
         """Save ``agent`` to ``path`` or its existing location."""
+        previous_path = agent.get("_path")
         save_path = Path(path or agent.get("_path", ""))
         data = {k: v for k, v in agent.items() if k != "_path"}
+        save_path.parent.mkdir(parents=True, exist_ok=True)
         save_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
         agent["_path"] = str(save_path)
-        self.reload()
+        remember_agent(save_path, agent)
+        self._update_index(
+            str(Path(previous_path)) if previous_path else None, agent
+        )
         return save_path
 
     def rename_agent(self, agent: dict, new_path: Path) -> Path:
         """Rename the agent file to ``new_path``."""
         old = Path(agent.get("_path", ""))
         new = new_path.with_suffix(".json")
+        # Callers may pass only the path; keep the stored fields
+        loaded = self._by_path.get(str(old))
+        if loaded is not None and loaded is not agent:
+            agent = {**loaded, **agent}
         old.rename(new)
-        agent["_path"] = str(new)
+        forget_agent(old)
         agent["name"] = new.stem.replace("_", " ").title()
+        # save_agent replaces the index entry of the old path with the new one
         self.save_agent(agent, new)
         return new
 
@@ -75,4 +141,9 @@ class AgentManager:
         path = Path(agent.get("_path", ""))
         if path.exists():
             path.unlink()
-        self.reload()
+        forget_agent(path)
+        stale = self._by_path.get(str(path))
+        if stale is not None:
+            self._set_agents([a for a in self._agents if a is not stale])
+            if self._active is stale:
+                self._active = self._agents[0] if self._agents else None
@@ -2,18 +2,67 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import re
 import subprocess
 import sys
+import sysconfig
+import threading
+import time
 import venv
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from importlib import metadata
 from pathlib import Path
 
+from .atomic_write import write_json_atomic
+
 
 _REQUIREMENTS_PATH = Path(__file__).resolve().parent / "backend_requirements.json"
+_HYBRID_DIR = Path.home() / ".hybrid_tts"
+# Shared environment used for backends that are not declared ``isolated``
+_SHARED_VENV_DIR = _HYBRID_DIR / "venv"
+# Parent directory of the per-backend environments
+VENVS_DIR = _HYBRID_DIR / "venvs"
+# Wheels built or downloaded once and reused by every backend environment
+WHEEL_CACHE_DIR = _HYBRID_DIR / "wheels"
+# Records which requirement sets were installed into which interpreter, and
+# the site-packages mtime at that point, so later processes can skip both pip
+# and the metadata check while the environment is unchanged.
+_LEDGER_PATH = _HYBRID_DIR / "installed.json"
+
+# Ledger keys verified during this process; avoids re-reading the ledger and
+# re-checking package metadata on every button press.
+_verified: set[str] = set()
+
+_NAME_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+# Serialise work on the same environment across the provisioning pool and
+# on-demand callers.
+_env_locks: dict[str, threading.Lock] = {}
+_env_locks_guard = threading.Lock()
+_ledger_lock = threading.Lock()
+
+_executor: ThreadPoolExecutor | None = None
+_provisioning: dict[str, Future] = {}
+# Running pip processes, terminated by shutdown_provisioning()
+_pip_processes: set[subprocess.Popen] = set()
+_pip_lock = threading.Lock()
+_shutting_down = threading.Event()
 
 
-def _load_requirements() -> dict[str, list[str]]:
+@dataclass(frozen=True)
+class BackendSpec:
+    """Requirements declared for a backend in ``backend_requirements.json``."""
+
+    name: str
+    packages: list[str] = field(default_factory=list)
+    isolated: bool = False
+
+
+def _load_requirements() -> dict[str, list[str] | dict]:
     if not _REQUIREMENTS_PATH.exists():
         return {}
     try:
@@ -24,31 +73,338 @@ def _load_requirements() -> dict[str, list[str]]:
         return {}
 
 
+def load_backend_specs() -> dict[str, BackendSpec]:
+    """Return backend specs keyed by name.
+
+    Entries are either a plain list of requirements, installed into the shared
+    environment, or an object ``{"packages": [...], "isolated": true}`` which
+    gets its own virtual environment under :data:`VENVS_DIR`.
+    """
+    specs: dict[str, BackendSpec] = {}
+    for name, entry in _load_requirements().items():
+        if isinstance(entry, dict):
+            packages = list(entry.get("packages", []))
+            isolated = bool(entry.get("isolated", False))
+        else:
+            packages = list(entry or [])
+            isolated = False
+        specs[name] = BackendSpec(name, packages, isolated)
+    return specs
+
+
+def _python_in(env_dir: Path) -> Path:
+    return env_dir / ("Scripts" if os.name == "nt" else "bin") / "python"
+
+
+def _env_lock(env_dir: Path) -> threading.Lock:
+    with _env_locks_guard:
+        return _env_locks.setdefault(str(env_dir), threading.Lock())
+
+
 def _ensure_venv(path: Path) -> Path:
     """Create a virtual environment at the given path if it doesn't exist."""
-    python_path = path / ("Scripts" if os.name == "nt" else "bin") / "python"
+    python_path = _python_in(path)
     if not python_path.exists():
-        builder = venv.EnvBuilder(with_pip=True)
+        builder = venv.EnvBuilder(with_pip=True, symlinks=os.name != "nt")
         builder.create(path)
     return python_path
 
 
-def ensure_backend_installed(backend_name: str) -> None:
-    """Install optional packages for the given backend if needed."""
-    requirements = _load_requirements()
-    packages = requirements.get(backend_name)
-    if not packages:
-        return
+def backend_env_dir(spec: BackendSpec) -> Path | None:
+    """Return the environment directory used by ``spec``.
 
+    ``None`` means the interpreter running the GUI is used directly.
+    """
+    if spec.isolated:
+        return VENVS_DIR / spec.name
     if sys.prefix != sys.base_prefix:
-        python = Path(sys.executable)
+        return None
+    return _SHARED_VENV_DIR
+
+
+def backend_python(backend_name: str) -> Path:
+    """Return the interpreter that runs code for ``backend_name``.
+
+    The environment is not created; use :func:`ensure_backend_installed`.
+    """
+    spec = load_backend_specs().get(backend_name)
+    env_dir = backend_env_dir(spec) if spec else None
+    return _python_in(env_dir) if env_dir else Path(sys.executable)
+
+
+def _load_ledger() -> dict[str, dict]:
+    if not _LEDGER_PATH.exists():
+        return {}
+    try:
+        with _LEDGER_PATH.open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else {}
+    except Exception:  # pylint: disable=broad-except
+        return {}
+
+
+def _save_ledger(ledger: dict[str, dict]) -> None:
+    try:
+        write_json_atomic(_LEDGER_PATH, ledger)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"Failed to write {_LEDGER_PATH}: {exc}")
+
+
+def _requirements_hash(packages: list[str]) -> str:
+    """Return a stable hash for a requirement list."""
+    normalized = "\n".join(sorted(p.strip() for p in packages))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _ledger_key(backend_name: str, packages: list[str], python: Path) -> str:
+    return f"{backend_name}|{_requirements_hash(packages)}|{python}"
+
+
+def _site_packages(python: Path) -> list[str]:
+    """Return the site-packages directories belonging to ``python``'s venv."""
+    env_root = python.parent.parent
+    if os.name == "nt":
+        candidates = [env_root / "Lib" / "site-packages"]
     else:
-        venv_dir = Path.home() / ".hybrid_tts" / "venv"
-        python = _ensure_venv(venv_dir)
+        candidates = sorted((env_root / "lib").glob("python*/site-packages"))
+    return [str(p) for p in candidates if p.is_dir()]
+
+
+def _site_mtime(python: Path) -> float | None:
+    """Return the newest mtime of ``python``'s site-packages directories.
+
+    Installing or removing a distribution adds or removes entries in these
+    directories, which changes their mtime.
+    """
+    if _is_current_interpreter(python):
+        paths = {sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"]}
+    else:
+        paths = set(_site_packages(python))
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            pass
+    return max(mtimes) if mtimes else None
+
 
-    cmd = [str(python), "-m", "pip", "install", *packages]
+def _ledger_valid(key: str, python: Path) -> bool:
+    """Return ``True`` if the ledger entry for ``key`` still describes ``python``."""
+    entry = _load_ledger().get(key)
+    if not entry or not python.exists():
+        return False
+    recorded = entry.get("site_mtime")
+    return recorded is not None and recorded == _site_mtime(python)
+
+
+def _is_current_interpreter(python: Path) -> bool:
+    # Compare environment roots rather than executables: a venv's python is
+    # usually a symlink to the base interpreter.
+    try:
+        return python.parent.parent.resolve() == Path(sys.prefix).resolve()
+    except OSError:
+        return False
+
+
+def _requirement_satisfied(requirement: str, search_path: list[str] | None) -> bool:
+    """Return ``True`` if ``requirement`` is installed in ``search_path``."""
     try:
-        subprocess.check_call(cmd)
-    except subprocess.CalledProcessError as exc:
-        print(f"Failed to install packages for {backend_name}: {exc}")
+        from packaging.requirements import Requirement  # type: ignore
+    except Exception:  # pylint: disable=broad-except
+        Requirement = None  # type: ignore[assignment]
+
+    if Requirement is not None:
+        try:
+            req = Requirement(requirement)
+        except Exception:  # pylint: disable=broad-except
+            return False
+        name, specifier = req.name, req.specifier
+    else:
+        match = _NAME_RE.match(requirement)
+        if not match:
+            return False
+        name, specifier = match.group(1), None
+
+    dists = metadata.distributions(name=name, path=search_path or sys.path)
+    for dist in dists:
+        if specifier is None or specifier.contains(dist.version, prereleases=True):
+            return True
+    return False
+
+
+def requirements_satisfied(packages: list[str], python: Path) -> bool:
+    """Check installed package metadata for ``python`` without running pip."""
+    search_path = None if _is_current_interpreter(python) else _site_packages(python)
+    if search_path == []:
+        return False
+    return all(_requirement_satisfied(req, search_path) for req in packages)
+
+
+def _record_install(
+    key: str,
+    backend_name: str,
+    packages: list[str],
+    python: Path,
+) -> None:
+    _verified.add(key)
+    with _ledger_lock:
+        ledger = _load_ledger()
+        ledger[key] = {
+            "backend": backend_name,
+            "python": str(python),
+            "requirements": packages,
+            "installed_at": time.time(),
+            "site_mtime": _site_mtime(python),
+        }
+        _save_ledger(ledger)
+
+
+def _run_pip(cmd: list[str]) -> None:
+    """Run ``cmd`` like :func:`subprocess.check_call`, tracking the process.
+
+    Nothing is started once :func:`shutdown_provisioning` has been called.
+    """
+    with _pip_lock:
+        if _shutting_down.is_set():
+            raise subprocess.CalledProcessError(-1, cmd)
+        process = subprocess.Popen(cmd)
+        _pip_processes.add(process)
+    try:
+        return_code = process.wait()
+    finally:
+        with _pip_lock:
+            _pip_processes.discard(process)
+    if return_code:
+        raise subprocess.CalledProcessError(return_code, cmd)
+
+
+def _pip_install(python: Path, packages: list[str], force: bool) -> None:
+    """Install ``packages`` into ``python`` through the shared wheel cache.
+
+    Wheels are first collected into :data:`WHEEL_CACHE_DIR` so that other
+    backend environments needing the same distributions install them from
+    disk. If that step fails, a regular index install is attempted.
+    """
+    WHEEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache = str(WHEEL_CACHE_DIR)
+    install = [str(python), "-m", "pip", "install"]
+    if force:
+        install.append("--force-reinstall")
+    try:
+        _run_pip(
+            [str(python), "-m", "pip", "wheel", "--wheel-dir", cache,
+             "--find-links", cache, *packages]
+        )
+        _run_pip([*install, "--no-index", "--find-links", cache, *packages])
+    except subprocess.CalledProcessError:
+        _run_pip([*install, "--find-links", cache, *packages])
+
+
+def _install_backend(spec: BackendSpec, force: bool = False) -> Path | None:
+    env_dir = backend_env_dir(spec)
+    lock = _env_lock(env_dir or Path(sys.prefix))
+    with lock:
+        if env_dir is None:
+            python = Path(sys.executable)
+        else:
+            python = _ensure_venv(env_dir)
+
+        key = _ledger_key(spec.name, spec.packages, python)
+        if not force:
+            if key in _verified:
+                return python
+            if _ledger_valid(key, python):
+                _verified.add(key)
+                return python
+            if requirements_satisfied(spec.packages, python):
+                # Refresh the entry so later processes can trust the ledger
+                _record_install(key, spec.name, spec.packages, python)
+                return python
+
+        try:
+            _pip_install(python, spec.packages, force)
+        except subprocess.CalledProcessError as exc:
+            print(f"Failed to install packages for {spec.name}: {exc}")
+            return None
+
+        _record_install(key, spec.name, spec.packages, python)
+        return python
+
+
+def ensure_backend_installed(backend_name: str, force: bool = False) -> Path | None:
+    """Install optional packages for the given backend if needed.
+
+    Installs are recorded in a ledger keyed by backend name, requirement hash
+    and interpreter path. A ledger entry whose interpreter still exists and
+    whose site-packages are unchanged skips every check; otherwise pip is
+    skipped whenever the installed package metadata already satisfies every
+    requirement. Pass ``force=True`` to
+    reinstall regardless.
+
+    Returns the interpreter that has the backend installed, or ``None`` if the
+    backend is unknown or installation failed.
+    """
+    spec = load_backend_specs().get(backend_name)
+    if not spec or not spec.packages:
+        return None
+
+    pending = _provisioning.get(backend_name)
+    if pending is not None and not force:
+        # A background provisioning job is already working on this backend
+        try:
+            return pending.result()
+        except CancelledError:
+            return None
+    return _install_backend(spec, force)
+
+
+def provision_backends(
+    names: list[str] | None = None, max_workers: int = 4
+) -> dict[str, Future]:
+    """Create backend environments in parallel on background threads.
+
+    ``names`` defaults to every backend declared ``isolated``. Returns a
+    future per backend resolving to the same value as
+    :func:`ensure_backend_installed`. Backends already being provisioned
+    reuse their running job.
+    """
+    global _executor
+    specs = load_backend_specs()
+    if names is None:
+        names = [name for name, spec in specs.items() if spec.isolated]
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="backend-provision"
+        )
+
+    futures: dict[str, Future] = {}
+    for name in names:
+        spec = specs.get(name)
+        if not spec or not spec.packages:
+            continue
+        future = _provisioning.get(name)
+        if future is None:
+            future = _executor.submit(_install_backend, spec)
+            _provisioning[name] = future
+            future.add_done_callback(lambda _f, n=name: _provisioning.pop(n, None))
+        futures[name] = future
+    return futures
+
+
+def shutdown_provisioning() -> None:
+    """Cancel queued provisioning jobs and terminate running pip processes.
 
+    The executor's threads are joined at interpreter exit, so without this
+    closing the GUI would wait for a running install to finish.
+    """
+    global _executor
+    _shutting_down.set()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    with _pip_lock:
+        processes = list(_pip_processes)
+    for process in processes:
+        process.terminate()
@@ -0,0 +1,403 @@
+"""Run many prompts through the Codex CLI with bounded concurrency.
+
+Items come from a CSV or JSONL file, or from a file glob combined with a
+prompt template. Results are appended to a JSONL file as soon as each item
+finishes, so long runs can be monitored. With ``resume`` (``--resume``),
+items whose id already has an ``ok`` result in that file are skipped, so an
+interrupted run can be continued.
+
+Usage::
+
+    python -m gui_pyside6.backend.batch_runner prompts.jsonl -o results.jsonl
+    python -m gui_pyside6.backend.batch_runner "src/**/*.py" \\
+        --prompt "Add type hints to {path}" --concurrency 4
+    python -m gui_pyside6.backend.batch_runner prompts.jsonl -o results.jsonl --resume
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .codex_adapter import CodexError, CodexSession, build_command
+
+
+@dataclass
+class BatchItem:
+    """One prompt to run."""
+
+    id: str
+    prompt: str
+    files: list[str] = field(default_factory=list)
+    images: list[str] = field(default_factory=list)
+    cwd: str | None = None
+    # Name of the agent to use instead of the batch default
+    agent: str | None = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a :class:`BatchItem`."""
+
+    id: str
+    prompt: str
+    status: str  # "ok", "error", "timeout" or "cancelled"
+    attempts: int
+    started_at: float
+    duration: float
+    output: list[str] = field(default_factory=list)
+    error: str | None = None
+    return_code: int | None = None
+    # CPU time and peak memory of the last attempt, see ProcessUsage
+    usage: dict | None = None
+
+
+def _split_paths(value) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v]
+    return [p.strip() for p in str(value).split(";") if p.strip()]
+
+
+def _item_from_mapping(data: dict, index: int) -> BatchItem:
+    prompt = str(data.get("prompt", "")).strip()
+    if not prompt:
+        raise ValueError(f"Item {index} has no prompt")
+    return BatchItem(
+        id=str(data.get("id") or index),
+        prompt=prompt,
+        files=_split_paths(data.get("files")),
+        images=_split_paths(data.get("images")),
+        cwd=data.get("cwd") or None,
+        agent=data.get("agent") or None,
+    )
+
+
+def load_items(source: str | Path, prompt: str | None = None) -> list[BatchItem]:
+    """Load batch items from ``source``.
+
+    ``.csv`` files need a ``prompt`` column and ``.jsonl`` files an object per
+    line with a ``prompt`` key; ``id``, ``files``, ``images`` (lists, or
+    ``;``-separated in CSV), ``cwd`` and ``agent`` are optional. Any other
+    ``source`` is treated as a glob pattern: every matching file becomes an
+    item whose prompt is ``prompt`` formatted with ``{path}`` and which
+    attaches that file.
+    """
+    path = Path(source)
+    suffix = path.suffix.lower()
+    if suffix == ".csv" and path.is_file():
+        with path.open("r", encoding="utf-8", newline="") as fh:
+            return [
+                _item_from_mapping(row, i)
+                for i, row in enumerate(csv.DictReader(fh), start=1)
+            ]
+    if suffix in {".jsonl", ".ndjson"} and path.is_file():
+        items = []
+        with path.open("r", encoding="utf-8") as fh:
+            for i, line in enumerate(fh, start=1):
+                if line.strip():
+                    items.append(_item_from_mapping(json.loads(line), i))
+        return items
+
+    if not prompt:
+        raise ValueError("A prompt template is required for file globs")
+    matches = sorted(glob.glob(str(source), recursive=True))
+    return [
+        BatchItem(id=match, prompt=prompt.format(path=match), files=[match])
+        for match in matches
+        if Path(match).is_file()
+    ]
+
+
+def completed_ids(path: str | Path) -> set[str]:
+    """Return the ids of items with an ``ok`` result in the JSONL ``path``.
+
+    Lines that cannot be parsed, such as one cut short by a crash, are
+    ignored.
+    """
+    done: set[str] = set()
+    try:
+        with Path(path).open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and record.get("status") == "ok":
+                    done.add(str(record.get("id")))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class BatchRunner:
+    """Run :class:`BatchItem` objects on a thread pool.
+
+    Each item gets its own :class:`CodexSession`. Failed attempts are retried
+    up to ``retries`` times with exponential backoff starting at ``backoff``
+    seconds, and an attempt running longer than ``timeout`` seconds is
+    stopped. Every result is appended to ``output_path`` (JSONL) and passed to
+    ``on_result`` as soon as it is known. With ``resume``, items that already
+    succeeded according to ``output_path`` are skipped and counted in
+    :attr:`skipped`.
+    """
+
+    def __init__(
+        self,
+        agent: dict,
+        settings: dict,
+        *,
+        agents: dict[str, dict] | None = None,
+        concurrency: int = 4,
+        retries: int = 2,
+        backoff: float = 2.0,
+        timeout: float | None = 600.0,
+        output_path: str | Path | None = None,
+        on_result: Callable[[BatchResult], None] | None = None,
+        resume: bool = False,
+    ) -> None:
+        self.agent = agent
+        self.settings = settings
+        self.agents = agents or {}
+        self.concurrency = max(1, int(concurrency))
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.timeout = timeout
+        self.output_path = Path(output_path) if output_path else None
+        self.on_result = on_result
+        self.resume = resume
+        self.skipped = 0
+        self._cancelled = threading.Event()
+        self._sessions: set[CodexSession] = set()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def cancel(self) -> None:
+        """Stop running items and skip the ones not started yet."""
+        self._cancelled.set()
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            session.stop()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self, items: Iterable[BatchItem]) -> list[BatchResult]:
+        """Run ``items`` and return their results in completion order."""
+        items = list(items)
+        if self.resume and self.output_path is not None:
+            done = completed_ids(self.output_path)
+            remaining = [item for item in items if item.id not in done]
+            self.skipped = len(items) - len(remaining)
+            items = remaining
+        results: list[BatchResult] = []
+        if self.output_path is not None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._end_partial_line()
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="codex-batch"
+        ) as pool:
+            futures = [pool.submit(self._run_item, item) for item in items]
+            try:
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    self._emit(result)
+            except BaseException:
+                self.cancel()
+                raise
+        return results
+
+    def _end_partial_line(self) -> None:
+        # A run that was killed mid-write leaves a line without a newline;
+        # end it so the next result does not get appended to it
+        try:
+            with self.output_path.open("rb+") as fh:
+                if fh.seek(0, os.SEEK_END) == 0:
+                    return
+                fh.seek(-1, os.SEEK_END)
+                if fh.read(1) != b"\n":
+                    fh.write(b"\n")
+        except FileNotFoundError:
+            pass
+
+    def _emit(self, result: BatchResult) -> None:
+        if self.output_path is not None:
+            line = json.dumps(asdict(result), ensure_ascii=False)
+            with self._write_lock:
+                with self.output_path.open("a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def _run_item(self, item: BatchItem) -> BatchResult:
+        started = time.time()
+        agent = self.agents.get(item.agent) if item.agent else self.agent
+        if agent is None:
+            # Running the default agent instead would report a run that was
+            # never asked for as "ok"
+            return BatchResult(
+                id=item.id,
+                prompt=item.prompt,
+                status="error",
+                attempts=0,
+                started_at=started,
+                duration=0.0,
+                error=f"Unknown agent: {item.agent}",
+            )
+        cmd = build_command(
+            item.prompt,
+            agent,
+            self.settings,
+            images=item.images or None,
+            files=item.files or None,
+            cwd=item.cwd,
+        )
+        attempts = 0
+        status, output, error, return_code = "cancelled", [], None, None
+        usage = None
+        while attempts <= self.retries and not self.cancelled:
+            if attempts:
+                delay = self.backoff * (2 ** (attempts - 1))
+                if self._cancelled.wait(delay):
+                    status = "cancelled"
+                    break
+            attempts += 1
+            status, output, error, return_code, usage = self._attempt(
+                item, agent, cmd
+            )
+            if status in ("ok", "cancelled"):
+                break
+        return BatchResult(
+            id=item.id,
+            prompt=item.prompt,
+            status=status,
+            attempts=attempts,
+            started_at=started,
+            duration=time.time() - started,
+            output=output,
+            error=error,
+            return_code=return_code,
+            usage=usage,
+        )
+
+    def _attempt(self, item: BatchItem, agent: dict, cmd: list[str]):
+        session = CodexSession()
+        timed_out = threading.Event()
+        timer = None
+        if self.timeout:
+
+            def expire() -> None:
+                timed_out.set()
+                session.stop()
+
+            timer = threading.Timer(self.timeout, expire)
+            timer.daemon = True
+        with self._lock:
+            self._sessions.add(session)
+        output: list[str] = []
+        try:
+            if timer is not None:
+                timer.start()
+            for line in session.run(
+                item.prompt,
+                agent,
+                self.settings,
+                images=item.images,
+                files=item.files,
+                cwd=item.cwd,
+                cmd=cmd,
+            ):
+                output.append(line)
+        except CodexError as exc:
+            status, error, return_code = (
+                "error", exc.stderr.strip() or str(exc), exc.return_code
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            status, error, return_code = "error", str(exc), None
+        else:
+            status, error, return_code = "ok", None, 0
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with self._lock:
+                self._sessions.discard(session)
+        if timed_out.is_set():
+            status, error = "timeout", f"Timed out after {self.timeout} seconds"
+            return_code = None
+        elif self.cancelled and status == "ok":
+            status, return_code = "cancelled", None
+        usage = asdict(session.usage) if session.usage is not None else None
+        return status, output, error, return_code, usage
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point; returns ``1`` if any item did not succeed."""
+    from .agent_manager import AgentManager
+    from .settings_manager import read_settings
+
+    parser = argparse.ArgumentParser(description="Run a batch of Codex prompts.")
+    parser.add_argument("source", help="CSV/JSONL file of prompts, or a file glob")
+    parser.add_argument("--prompt", help="prompt template for globs, e.g. 'Review {path}'")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl")
+    parser.add_argument("--agent", help="agent name (default: selected agent)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--backoff", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip items that already succeeded according to the output file",
+    )
+    args = parser.parse_args(argv)
+
+    settings = read_settings()
+    manager = AgentManager()
+    name = args.agent or settings.get("selected_agent", "")
+    agent = manager.get_agent(name) or manager.active_agent or {}
+    items = load_items(args.source, args.prompt)
+
+    def report(result: BatchResult) -> None:
+        print(
+            f"[{result.status}] {result.id} "
+            f"({result.attempts} attempt(s), {result.duration:.1f}s)",
+            flush=True,
+        )
+
+    runner = BatchRunner(
+        agent,
+        settings,
+        agents={a.get("name", ""): a for a in manager.agents},
+        concurrency=args.concurrency,
+        retries=args.retries,
+        backoff=args.backoff,
+        timeout=args.timeout,
+        output_path=args.output,
+        on_result=report,
+        resume=args.resume,
+    )
+    try:
+        results = runner.run(items)
+    except KeyboardInterrupt:
+        return 1
+    if runner.skipped:
+        print(f"Skipped {runner.skipped} item(s) already completed in {args.output}")
+    return int(any(r.status != "ok" for r in results))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
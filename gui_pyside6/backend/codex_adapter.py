@@ -3,22 +3,55 @@
 from __future__ import annotations
 
 import os
+import signal
 import subprocess
 import shutil
 import shlex
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from collections.abc import Iterable, Callable
-
-from .settings_manager import save_settings
+from collections.abc import Iterable, Iterator, Callable
+
+from . import result_cache
+from .line_reader import DEFAULT_MAX_LINE_CHARS, iter_lines
+from .session_recorder import SessionRecorder
+from .stderr_capture import StderrCapture
+from .process_limits import (
+    ProcessUsage,
+    ResourceLimits,
+    apply_io_priority,
+    popen_kwargs,
+    wait_with_usage,
+)
+from .settings_manager import SettingsStore, save_settings
 
 
 class CodexError(RuntimeError):
-    """Raised when the Codex CLI exits with an error."""
+    """Raised when the Codex CLI exits with an error.
+
+    ``stderr`` holds at most the first and last few kilobytes of the error
+    output. When more was written, the complete output is kept in the file
+    ``stderr_path`` and :meth:`full_stderr` reads it on demand.
+    """
 
-    def __init__(self, return_code: int, stderr: str) -> None:
+    def __init__(
+        self, return_code: int, stderr: str, stderr_path: str | None = None
+    ) -> None:
         super().__init__(f"Codex CLI exited with code {return_code}")
         self.return_code = return_code
         self.stderr = stderr
+        self.stderr_path = stderr_path
+
+    def full_stderr(self) -> str:
+        """Return the complete stderr output, reading the spill file if any."""
+        if self.stderr_path:
+            try:
+                return Path(self.stderr_path).read_text(
+                    encoding="utf-8", errors="replace"
+                )
+            except OSError:
+                pass
+        return self.stderr
 
 
 class CodexTimeout(RuntimeError):
@@ -30,22 +63,19 @@ class CodexTimeout(RuntimeError):
 
 
 __all__ = [
+    "CodexSession",
     "start_session",
     "stop_session",
+    "session_usage",
     "login",
     "redeem_free_credits",
     "ensure_cli_available",
     "CodexError",
     "CodexTimeout",
     "build_command",
+    "command_template",
 ]
 
-# Global process handle for the currently running Codex session
-_current_process: subprocess.Popen[str] | None = None
-# Indicates whether stop_session() was invoked
-_terminated: bool = False
-
-
 def ensure_cli_available(
     settings: dict | None = None,
     log_fn: Callable[[str, str], None] | None = None,
@@ -155,25 +185,64 @@ def ensure_cli_available(
     )
 
 
-def build_command(
-    prompt: str,
-    agent: dict,
-    settings: dict | None = None,
-    view: str | None = None,
-    images: list[str] | None = None,
-    files: list[str] | None = None,
-    cwd: str | None = None,
-) -> list[str]:
-    """Construct the Codex CLI command from agent and settings.
+# Agent/settings keys mapped to CLI flags taking a value
+_FLAG_MAP = {
+    "max_tokens": "--max-tokens",
+    "top_p": "--top-p",
+    "frequency_penalty": "--frequency-penalty",
+    "presence_penalty": "--presence-penalty",
+    "provider": "--provider",
+    "approval_mode": "--approval-mode",
+    "reasoning": "--reasoning",
+    "project_doc": "--project-doc",
+}
+
+# Agent/settings keys mapped to boolean CLI switches
+_BOOL_FLAGS = {
+    "auto_edit": "--auto-edit",
+    "full_auto": "--full-auto",
+    "flex_mode": "--flex-mode",
+    "quiet": "--quiet",
+    "full_context": "--full-context",
+    "notify": "--notify",
+    "no_project_doc": "--no-project-doc",
+    "disable_response_storage": "--disable-response-storage",
+}
+
+# Every key that influences the compiled part of the command
+_TEMPLATE_AGENT_KEYS = (
+    "temperature",
+    "default_temperature",
+    "model",
+    "writable_root",
+    *_FLAG_MAP,
+    *_BOOL_FLAGS,
+)
+_TEMPLATE_SETTINGS_KEYS = (
+    "cli_path",
+    "use_uv_sandbox",
+    "temperature",
+    "model",
+    "writable_root",
+    *_FLAG_MAP,
+    *_BOOL_FLAGS,
+)
+
+_MISSING = object()
+_TEMPLATE_CACHE_SIZE = 64
+_template_cache: OrderedDict[tuple, tuple[str, ...]] = OrderedDict()
+_template_lock = threading.Lock()
+
+
+def _fingerprint(mapping: dict, keys: tuple[str, ...]) -> tuple:
+    """Return a hashable snapshot of ``keys`` in ``mapping``."""
+    return tuple(
+        repr(mapping[key]) if key in mapping else _MISSING for key in keys
+    )
 
-    Parameters
-    ----------
-    cwd : str | None, optional
-        Working directory for the Codex process. Included for convenience but
-        not used directly when building the argument list.
-    """
-    settings = settings or {}
 
+def _compile_template(agent: dict, settings: dict) -> tuple[str, ...]:
+    """Build the agent/settings dependent prefix of the Codex command."""
     cli_exe = settings.get("cli_path") or "codex"
     cmd: list[str] = shlex.split(str(cli_exe))
     if settings.get("use_uv_sandbox"):
@@ -194,29 +263,7 @@ def build_command(
     else:
         add_flag("--temperature", settings.get("temperature"))
 
-    flag_map = {
-        "max_tokens": "--max-tokens",
-        "top_p": "--top-p",
-        "frequency_penalty": "--frequency-penalty",
-        "presence_penalty": "--presence-penalty",
-        "provider": "--provider",
-        "approval_mode": "--approval-mode",
-        "reasoning": "--reasoning",
-        "project_doc": "--project-doc",
-    }
-
-    bool_flags = {
-        "auto_edit": "--auto-edit",
-        "full_auto": "--full-auto",
-        "flex_mode": "--flex-mode",
-        "quiet": "--quiet",
-        "full_context": "--full-context",
-        "notify": "--notify",
-        "no_project_doc": "--no-project-doc",
-        "disable_response_storage": "--disable-response-storage",
-    }
-
-    for key, flag in flag_map.items():
+    for key, flag in _FLAG_MAP.items():
         if key in agent:
             add_flag(flag, agent[key])
         elif key in settings:
@@ -226,7 +273,7 @@ def build_command(
     if model:
         cmd.extend(["--model", str(model)])
 
-    for key, flag in bool_flags.items():
+    for key, flag in _BOOL_FLAGS.items():
         value = agent.get(key, settings.get(key))
         if value:
             cmd.append(flag)
@@ -247,6 +294,57 @@ def build_command(
             if root_str:
                 cmd.extend(["--writable-root", root_str])
 
+    return tuple(cmd)
+
+
+def command_template(agent: dict, settings: dict) -> tuple[str, ...]:
+    """Return the cached command prefix for ``agent`` and ``settings``.
+
+    Templates are keyed by a snapshot of the agent values that affect the CLI
+    flags and by the settings version, so edits to either produce a fresh
+    template. Plain dictionaries without a version are snapshotted as well.
+    """
+    if isinstance(settings, SettingsStore):
+        settings_key: tuple = (id(settings), settings.version)
+    else:
+        settings_key = _fingerprint(settings, _TEMPLATE_SETTINGS_KEYS)
+    key = (_fingerprint(agent, _TEMPLATE_AGENT_KEYS), settings_key)
+    with _template_lock:
+        template = _template_cache.get(key)
+        if template is not None:
+            _template_cache.move_to_end(key)
+            return template
+    template = _compile_template(agent, settings)
+    with _template_lock:
+        _template_cache[key] = template
+        while len(_template_cache) > _TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return template
+
+
+def build_command(
+    prompt: str,
+    agent: dict,
+    settings: dict | None = None,
+    view: str | None = None,
+    images: list[str] | None = None,
+    files: list[str] | None = None,
+    cwd: str | None = None,
+) -> list[str]:
+    """Construct the Codex CLI command from agent and settings.
+
+    The agent and settings flags come from :func:`command_template`; only the
+    per-run view, images, files and prompt are appended here.
+
+    Parameters
+    ----------
+    cwd : str | None, optional
+        Working directory for the Codex process. Included for convenience but
+        not used directly when building the argument list.
+    """
+    settings = settings or {}
+    cmd = list(command_template(agent, settings))
+
     if view and not isinstance(view, bool):
         view_str = str(view)
         if view_str:
@@ -272,6 +370,237 @@ def build_command(
     return cmd
 
 
+class CodexSession:
+    """A single Codex CLI process and its output stream.
+
+    Sessions are independent of each other, so several can run at the same
+    time. :func:`start_session` and :func:`stop_session` drive a shared
+    default session for the GUI.
+    """
+
+    def __init__(self) -> None:
+        self.process: subprocess.Popen[str] | None = None
+        # Whether stop() was invoked for the current run
+        self.terminated = False
+        # Set by stop() before the process exists, so the run never starts;
+        # cleared by prepare()
+        self._stop_requested = False
+        # Resource usage of the last process that exited
+        self.usage: ProcessUsage | None = None
+        # SIGKILL timer started by stop(), cancelled once the process exits
+        self._kill_timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None
+
+    def prepare(self) -> None:
+        """Forget a stop request left over from an earlier run.
+
+        Call this when a new run is requested, before it is handed to a
+        worker, so that :meth:`stop` can cancel it even before its process
+        has started.
+        """
+        with self._lock:
+            self._stop_requested = False
+
+    def run(
+        self,
+        prompt: str,
+        agent: dict,
+        settings: dict | None = None,
+        view: str | None = None,
+        images: list[str] | None = None,
+        files: list[str] | None = None,
+        cwd: str | None = None,
+        cmd: list[str] | None = None,
+        use_cache: bool | None = None,
+        on_cache_hit: Callable[[], None] | None = None,
+        record_to: str | Path | None = None,
+    ) -> Iterator[str]:
+        """Run the CLI and yield its output lines.
+
+        See :func:`start_session` for the parameters.
+        """
+        if cmd is None:
+            cmd = build_command(
+                prompt,
+                agent,
+                settings,
+                view=view,
+                images=images,
+                files=files,
+                cwd=cwd,
+            )
+
+        settings = settings or {}
+        self.usage = None
+        if self._stop_requested:
+            self.terminated = True
+            return
+        if use_cache is None:
+            use_cache = bool(settings.get("use_result_cache"))
+        cache = result_cache.get_cache(settings) if use_cache else None
+        key = ""
+        if cache is not None:
+            key = result_cache.cache_key(cmd, settings, files, images, cwd)
+            cached = cache.get(key)
+            if cached is not None:
+                if on_cache_hit is not None:
+                    on_cache_hit()
+                yield from cached
+                return
+
+        # Output is collected for the cache until it grows past the entry limit
+        collected: list[str] | None = [] if cache is not None else None
+        collected_size = 0
+        lines: Iterable[str] = self.stream(cmd, cwd=cwd, settings=settings)
+        if record_to is not None:
+            lines = SessionRecorder(record_to, cmd, prompt).wrap(lines)
+        for line in lines:
+            if collected is not None:
+                collected.append(line)
+                collected_size += len(line) + 1
+                if collected_size > cache.max_entry_bytes:
+                    collected = None
+            yield line
+        if not self.terminated and collected is not None:
+            cache.put(key, collected, cmd)
+
+    def stream(
+        self,
+        cmd: list[str],
+        cwd: str | None = None,
+        settings: dict | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[str]:
+        """Run ``cmd`` and yield stdout lines as they are produced.
+
+        A watchdog stops the process once ``timeout`` seconds have passed and
+        :class:`CodexTimeout` is raised. A non-zero exit raises
+        :class:`CodexError` unless :meth:`stop` was called.
+        """
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive")
+        with self._lock:
+            if self.process is not None:
+                raise RuntimeError("A Codex session is already running")
+            self.usage = None
+            if self._stop_requested:
+                self.terminated = True
+                return
+            self.terminated = False
+            limits = ResourceLimits.from_settings(settings)
+            # Unbuffered binary pipes; iter_lines does its own buffering
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=0,
+                cwd=cwd,
+                **popen_kwargs(limits),
+            )
+            self.process = process
+        apply_io_priority(process, limits)
+
+        assert process.stdout is not None
+        assert process.stderr is not None
+        # Drained concurrently so a chatty CLI cannot fill the pipe and stall
+        stderr = StderrCapture(process.stderr).start()
+        timed_out = threading.Event()
+        watchdog = None
+        if timeout is not None:
+
+            def expire() -> None:
+                timed_out.set()
+                self.stop()
+
+            watchdog = threading.Timer(timeout, expire)
+            watchdog.daemon = True
+            watchdog.start()
+
+        max_line = int(
+            (settings or {}).get("max_output_line_chars") or DEFAULT_MAX_LINE_CHARS
+        )
+        try:
+            yield from iter_lines(process.stdout, max_line_chars=max_line)
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            process.stdout.close()
+            return_code, self.usage = wait_with_usage(process)
+            with self._lock:
+                self.process = None
+                kill_timer, self._kill_timer = self._kill_timer, None
+            if kill_timer is not None:
+                kill_timer.cancel()
+            stderr.join(5.0)
+            process.stderr.close()
+            if timed_out.is_set():
+                stderr.discard()
+                raise CodexTimeout(timeout or 0)
+            if return_code != 0 and not self.terminated:
+                raise CodexError(return_code, stderr.text(), stderr.spill_path)
+            stderr.discard()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the running process and its children to exit, without waiting.
+
+        The whole process group gets SIGTERM (CTRL_BREAK on Windows) so tools
+        started through ``npx`` or ``uv run`` exit too. Anything still alive
+        after ``timeout`` seconds is killed from a timer thread, unless the
+        process has been reaped by then. :meth:`run` returns once the output
+        pipe closes. Called before the process has started, it keeps the run
+        from starting at all.
+        """
+        with self._lock:
+            process = self.process
+            if process is None:
+                self._stop_requested = True
+                self.terminated = True
+                return
+            if process.poll() is not None or self.terminated:
+                return
+            self.terminated = True
+            timer = threading.Timer(timeout, _kill_unreaped, (process,))
+            timer.daemon = True
+            self._kill_timer = timer
+        _signal_group(process, kill=False)
+        timer.start()
+
+
+def _kill_unreaped(process: subprocess.Popen) -> None:
+    # Once the process is reaped its id may be reused by an unrelated
+    # process group, which must not be killed
+    if process.returncode is None:
+        _signal_group(process, kill=True)
+
+
+def _signal_group(process: subprocess.Popen, kill: bool) -> None:
+    """Send SIGTERM, or SIGKILL when ``kill`` is set, to the process group."""
+    try:
+        if os.name == "nt":
+            if kill:
+                subprocess.run(
+                    ["taskkill", "/T", "/F", "/PID", str(process.pid)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=False,
+                )
+            else:
+                process.send_signal(signal.CTRL_BREAK_EVENT)
+            return
+        # The group outlives the leader while grandchildren still run
+        os.killpg(process.pid, signal.SIGKILL if kill else signal.SIGTERM)
+    except OSError:
+        pass
+
+
+# Session used by the module-level helpers below
+_default_session = CodexSession()
+
+
 def start_session(
     prompt: str,
     agent: dict,
@@ -280,6 +609,10 @@ def start_session(
     images: list[str] | None = None,
     files: list[str] | None = None,
     cwd: str | None = None,
+    cmd: list[str] | None = None,
+    use_cache: bool | None = None,
+    on_cache_hit: Callable[[], None] | None = None,
+    record_to: str | Path | None = None,
 ) -> Iterable[str]:
     """Start a Codex CLI session with the given prompt and agent.
 
@@ -300,6 +633,19 @@ def start_session(
         Paths to include via ``--file`` flags.
     cwd: str | None, optional
         Working directory to run the Codex process in.
+    cmd: list[str] | None, optional
+        Command previously returned by :func:`build_command` for the same
+        arguments. When given it is used as-is instead of being rebuilt.
+    use_cache: bool | None, optional
+        Replay the output of an earlier identical run from the result cache
+        and store successful runs in it. ``None`` uses the
+        ``use_result_cache`` setting.
+    on_cache_hit: Callable[[], None] | None, optional
+        Called before cached output is replayed.
+    record_to: str | Path | None, optional
+        Write the output lines and their timing to this recording file so
+        the session can be replayed with :mod:`session_recorder`. Cached
+        results are not recorded.
 
     Yields
     ------
@@ -312,12 +658,7 @@ def start_session(
         If a session is already running or if the Codex process exits with
         a non-zero return code.
     """
-    global _current_process, _terminated
-
-    if _current_process is not None:
-        raise RuntimeError("A Codex session is already running")
-
-    cmd = build_command(
+    yield from _default_session.run(
         prompt,
         agent,
         settings,
@@ -325,72 +666,35 @@ def start_session(
         images=images,
         files=files,
         cwd=cwd,
+        cmd=cmd,
+        use_cache=use_cache,
+        on_cache_hit=on_cache_hit,
+        record_to=record_to,
     )
-    _terminated = False
-    process = subprocess.Popen(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        bufsize=1,
-        cwd=cwd,
-    )
-    _current_process = process
 
-    assert process.stdout is not None
-    assert process.stderr is not None
 
-    try:
-        for line in process.stdout:
-            yield line.rstrip("\n")
-    finally:
-        process.stdout.close()
-        stderr_output = process.stderr.read()
-        process.stderr.close()
-        return_code = process.wait()
-        _current_process = None
-        if return_code != 0 and not _terminated:
-            raise CodexError(return_code, stderr_output)
+def prepare_session() -> None:
+    """Forget an earlier stop request before queueing a new session."""
+    _default_session.prepare()
 
 
 def stop_session() -> None:
-    """Terminate the running Codex session, if any."""
-    global _current_process, _terminated
-    if _current_process and _current_process.poll() is None:
-        _terminated = True
-        _current_process.terminate()
-        try:
-            _current_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            _current_process.kill()
-    _current_process = None
+    """Ask the running Codex session to stop; returns without waiting."""
+    _default_session.stop()
 
 
-def _run_simple_command(cmd: list[str], timeout: float | None = None) -> Iterable[str]:
-    """Run a Codex CLI command and yield output lines."""
-    global _current_process
-    if _current_process is not None:
-        raise RuntimeError("A Codex session is already running")
+def session_usage() -> ProcessUsage | None:
+    """Return the resource usage of the last finished Codex session."""
+    return _default_session.usage
 
-    if timeout is not None and timeout <= 0:
-        raise ValueError("timeout must be positive")
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=timeout,
-        )
-    except subprocess.TimeoutExpired as exc:
-        raise CodexTimeout(timeout or 0) from exc
-
-    if result.returncode != 0:
-        raise CodexError(result.returncode, result.stderr)
+def _run_simple_command(cmd: list[str], timeout: float | None = None) -> Iterable[str]:
+    """Run a Codex CLI command and yield output lines as they arrive.
 
-    for line in result.stdout.splitlines():
-        yield line.rstrip("\n")
+    The command runs on the default session, so :func:`stop_session` can
+    cancel it.
+    """
+    yield from _default_session.stream(cmd, timeout=timeout)
 
 
 def login(settings: dict | None = None) -> Iterable[str]:
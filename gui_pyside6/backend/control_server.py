@@ -0,0 +1,656 @@
+"""Local HTTP server for driving Codex sessions from other tools.
+
+The server listens on localhost (or a Unix socket) and exposes:
+
+``GET /sessions``
+    List sessions, newest first.
+``POST /sessions``
+    Start a session. The JSON body needs ``prompt`` and may contain
+    ``agent``, ``files``, ``images``, ``cwd`` and ``use_cache``.
+``GET /sessions/<id>``
+    Status of one session.
+``POST /sessions/<id>/stop``
+    Stop a running session.
+``GET /sessions/<id>/stream``
+    Output as server-sent events. Each line is a ``data:`` event whose
+    ``id`` is the line number, so clients can resume with ``?from=N`` or a
+    ``Last-Event-ID`` header. A final ``end`` event carries the status.
+``GET /agents``
+    Names of the available agents.
+
+Every request needs an ``Authorization: Bearer <token>`` header. Without
+``--token`` or ``$CODEX_GUI_SERVER_TOKEN`` a random token is generated and
+written to ``config/control_server.token`` (readable only by the owner).
+Requests with a ``Host`` other than the bound localhost address or with an
+``Origin`` header are rejected, and ``POST`` bodies must be sent as
+``application/json``, so web pages cannot reach the server from a browser.
+
+Output is buffered per session. A client that falls more than ``max_lag``
+lines behind pauses the session, so the CLI blocks on its output pipe
+instead of the buffer growing; a client that stays behind for
+``stall_timeout`` seconds is disconnected so it cannot hold up the others.
+
+Usage::
+
+    python -m gui_pyside6.backend.control_server --port 8765
+    python -m gui_pyside6.backend.control_server --socket /tmp/codex.sock
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import secrets
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from .codex_adapter import CodexError, CodexSession
+
+DEFAULT_PORT = 8765
+# Largest request body accepted; prompts and file lists fit easily
+MAX_BODY_BYTES = 1024 * 1024
+TOKEN_PATH = Path(__file__).resolve().parent.parent / "config" / "control_server.token"
+
+
+def write_token_file(path: str | Path, token: str) -> Path:
+    """Write ``token`` to ``path`` so that only the owner can read it."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(token + "\n")
+    # O_CREAT does not change the mode of an existing file
+    os.chmod(path, 0o600)
+    return path
+
+
+class SlowConsumerError(RuntimeError):
+    """Raised for a stream that was dropped for falling too far behind."""
+
+
+@dataclass
+class _Subscriber:
+    cursor: int
+    lag_since: float | None = None
+    dropped: bool = False
+
+
+class ServerSession:
+    """A Codex run whose output can be streamed by several clients."""
+
+    def __init__(
+        self,
+        session_id: int,
+        prompt: str,
+        agent_name: str = "",
+        max_lag: int = 1000,
+        history_lines: int = 10_000,
+        stall_timeout: float = 30.0,
+    ) -> None:
+        self.id = session_id
+        self.prompt = prompt
+        self.agent_name = agent_name
+        self.max_lag = max(1, max_lag)
+        self.history_lines = max(0, history_lines)
+        self.stall_timeout = stall_timeout
+        self.status = "running"  # "finished", "failed" or "stopped" when done
+        self.started_at = time.time()
+        self.finished_at: float | None = None
+        self.return_code: int | None = None
+        self.error: str | None = None
+        self.codex = CodexSession()
+        self._cond = threading.Condition()
+        # Retained output; _lines[0] is line number _first
+        self._lines: deque[str] = deque()
+        self._first = 0
+        self._total = 0
+        self._subscribers: dict[int, _Subscriber] = {}
+        self._next_subscriber = itertools.count()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    def info(self) -> dict:
+        return {
+            "id": self.id,
+            "prompt": self.prompt,
+            "agent": self.agent_name,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "return_code": self.return_code,
+            "error": self.error,
+            "lines": self._total,
+            "usage": asdict(self.codex.usage) if self.codex.usage else None,
+        }
+
+    # ---------------------------------------------------------- producer
+    def start(self, agent: dict, settings: dict, **kwargs) -> None:
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(agent, settings),
+            kwargs=kwargs,
+            name=f"codex-server-{self.id}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, agent: dict, settings: dict, **kwargs) -> None:
+        status, return_code, error = "finished", 0, None
+        try:
+            for line in self.codex.run(self.prompt, agent, settings, **kwargs):
+                self.append(line)
+            if self.codex.terminated or self._stopping:
+                status, return_code = "stopped", None
+        except CodexError as exc:
+            status, return_code = "failed", exc.return_code
+            error = exc.stderr.strip() or str(exc)
+        except Exception as exc:  # pylint: disable=broad-except
+            status, return_code, error = "failed", None, str(exc)
+        with self._cond:
+            self.status = status
+            self.return_code = return_code
+            self.error = error
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def append(self, line: str) -> None:
+        """Add an output line, waiting while a subscriber lags too far behind."""
+        with self._cond:
+            while not self._stopping:
+                laggards = [
+                    sub for sub in self._subscribers.values()
+                    if self._total - sub.cursor >= self.max_lag
+                ]
+                if not laggards:
+                    break
+                now = time.monotonic()
+                for sub in laggards:
+                    if sub.lag_since is None:
+                        sub.lag_since = now
+                    elif now - sub.lag_since >= self.stall_timeout:
+                        self._drop(sub)
+                self._cond.wait(0.1)
+            self._lines.append(line)
+            self._total += 1
+            self._trim()
+            self._cond.notify_all()
+
+    def _drop(self, sub: _Subscriber) -> None:
+        sub.dropped = True
+        for key, value in list(self._subscribers.items()):
+            if value is sub:
+                del self._subscribers[key]
+
+    def _trim(self) -> None:
+        keep_from = self._total - self.history_lines
+        if self._subscribers:
+            keep_from = min(
+                keep_from, min(s.cursor for s in self._subscribers.values())
+            )
+        while self._first < keep_from and self._lines:
+            self._lines.popleft()
+            self._first += 1
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self.codex.stop()
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ---------------------------------------------------------- consumers
+    def subscribe(self, start: int = 0) -> int:
+        """Register a reader starting at line ``start`` and return its key."""
+        with self._cond:
+            key = next(self._next_subscriber)
+            self._subscribers[key] = _Subscriber(max(start, self._first))
+            return key
+
+    def unsubscribe(self, key: int) -> None:
+        with self._cond:
+            self._subscribers.pop(key, None)
+            self._trim()
+            self._cond.notify_all()
+
+    def read(
+        self, key: int, limit: int = 256, timeout: float | None = None
+    ) -> tuple[int, list[str], bool]:
+        """Return ``(first_line_number, lines, finished)`` for a subscriber.
+
+        Blocks up to ``timeout`` seconds when no new line is available.
+        ``finished`` is true once the session is done and every line has
+        been read.
+        """
+        with self._cond:
+            sub = self._subscribers.get(key)
+            if sub is None:
+                raise SlowConsumerError("Stream fell too far behind and was closed")
+            if sub.cursor >= self._total and not self.done:
+                self._cond.wait(timeout)
+                if sub.dropped:
+                    raise SlowConsumerError(
+                        "Stream fell too far behind and was closed"
+                    )
+            start = max(sub.cursor, self._first)
+            end = min(self._total, start + limit)
+            lines = list(
+                itertools.islice(self._lines, start - self._first, end - self._first)
+            )
+            sub.cursor = end
+            sub.lag_since = None
+            if lines:
+                self._trim()
+                self._cond.notify_all()
+            return start, lines, self.done and end >= self._total
+
+
+class ControlServer:
+    """Own the running :class:`ServerSession` objects and the HTTP server."""
+
+    def __init__(
+        self,
+        settings: dict,
+        agent_manager=None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        socket_path: str | None = None,
+        token: str | None = None,
+        token_path: str | Path | None = TOKEN_PATH,
+        max_sessions: int = 8,
+        max_lag: int = 1000,
+        history_lines: int = 10_000,
+        stall_timeout: float = 30.0,
+        keep_finished: int = 100,
+    ) -> None:
+        self.settings = settings
+        self.agent_manager = agent_manager
+        # Without a token any web page could start runs through the browser
+        self.token = token or secrets.token_urlsafe(32)
+        self.token_path: Path | None = None
+        if not token and token_path is not None:
+            self.token_path = write_token_file(token_path, self.token)
+        self.max_sessions = max_sessions
+        self.max_lag = max_lag
+        self.history_lines = history_lines
+        self.stall_timeout = stall_timeout
+        self.keep_finished = keep_finished
+        self._sessions: OrderedDict[int, ServerSession] = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.httpd = _UnixHTTPServer(socket_path, _Handler)
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.control = self  # type: ignore[attr-defined]
+        self.socket_path = socket_path
+        self.allowed_hosts: set[str] = set()
+        if not socket_path:
+            bound = self.httpd.server_address[1]
+            names = {"localhost", "127.0.0.1", "[::1]"}
+            if host not in ("", "0.0.0.0", "::"):
+                names.add(f"[{host}]" if ":" in host else host)
+            self.allowed_hosts = {f"{name}:{bound}" for name in names}
+
+    @property
+    def address(self) -> str:
+        if self.socket_path:
+            return f"unix:{self.socket_path}"
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ---------------------------------------------------------- sessions
+    def _agent(self, name: str | None) -> tuple[str, dict]:
+        if self.agent_manager is None:
+            if name:
+                raise ValueError(f"Unknown agent: {name}")
+            return "", {}
+        if name:
+            agent = self.agent_manager.get_agent(name)
+            if agent is None:
+                raise ValueError(f"Unknown agent: {name}")
+        else:
+            agent = self.agent_manager.active_agent or {}
+        return agent.get("name", ""), agent
+
+    def start_session(
+        self,
+        prompt: str,
+        agent: str | None = None,
+        files: list[str] | None = None,
+        images: list[str] | None = None,
+        cwd: str | None = None,
+        use_cache: bool | None = None,
+    ) -> ServerSession:
+        if not prompt or not isinstance(prompt, str):
+            raise ValueError("A prompt is required")
+        agent_name, agent_data = self._agent(agent)
+        with self._lock:
+            running = sum(1 for s in self._sessions.values() if not s.done)
+            if running >= self.max_sessions:
+                raise RuntimeError("Too many running sessions")
+            session = ServerSession(
+                next(self._ids),
+                prompt,
+                agent_name,
+                max_lag=self.max_lag,
+                history_lines=self.history_lines,
+                stall_timeout=self.stall_timeout,
+            )
+            self._sessions[session.id] = session
+            self._prune()
+        session.start(
+            agent_data,
+            self.settings,
+            files=list(files or []),
+            images=list(images or []),
+            cwd=cwd,
+            use_cache=use_cache,
+        )
+        return session
+
+    def _prune(self) -> None:
+        finished = [s.id for s in self._sessions.values() if s.done]
+        for session_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._sessions[session_id]
+
+    def get(self, session_id: int) -> ServerSession | None:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def list_sessions(self) -> list[dict]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return [s.info() for s in reversed(sessions)]
+
+    def agent_names(self) -> list[str]:
+        if self.agent_manager is None:
+            return []
+        return [a.get("name", "") for a in self.agent_manager.agents]
+
+    # ---------------------------------------------------------- serving
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever(poll_interval=0.2)
+
+    def start(self) -> None:
+        """Serve from a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="codex-control-server", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop serving and terminate running sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            if not session.done:
+                session.stop()
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+else:  # pragma: no cover - Windows
+
+    class _UnixHTTPServer:  # type: ignore[no-redef]
+        def __init__(self, *args, **kwargs) -> None:
+            raise OSError("Unix sockets are not supported on this platform")
+
+
+def _sse_data(event_id: int, line: str) -> str:
+    # A bare CR would end the event line early
+    line = line.replace("\r", "")
+    return f"id: {event_id}\ndata: {line}\n\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "CodexGUI"
+
+    @property
+    def control(self) -> ControlServer:
+        return self.server.control  # type: ignore[attr-defined]
+
+    def address_string(self) -> str:
+        # Unix socket peers have no host
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+    # ---------------------------------------------------------- helpers
+    def _send_json(self, status: int, data) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _authorized(self) -> bool:
+        control = self.control
+        # A foreign Host means DNS rebinding, an Origin a request from a page
+        host = (self.headers.get("Host") or "").lower()
+        if control.allowed_hosts and host not in control.allowed_hosts:
+            self._error(403, "Host not allowed")
+            return False
+        if self.headers.get("Origin") is not None:
+            self._error(403, "Cross-origin requests are not allowed")
+            return False
+        expected = f"Bearer {control.token}"
+        if not secrets.compare_digest(
+            (self.headers.get("Authorization") or "").encode(), expected.encode()
+        ):
+            self._error(401, "Missing or invalid token")
+            return False
+        if self.command == "POST":
+            content_type = self.headers.get("Content-Type") or ""
+            if content_type.split(";")[0].strip().lower() != "application/json":
+                self._error(415, "Content-Type must be application/json")
+                return False
+        return True
+
+    def _read_json(self) -> dict | None:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._error(400, "Invalid Content-Length")
+            return None
+        if length > MAX_BODY_BYTES:
+            self._error(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+            return None
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            data = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            self._error(400, "Expected a JSON object")
+            return None
+        return data
+
+    def _route(self) -> tuple[list[str], dict[str, list[str]]]:
+        url = urlsplit(self.path)
+        return [p for p in url.path.split("/") if p], parse_qs(url.query)
+
+    def _session(self, parts: list[str]) -> ServerSession | None:
+        try:
+            session = self.control.get(int(parts[1]))
+        except ValueError:
+            session = None
+        if session is None:
+            self._error(404, "No such session")
+        return session
+
+    # ---------------------------------------------------------- methods
+    def do_GET(self) -> None:  # noqa: N802
+        if not self._authorized():
+            return
+        parts, query = self._route()
+        if parts == ["sessions"]:
+            self._send_json(200, self.control.list_sessions())
+        elif parts == ["agents"]:
+            self._send_json(200, self.control.agent_names())
+        elif len(parts) == 2 and parts[0] == "sessions":
+            session = self._session(parts)
+            if session is not None:
+                self._send_json(200, session.info())
+        elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "stream":
+            session = self._session(parts)
+            if session is not None:
+                start = query.get("from", [self.headers.get("Last-Event-ID")])[0]
+                try:
+                    start_line = int(start) + (0 if "from" in query else 1)
+                except (TypeError, ValueError):
+                    start_line = 0
+                self._stream(session, max(0, start_line))
+        else:
+            self._error(404, "Not found")
+
+    def do_POST(self) -> None:  # noqa: N802
+        if not self._authorized():
+            return
+        parts, _ = self._route()
+        if parts == ["sessions"]:
+            data = self._read_json()
+            if data is None:
+                return
+            try:
+                session = self.control.start_session(
+                    data.get("prompt", ""),
+                    agent=data.get("agent"),
+                    files=data.get("files"),
+                    images=data.get("images"),
+                    cwd=data.get("cwd"),
+                    use_cache=data.get("use_cache"),
+                )
+            except ValueError as exc:
+                self._error(400, str(exc))
+            except RuntimeError as exc:
+                self._error(429, str(exc))
+            else:
+                self._send_json(201, session.info())
+        elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "stop":
+            session = self._session(parts)
+            if session is not None:
+                session.stop()
+                self._send_json(200, session.info())
+        else:
+            self._error(404, "Not found")
+
+    def _stream(self, session: ServerSession, start: int) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        key = session.subscribe(start)
+        try:
+            while True:
+                try:
+                    first, lines, finished = session.read(key, timeout=15.0)
+                except SlowConsumerError as exc:
+                    self._event("error", json.dumps({"error": str(exc)}))
+                    break
+                if lines:
+                    chunk = "".join(
+                        _sse_data(first + i, line) for i, line in enumerate(lines)
+                    )
+                    self.wfile.write(chunk.encode("utf-8"))
+                    self.wfile.flush()
+                if finished:
+                    self._event("end", json.dumps(session.info()))
+                    break
+                if not lines:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            session.unsubscribe(key)
+
+    def _event(self, event: str, data: str) -> None:
+        self.wfile.write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .agent_manager import AgentManager
+    from .settings_manager import read_settings
+
+    parser = argparse.ArgumentParser(description="Serve Codex sessions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="listen on this Unix socket instead")
+    parser.add_argument(
+        "--token",
+        default=os.getenv("CODEX_GUI_SERVER_TOKEN"),
+        help="token for 'Authorization: Bearer TOKEN' (default: "
+        "$CODEX_GUI_SERVER_TOKEN, or a random one written to "
+        "config/control_server.token)",
+    )
+    parser.add_argument("--max-sessions", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    settings = read_settings()
+    manager = AgentManager()
+    manager.set_active_agent(settings.get("selected_agent", ""))
+    server = ControlServer(
+        settings,
+        manager,
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+        token=args.token,
+        max_sessions=args.max_sessions,
+    )
+    print(f"Serving on {server.address}", file=sys.stderr, flush=True)
+    if server.token_path is not None:
+        print(f"Token written to {server.token_path}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Persistent, append-only history of Codex sessions."""
+
+from __future__ import annotations
+
+import atexit
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+HISTORY_PATH = Path(__file__).resolve().parent.parent / "config" / "history.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    agent TEXT,
+    model TEXT,
+    provider TEXT,
+    prompt TEXT,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER REFERENCES sessions(id),
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_session ON entries(session_id, id);
+"""
+
+
+@dataclass(frozen=True)
+class HistoryEntry:
+    """A single recorded line."""
+
+    id: int
+    session_id: int | None
+    ts: float
+    kind: str  # "prompt", "output" or "error"
+    text: str
+
+
+@dataclass(frozen=True)
+class SessionRecord:
+    """Metadata of a recorded session."""
+
+    id: int
+    started_at: float
+    finished_at: float | None
+    agent: str
+    model: str
+    provider: str
+    prompt: str
+    status: str | None
+
+    @property
+    def duration(self) -> float | None:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class HistoryStore:
+    """SQLite-backed session history.
+
+    Output lines are inserted right away but committed in batches, either
+    once ``batch_size`` lines are uncommitted or ``flush_interval`` seconds
+    after the first one. Reads use the same connection, so they see
+    uncommitted lines without forcing a commit. Rows are only ever appended;
+    :meth:`clear` is the one exception.
+
+    Entries are read by keyset (:meth:`fetch_entries_after` and
+    :meth:`fetch_entries_before`), which costs the same at any position in
+    the history; :meth:`fetch_entries` by offset is for random jumps.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+    ) -> None:
+        self.path = Path(path) if path is not None else HISTORY_PATH
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        # Lines inserted since the last commit
+        self._uncommitted = 0
+        self._timer: threading.Timer | None = None
+        self._closed = False
+        atexit.register(self.close)
+
+    # ----------------------------------------------------------- writing
+    def start_session(
+        self,
+        prompt: str,
+        agent: str = "",
+        model: str = "",
+        provider: str = "",
+    ) -> int:
+        """Record a new session and its prompt, returning the session id."""
+        now = time.time()
+        with self._lock:
+            self._flush_locked()
+            cur = self._conn.execute(
+                "INSERT INTO sessions (started_at, agent, model, provider, prompt)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (now, agent, model, provider, prompt),
+            )
+            session_id = int(cur.lastrowid)
+            self._conn.execute(
+                "INSERT INTO entries (session_id, ts, kind, text) VALUES (?, ?, ?, ?)",
+                (session_id, now, "prompt", prompt),
+            )
+            self._conn.commit()
+        return session_id
+
+    def append(self, session_id: int | None, text: str, kind: str = "output") -> None:
+        """Insert a line for ``session_id``; committed with the next batch."""
+        with self._lock:
+            if self._closed:
+                return
+            self._conn.execute(
+                "INSERT INTO entries (session_id, ts, kind, text) VALUES (?, ?, ?, ?)",
+                (session_id, time.time(), kind, text),
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= self.batch_size or self.flush_interval <= 0:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def finish_session(self, session_id: int, status: str = "finished") -> None:
+        """Flush pending lines and record the end time of ``session_id``."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.execute(
+                "UPDATE sessions SET finished_at = ?, status = ? WHERE id = ?",
+                (time.time(), status, session_id),
+            )
+            self._conn.commit()
+
+    def flush(self) -> None:
+        """Commit pending lines now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._uncommitted or self._closed:
+            return
+        self._uncommitted = 0
+        self._conn.commit()
+
+    def clear(self) -> None:
+        """Delete every recorded session and line."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM sessions")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            self._conn.close()
+        atexit.unregister(self.close)
+
+    # ----------------------------------------------------------- reading
+    def count_entries(self, session_id: int | None = None) -> int:
+        with self._lock:
+            if session_id is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM entries WHERE session_id = ?", (session_id,)
+                ).fetchone()
+        return int(row[0])
+
+    def _select(
+        self, where: list[str], params: list, order: str, limit: int, offset: int = 0
+    ) -> list[HistoryEntry]:
+        query = "SELECT id, session_id, ts, kind, text FROM entries"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" ORDER BY id {order} LIMIT ?"
+        params = [*params, limit]
+        if offset:
+            query += " OFFSET ?"
+            params.append(offset)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    @staticmethod
+    def _session_filter(session_id: int | None) -> tuple[list[str], list]:
+        if session_id is None:
+            return [], []
+        return ["session_id = ?"], [session_id]
+
+    def fetch_entries_after(
+        self, after_id: int, limit: int, session_id: int | None = None
+    ) -> list[HistoryEntry]:
+        """Return up to ``limit`` entries with an id above ``after_id``."""
+        where, params = self._session_filter(session_id)
+        return self._select([*where, "id > ?"], [*params, after_id], "ASC", limit)
+
+    def fetch_entries_before(
+        self, before_id: int | None, limit: int, session_id: int | None = None
+    ) -> list[HistoryEntry]:
+        """Return the last ``limit`` entries with an id below ``before_id``.
+
+        ``None`` returns the newest entries. Entries are in ascending order.
+        """
+        where, params = self._session_filter(session_id)
+        if before_id is not None:
+            where, params = [*where, "id < ?"], [*params, before_id]
+        return self._select(where, params, "DESC", limit)[::-1]
+
+    def fetch_entries(
+        self, offset: int, limit: int, session_id: int | None = None
+    ) -> list[HistoryEntry]:
+        """Return up to ``limit`` entries starting at row ``offset``.
+
+        SQLite steps over ``offset`` rows, so prefer the keyset methods when
+        a neighbouring id is known.
+        """
+        where, params = self._session_filter(session_id)
+        return self._select(where, params, "ASC", limit, offset)
+
+    def list_sessions(
+        self, limit: int = 100, before_id: int | None = None
+    ) -> list[SessionRecord]:
+        """Return sessions older than ``before_id`` (default: all), newest first."""
+        query = (
+            "SELECT id, started_at, finished_at, agent, model, provider, prompt,"
+            " status FROM sessions"
+        )
+        params: list = []
+        if before_id is not None:
+            query += " WHERE id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, [*params, limit]).fetchall()
+        return [SessionRecord(*row) for row in rows]
@@ -0,0 +1,92 @@
+"""Split a binary pipe into text lines with bounded memory."""
+
+from __future__ import annotations
+
+import codecs
+from collections.abc import Iterator
+
+# Longer lines are soft-wrapped into pieces of this many characters
+DEFAULT_MAX_LINE_CHARS = 64 * 1024
+
+
+def _wrap(line: str, width: int) -> Iterator[str]:
+    if len(line) <= width:
+        yield line
+        return
+    for start in range(0, len(line), width):
+        yield line[start : start + width]
+
+
+def iter_lines(
+    stream,
+    max_line_chars: int = DEFAULT_MAX_LINE_CHARS,
+    chunk_size: int = 64 * 1024,
+    encoding: str = "utf-8",
+) -> Iterator[str]:
+    """Yield the lines of a binary ``stream`` without their line endings.
+
+    Data is read with ``readinto`` into one reusable buffer and decoded
+    incrementally, so multi-byte characters split across reads are handled
+    and each chunk is decoded and split once instead of line by line.
+    ``\\n``, ``\\r\\n`` and a lone ``\\r`` end a line, as in text mode. A line
+    longer than ``max_line_chars`` is yielded in pieces of that size rather
+    than being held in memory until its end arrives.
+    """
+    raw = getattr(stream, "raw", stream)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    partial: list[str] = []
+    partial_len = 0
+    pending_cr = False
+    # Whether part of the current line was already yielded
+    wrapped = False
+
+    while True:
+        size = raw.readinto(view)
+        final = not size
+        text = decoder.decode(view[:size] if size else b"", final=final)
+        if pending_cr:
+            text = "\r" + text
+            pending_cr = False
+        if text.endswith("\r") and not final:
+            # Wait for the next chunk to tell "\r\n" from a lone "\r"
+            text = text[:-1]
+            pending_cr = True
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+        pieces = text.split("\n")
+        rest = pieces.pop()
+        if pieces:
+            if partial:
+                partial.append(pieces[0])
+                pieces[0] = "".join(partial)
+                partial.clear()
+                partial_len = 0
+            if wrapped and not pieces[0]:
+                # The line ended exactly where it was last wrapped
+                del pieces[0]
+            wrapped = False
+            if max(map(len, pieces), default=0) <= max_line_chars:
+                yield from pieces
+            else:
+                for piece in pieces:
+                    yield from _wrap(piece, max_line_chars)
+
+        if rest:
+            partial.append(rest)
+            partial_len += len(rest)
+            if partial_len >= max_line_chars:
+                joined = "".join(partial)
+                cut = len(joined) - len(joined) % max_line_chars
+                yield from _wrap(joined[:cut], max_line_chars)
+                wrapped = True
+                partial = [joined[cut:]] if cut < len(joined) else []
+                partial_len = len(joined) - cut
+
+        if final:
+            break
+
+    if partial:
+        yield "".join(partial)
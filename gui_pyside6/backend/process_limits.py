@@ -0,0 +1,162 @@
+"""Process groups, resource limits and usage reporting for spawned processes."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+
+from .. import logger
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """Optional limits applied to a child process. ``None`` means unlimited.
+
+    ``cpu_seconds``, ``memory_mb`` (address space) and ``open_files`` become
+    ``RLIMIT_CPU``, ``RLIMIT_AS`` and ``RLIMIT_NOFILE``. ``nice`` is added to
+    the scheduling niceness and ``ionice`` (0-7, Linux and Windows) sets the
+    best-effort I/O priority through ``psutil`` when it is installed.
+    """
+
+    cpu_seconds: int | None = None
+    memory_mb: int | None = None
+    open_files: int | None = None
+    nice: int | None = None
+    ionice: int | None = None
+
+    @classmethod
+    def from_settings(cls, settings: dict | None) -> ResourceLimits:
+        """Build limits from the ``limit_*`` and ``process_*`` settings.
+
+        Zero, negative and missing values leave the limit unset.
+        """
+        settings = settings or {}
+
+        def positive(key: str) -> int | None:
+            try:
+                value = int(settings.get(key) or 0)
+            except (TypeError, ValueError):
+                return None
+            return value if value > 0 else None
+
+        ionice = settings.get("process_ionice")
+        try:
+            ionice = int(ionice) if ionice not in (None, "") else None
+        except (TypeError, ValueError):
+            ionice = None
+        return cls(
+            cpu_seconds=positive("limit_cpu_seconds"),
+            memory_mb=positive("limit_memory_mb"),
+            open_files=positive("limit_open_files"),
+            nice=positive("process_nice"),
+            ionice=ionice if ionice is not None and 0 <= ionice <= 7 else None,
+        )
+
+    @property
+    def active(self) -> bool:
+        return any(value is not None for value in asdict(self).values())
+
+
+@dataclass(frozen=True)
+class ProcessUsage:
+    """Resources used by a finished process and the children it waited for."""
+
+    user_seconds: float
+    system_seconds: float
+    max_rss_mb: float
+
+    def summary(self) -> str:
+        return (
+            f"CPU {self.user_seconds + self.system_seconds:.2f}s "
+            f"(user {self.user_seconds:.2f}s, system {self.system_seconds:.2f}s), "
+            f"peak memory {self.max_rss_mb:.1f} MB"
+        )
+
+
+def _rlimits(limits: ResourceLimits) -> list[tuple[int, int]]:
+    import resource
+
+    values = []
+    if limits.cpu_seconds is not None:
+        values.append((resource.RLIMIT_CPU, limits.cpu_seconds))
+    if limits.memory_mb is not None:
+        values.append((resource.RLIMIT_AS, limits.memory_mb * 1024 * 1024))
+    if limits.open_files is not None:
+        values.append((resource.RLIMIT_NOFILE, limits.open_files))
+    return values
+
+
+def popen_kwargs(limits: ResourceLimits | None = None) -> dict:
+    """Return ``Popen`` arguments for a new process group with ``limits``.
+
+    On POSIX the rlimits and niceness are applied in ``preexec_fn``. The
+    values are computed beforehand so the child only makes system calls
+    between ``fork`` and ``exec``. Windows only gets the process group.
+    """
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    kwargs: dict = {"start_new_session": True}
+    if limits is None:
+        return kwargs
+    rlimits = _rlimits(limits)
+    nice = limits.nice
+    if not rlimits and nice is None:
+        return kwargs
+
+    import resource
+
+    def apply_limits() -> None:
+        for which, value in rlimits:
+            _soft, hard = resource.getrlimit(which)
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            resource.setrlimit(which, (value, hard))
+        if nice is not None:
+            os.nice(nice)
+
+    kwargs["preexec_fn"] = apply_limits
+    return kwargs
+
+
+def apply_io_priority(process: subprocess.Popen, limits: ResourceLimits | None) -> None:
+    """Lower the I/O priority of ``process`` if ``limits.ionice`` is set."""
+    if limits is None or limits.ionice is None:
+        return
+    try:
+        import psutil  # type: ignore
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("psutil is not installed; ignoring process_ionice")
+        return
+    try:
+        proc = psutil.Process(process.pid)
+        if sys.platform.startswith("linux"):
+            proc.ionice(psutil.IOPRIO_CLASS_BE, value=limits.ionice)
+        elif os.name == "nt":
+            proc.ionice(psutil.IOPRIO_LOW if limits.ionice >= 4 else psutil.IOPRIO_NORMAL)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning(f"Could not set I/O priority: {exc}")
+
+
+def wait_with_usage(process: subprocess.Popen) -> tuple[int, ProcessUsage | None]:
+    """Wait for ``process`` and return its exit code and resource usage.
+
+    Usage comes from ``os.wait4`` and is ``None`` where that is unavailable
+    or the process was already reaped.
+    """
+    if not hasattr(os, "wait4") or process.returncode is not None:
+        return process.wait(), None
+    try:
+        _pid, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        return process.wait(), None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    usage = ProcessUsage(
+        user_seconds=rusage.ru_utime,
+        system_seconds=rusage.ru_stime,
+        max_rss_mb=rusage.ru_maxrss / divisor,
+    )
+    return process.returncode, usage
@@ -3,6 +3,8 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+from .atomic_write import write_json_atomic
+
 DEFAULT_PROVIDERS_FILE = Path(__file__).resolve().parent.parent / "resources" / "providers.json"
 USER_PROVIDERS_FILE = Path(__file__).resolve().parent.parent / "config" / "providers.json"
 
@@ -30,9 +32,7 @@ def load_providers() -> dict:
 
 def save_providers(providers: dict) -> None:
     """Persist provider mappings to the user config file."""
-    USER_PROVIDERS_FILE.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with USER_PROVIDERS_FILE.open("w", encoding="utf-8") as fh:
-            json.dump(providers, fh, indent=2)
+        write_json_atomic(USER_PROVIDERS_FILE, providers)
     except Exception:
         pass
@@ -0,0 +1,205 @@
+"""Content-addressed cache of Codex session output."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from .atomic_write import write_text_atomic
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "cache" / "results"
+
+# Settings that change the result of a run without appearing in the command
+_KEY_SETTINGS = ("provider",)
+
+# (path, mtime_ns, size) -> sha256 of the file content
+_file_hashes: dict[tuple[str, int, int], str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_digest(path: str | Path) -> str:
+    """Return the SHA-256 of ``path``, reusing it while the file is unchanged.
+
+    Missing or unreadable files hash to a marker so they still affect the key.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    stamp = (str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(stamp)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return "unreadable"
+    value = digest.hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[stamp] = value
+    return value
+
+
+def cache_key(
+    cmd: list[str],
+    settings: dict | None = None,
+    files: list[str] | None = None,
+    images: list[str] | None = None,
+    cwd: str | None = None,
+) -> str:
+    """Return the cache key for a run.
+
+    The key covers the full command line (agent flags, model and prompt), the
+    provider endpoint, the working directory and the content of every attached
+    file and image, so editing an attachment invalidates earlier results.
+    """
+    settings = settings or {}
+    provider = settings.get("provider")
+    provider_info = settings.get("providers", {}).get(provider) if provider else None
+    if not isinstance(provider_info, dict):
+        provider_info = {}
+    base = Path(cwd) if cwd else Path.cwd()
+    attachments = [
+        (kind, str(path), file_digest(base / path))
+        for kind, paths in (("file", files or []), ("image", images or []))
+        for path in paths
+        if path
+    ]
+    payload = {
+        "cmd": [str(part) for part in cmd],
+        "settings": {key: settings.get(key) for key in _KEY_SETTINGS},
+        "base_url": provider_info.get("baseURL"),
+        "cwd": str(base.resolve()),
+        "attachments": attachments,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResultCache:
+    """Store the output lines of successful runs on disk.
+
+    Entries expire after ``ttl`` seconds. The least recently used entries are
+    evicted once the cache holds more than ``max_entries`` results or more
+    than ``max_bytes`` on disk. Output larger than ``max_entry_bytes`` is not
+    cached.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        ttl: float = 24 * 3600,
+        max_bytes: int = 50 * 1024 * 1024,
+        max_entries: int = 500,
+        max_entry_bytes: int = 5 * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else CACHE_DIR
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self._lock = threading.Lock()
+        # key -> size on disk, least recently used first
+        self._index: OrderedDict[str, int] | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            entries = []
+            try:
+                for entry in os.scandir(self.directory):
+                    if entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+            except FileNotFoundError:
+                pass
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+        return self._index
+
+    def _remove(self, key: str) -> None:
+        self._load_index().pop(key, None)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str) -> list[str] | None:
+        """Return the cached lines for ``key`` or ``None``."""
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+            path = self._path(key)
+            try:
+                with path.open("r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except (OSError, json.JSONDecodeError):
+                self._remove(key)
+                return None
+            if time.time() - float(data.get("created", 0)) > self.ttl:
+                self._remove(key)
+                return None
+            index.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return list(data.get("lines", []))
+
+    def put(self, key: str, lines: list[str], cmd: list[str] | None = None) -> bool:
+        """Store ``lines`` under ``key``. Returns ``False`` if not cached."""
+        size = sum(len(line) + 1 for line in lines)
+        if size > self.max_entry_bytes:
+            return False
+        data = {"created": time.time(), "cmd": cmd or [], "lines": lines}
+        with self._lock:
+            path = self._path(key)
+            write_text_atomic(path, json.dumps(data))
+            index = self._load_index()
+            index[key] = path.stat().st_size
+            index.move_to_end(key)
+            self._evict()
+        return True
+
+    def _evict(self) -> None:
+        index = self._load_index()
+        total = sum(index.values())
+        while index and (len(index) > self.max_entries or total > self.max_bytes):
+            key, size = next(iter(index.items()))
+            self._remove(key)
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache(settings: dict | None = None) -> ResultCache:
+    """Return the shared cache configured from ``settings``."""
+    global _cache
+    settings = settings or {}
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        _cache.ttl = float(settings.get("result_cache_ttl", _cache.ttl))
+        max_mb = settings.get("result_cache_max_mb")
+        if max_mb is not None:
+            _cache.max_bytes = int(float(max_mb) * 1024 * 1024)
+        return _cache
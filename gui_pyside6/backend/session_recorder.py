@@ -0,0 +1,149 @@
+"""Record Codex output with timestamps and replay it later.
+
+Recordings are gzip-compressed JSON lines. The first line is a header
+object, every output line is stored as ``[seconds_since_start, text]`` and
+the last line is a footer object with the return code::
+
+    {"version": 1, "started_at": 1718000000.0, "cmd": [...], "prompt": "..."}
+    [0.412, "Thinking..."]
+    [0.950, "def main():"]
+    {"duration": 3.2, "return_code": 0}
+
+Replays are deterministic: the same lines are produced in the same order,
+at the original pace, ``speed`` times faster, or as fast as possible.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+RECORDINGS_DIR = Path(__file__).resolve().parent.parent / "recordings"
+FORMAT_VERSION = 1
+
+
+def recording_path(directory: Path | None = None) -> Path:
+    """Return a new timestamped path in ``directory``."""
+    directory = Path(directory) if directory is not None else RECORDINGS_DIR
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return directory / f"session-{stamp}.jsonl.gz"
+
+
+class SessionRecorder:
+    """Write output lines and their timing to a recording file."""
+
+    def __init__(self, path: str | Path, cmd: list[str] | None = None, prompt: str = "") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = gzip.open(self.path, "wt", encoding="utf-8", compresslevel=6)
+        self._start = time.monotonic()
+        self._write(
+            {
+                "version": FORMAT_VERSION,
+                "started_at": time.time(),
+                "cmd": [str(part) for part in cmd or []],
+                "prompt": prompt,
+            }
+        )
+
+    def _write(self, item) -> None:
+        self._fh.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        self._fh.write("\n")
+
+    def record(self, line: str) -> None:
+        self._write([round(time.monotonic() - self._start, 4), line])
+
+    def close(self, return_code: int | None = 0, error: str | None = None) -> None:
+        if self._fh.closed:
+            return
+        footer: dict = {
+            "duration": round(time.monotonic() - self._start, 4),
+            "return_code": return_code,
+        }
+        if error:
+            footer["error"] = error
+        self._write(footer)
+        self._fh.close()
+
+    def wrap(self, lines: Iterable[str]) -> Iterator[str]:
+        """Record every line of ``lines`` while passing it through."""
+        return_code, error = 0, None
+        try:
+            for line in lines:
+                self.record(line)
+                yield line
+        except Exception as exc:
+            return_code = getattr(exc, "return_code", None)
+            error = str(exc)
+            raise
+        finally:
+            self.close(return_code, error)
+            close = getattr(lines, "close", None)
+            if close is not None:
+                close()
+
+
+@dataclass
+class Recording:
+    """A recording loaded into memory."""
+
+    header: dict
+    events: list[tuple[float, str]] = field(default_factory=list)
+    footer: dict = field(default_factory=dict)
+
+    @property
+    def lines(self) -> list[str]:
+        return [line for _, line in self.events]
+
+
+def load_recording(path: str | Path) -> Recording:
+    """Read a recording file written by :class:`SessionRecorder`."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        header_line = fh.readline()
+        if not header_line:
+            raise ValueError(f"Empty recording: {path}")
+        header = json.loads(header_line)
+        if not isinstance(header, dict) or header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording format: {path}")
+        recording = Recording(header)
+        for raw in fh:
+            item = json.loads(raw)
+            if isinstance(item, list):
+                recording.events.append((float(item[0]), str(item[1])))
+            elif isinstance(item, dict):
+                recording.footer = item
+    return recording
+
+
+def replay(
+    recording: Recording | str | Path,
+    speed: float = 1.0,
+    stop: threading.Event | None = None,
+    sleep: Callable[[float], object] = time.sleep,
+) -> Iterator[str]:
+    """Yield the lines of ``recording`` with their original timing.
+
+    ``speed`` scales the pace (``2`` is twice as fast); ``0`` replays
+    without any delay. Setting ``stop`` ends the replay early.
+    """
+    if not isinstance(recording, Recording):
+        recording = load_recording(recording)
+    start = time.monotonic()
+    for offset, line in recording.events:
+        if stop is not None and stop.is_set():
+            return
+        if speed > 0:
+            delay = start + offset / speed - time.monotonic()
+            if delay > 0:
+                if stop is not None:
+                    if stop.wait(delay):
+                        return
+                else:
+                    sleep(delay)
+        yield line
@@ -1,6 +1,12 @@
+from __future__ import annotations
+
+import atexit
 import json
+import threading
+import weakref
 from pathlib import Path
 
+from .atomic_write import write_json_atomic, write_text_atomic
 from .provider_loader import load_providers, save_providers
 
 # Build the settings path relative to this module so the GUI can be started
@@ -41,10 +47,208 @@ DEFAULT_SETTINGS = {
     "auto_scan_files": True,
     # Timeout for the free credits command
     "redeem_timeout": 30,
+    # Backends whose environments are created in the background at startup
+    "provision_backends": [],
+    # Diffs with at least this many lines go to the Patch View instead of
+    # being printed line by line
+    "patch_view_min_lines": 200,
+    # Longer CLI output lines are split into pieces of this many characters
+    "max_output_line_chars": 65536,
+    # Replay the output of identical earlier runs from the result cache
+    "use_result_cache": False,
+    "result_cache_ttl": 24 * 3600,
+    "result_cache_max_mb": 50,
+    # Save the output of each GUI session to recordings/ for later replay
+    "record_sessions": False,
+    # Serve sessions over HTTP on localhost while the GUI is running
+    "control_server": False,
+    "control_server_port": 8765,
+    # Resource limits for the CLI and tool scripts (0 = unlimited); the
+    # memory limit caps the address space, which Node.js needs a few GB of
+    "limit_cpu_seconds": 0,
+    "limit_memory_mb": 0,
+    "limit_open_files": 0,
+    # Added niceness and best-effort I/O priority (0-7, needs psutil)
+    "process_nice": 0,
+    "process_ionice": None,
+    # Agent Logger plugin: rotate logs/agent_log.jsonl at this size or age
+    # (0 = never) and keep this many gzipped old files
+    "agent_log_max_mb": 10,
+    "agent_log_rotate_hours": 0,
+    "agent_log_backups": 5,
+    "agent_log_compress": True,
+    # Seconds between memory samples in the Diagnostics panel (0 = off)
+    "diagnostics_interval": 60,
+    # TTS Player plugin: gtts, edge, piper or kokoro, and the voice for each:
+    # a language (gtts), a voice name (edge, kokoro) or a .onnx model path
+    # (piper); empty uses the backend's default
+    "tts_backend": "gtts",
+    "tts_voice_gtts": "",
+    "tts_voice_edge": "",
+    "tts_voice_piper": "",
+    "tts_voice_kokoro": "",
+    # Size of the synthesized audio cache in cache/tts/
+    "tts_cache_mb": 100,
 }
 
 
-def load_settings() -> dict:
+class SettingsStore(dict):
+    """Settings dictionary with change tracking and coalesced, atomic writes.
+
+    Every mutation that changes a value bumps :attr:`version`, which other
+    components can use to invalidate derived caches. :meth:`save` schedules a
+    write after ``debounce`` seconds so bursts of saves hit the disk once, and
+    :meth:`flush` only rewrites files whose serialised content changed since
+    the last write.
+    """
+
+    def __init__(
+        self,
+        data: dict | None = None,
+        path: Path = SETTINGS_PATH,
+        debounce: float = 1.0,
+    ) -> None:
+        super().__init__(data or {})
+        self.path = path
+        self.debounce = debounce
+        self._version = 0
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        # Serialised content last written (or loaded) per file
+        self._written: dict[str, str] = {}
+        _stores[id(self)] = self
+
+    # ------------------------------------------------------------------
+    # Change tracking
+    # ------------------------------------------------------------------
+
+    @property
+    def version(self) -> int:
+        """Counter incremented whenever a setting changes."""
+        return self._version
+
+    @property
+    def dirty(self) -> bool:
+        """Return ``True`` if the in-memory settings differ from disk."""
+        settings_text, providers_text = self._serialise()
+        return (
+            self._written.get("settings") != settings_text
+            or self._written.get("providers") != providers_text
+        )
+
+    def mark_clean(self) -> None:
+        """Record the current contents as matching what is on disk."""
+        settings_text, providers_text = self._serialise()
+        self._written = {"settings": settings_text, "providers": providers_text}
+
+    def _changed(self) -> None:
+        self._version += 1
+
+    def __setitem__(self, key, value) -> None:
+        with self._lock:
+            if key in self and self[key] == value:
+                return
+            super().__setitem__(key, value)
+            self._changed()
+
+    def __delitem__(self, key) -> None:
+        with self._lock:
+            super().__delitem__(key)
+            self._changed()
+
+    def update(self, *args, **kwargs) -> None:  # type: ignore[override]
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):  # type: ignore[override]
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):  # type: ignore[override]
+        with self._lock:
+            had_key = key in self
+            value = super().pop(key, *default)
+            if had_key:
+                self._changed()
+            return value
+
+    def popitem(self):  # type: ignore[override]
+        with self._lock:
+            item = super().popitem()
+            self._changed()
+            return item
+
+    def clear(self) -> None:  # type: ignore[override]
+        with self._lock:
+            if self:
+                super().clear()
+                self._changed()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _serialise(self) -> tuple[str, str]:
+        with self._lock:
+            data = {k: v for k, v in self.items() if k != "providers"}
+            providers = self.get("providers", {})
+            return json.dumps(data, indent=2), json.dumps(providers, indent=2)
+
+    def save(self) -> None:
+        """Schedule a write after the debounce interval.
+
+        Repeated calls within the interval are coalesced into one write.
+        """
+        with self._lock:
+            if self._timer is not None:
+                return
+            if self.debounce <= 0:
+                timer = None
+            else:
+                timer = threading.Timer(self.debounce, self.flush)
+                timer.daemon = True
+                self._timer = timer
+        if timer is None:
+            self.flush()
+        else:
+            timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes immediately."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            settings_text, providers_text = self._serialise()
+            providers = self.get("providers", {})
+        with self._write_lock:
+            if self._written.get("settings") != settings_text:
+                write_text_atomic(self.path, settings_text)
+                self._written["settings"] = settings_text
+            if self._written.get("providers") != providers_text:
+                save_providers(providers)
+                self._written["providers"] = providers_text
+
+
+# Stores whose pending changes are written at exit; weak so that stores that
+# are no longer used can be collected
+_stores: weakref.WeakValueDictionary[int, SettingsStore] = weakref.WeakValueDictionary()
+
+
+@atexit.register
+def _flush_stores() -> None:
+    for store in list(_stores.values()):
+        store.flush()
+
+
+def read_settings() -> dict:
+    """Return the saved settings over the defaults as a plain dictionary.
+
+    Nothing is ever written back, which suits one-off commands that must not
+    overwrite changes made by a running GUI.
+    """
     settings = DEFAULT_SETTINGS.copy()
     if SETTINGS_PATH.exists():
         with SETTINGS_PATH.open("r", encoding="utf-8") as f:
@@ -52,14 +256,35 @@ def load_settings() -> dict:
                 loaded = json.load(f)
             except json.JSONDecodeError:
                 loaded = {}
-        settings.update({k: v for k, v in loaded.items() if k != "providers"})
+        if isinstance(loaded, dict):
+            settings.update({k: v for k, v in loaded.items() if k != "providers"})
     settings["providers"] = load_providers()
     return settings
 
 
+def load_settings() -> SettingsStore:
+    """Return the settings as a store that writes back only real changes."""
+    store = SettingsStore(read_settings())
+    # Defaults missing from the file are not a reason to rewrite it
+    store.mark_clean()
+    return store
+
+
 def save_settings(settings: dict) -> None:
-    SETTINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    """Persist ``settings``.
+
+    A :class:`SettingsStore` schedules a debounced write; a plain dictionary
+    is written immediately.
+    """
+    if isinstance(settings, SettingsStore):
+        settings.save()
+        return
     data = {k: v for k, v in settings.items() if k != "providers"}
-    with SETTINGS_PATH.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    write_json_atomic(SETTINGS_PATH, data)
     save_providers(settings.get("providers", {}))
+
+
+def flush_settings(settings: dict) -> None:
+    """Write any pending changes of a :class:`SettingsStore` right away."""
+    if isinstance(settings, SettingsStore):
+        settings.flush()
@@ -0,0 +1,138 @@
+"""Bounded capture of a child process's stderr."""
+
+from __future__ import annotations
+
+import atexit
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+# Spill files of this process that still exist, removed at exit
+_spill_files: set[str] = set()
+_spill_lock = threading.Lock()
+
+
+def _remove_spill_files() -> None:
+    with _spill_lock:
+        paths = list(_spill_files)
+        _spill_files.clear()
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+atexit.register(_remove_spill_files)
+
+
+def discard_spill_file(path: str | Path | None) -> None:
+    """Delete a spill file that is no longer needed."""
+    if not path:
+        return
+    with _spill_lock:
+        _spill_files.discard(str(path))
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class StderrCapture:
+    """Drain a stream on a background thread with bounded memory.
+
+    The first ``head_bytes`` and the last ``tail_bytes`` are kept in memory.
+    Once the output is larger than that, everything (including the head) is
+    also written to a temporary file whose path is :attr:`spill_path`, so
+    the full stream stays available without holding it in memory.
+    """
+
+    def __init__(
+        self,
+        stream,
+        head_bytes: int = 16 * 1024,
+        tail_bytes: int = 16 * 1024,
+        encoding: str = "utf-8",
+    ) -> None:
+        self.stream = stream
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.encoding = encoding
+        self.total_bytes = 0
+        self.spill_path: str | None = None
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill = None
+        self._thread = threading.Thread(
+            target=self._drain, name="codex-stderr", daemon=True
+        )
+
+    def start(self) -> StderrCapture:
+        self._thread.start()
+        return self
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_bytes > len(self._head) + len(self._tail)
+
+    def _drain(self) -> None:
+        raw = getattr(self.stream, "buffer", self.stream)
+        read = getattr(raw, "read1", raw.read)
+        try:
+            while True:
+                chunk = read(64 * 1024)
+                if not chunk:
+                    break
+                if isinstance(chunk, str):
+                    chunk = chunk.encode(self.encoding)
+                self._add(chunk)
+        except (OSError, ValueError):
+            # The stream was closed underneath us
+            pass
+        finally:
+            if self._spill is not None:
+                self._spill.close()
+
+    def _add(self, chunk: bytes) -> None:
+        self.total_bytes += len(chunk)
+        if self._spill is not None:
+            self._spill.write(chunk)
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+            chunk = chunk[room:]
+        if not chunk:
+            return
+        self._tail += chunk
+        if len(self._tail) > self.tail_bytes:
+            if self._spill is None:
+                self._open_spill()
+            del self._tail[: len(self._tail) - self.tail_bytes]
+
+    def _open_spill(self) -> None:
+        fd, path = tempfile.mkstemp(prefix="codex-stderr-", suffix=".log")
+        with _spill_lock:
+            _spill_files.add(path)
+        self.spill_path = path
+        self._spill = os.fdopen(fd, "wb")
+        # Nothing was dropped yet, so head and tail hold the whole stream
+        self._spill.write(self._head)
+        self._spill.write(self._tail)
+
+    def text(self) -> str:
+        """Return the captured output, with a marker where bytes were dropped."""
+        head = self._head.decode(self.encoding, errors="replace")
+        if not self.truncated:
+            return head + self._tail.decode(self.encoding, errors="replace")
+        omitted = self.total_bytes - len(self._head) - len(self._tail)
+        tail = self._tail.decode(self.encoding, errors="replace")
+        return f"{head}\n... [{omitted} bytes omitted] ...\n{tail}"
+
+    def discard(self) -> None:
+        """Delete the spill file, if any."""
+        discard_spill_file(self.spill_path)
+        self.spill_path = None
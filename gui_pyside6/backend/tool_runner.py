@@ -9,6 +9,12 @@ from collections.abc import Callable
 from .. import logger
 
 from .backend_installer import ensure_backend_installed
+from .process_limits import (
+    ResourceLimits,
+    apply_io_priority,
+    popen_kwargs,
+    wait_with_usage,
+)
 
 
 def run_tool_script(
@@ -16,19 +22,30 @@ def run_tool_script(
     env_path: Path | None = None,
     backend_name: str | None = None,
     log_fn: Callable[[str, str], None] | None = None,
+    limits: ResourceLimits | None = None,
 ) -> tuple[int, str, str]:
-    """Run a Python script from the /tools folder, installing backend deps."""
+    """Run a Python script from the /tools folder, installing backend deps.
+
+    The script runs in its own process group with the optional resource
+    ``limits``; its CPU time and peak memory are logged when it exits.
+    """
     if not script_path.exists():
         raise FileNotFoundError(f"Script not found: {script_path}")
 
+    python = Path(sys.executable)
     if backend_name:
         msg = f"Ensuring backend '{backend_name}' is installed"
         logger.info(msg)
         if log_fn:
             log_fn(msg, "info")
-        ensure_backend_installed(backend_name)
+        backend_python = ensure_backend_installed(backend_name)
+        if backend_python:
+            # Run inside the backend's own environment when it has one
+            python = backend_python
+            if env_path is None and python != Path(sys.executable):
+                env_path = python.parent.parent
 
-    cmd = [sys.executable, str(script_path)]
+    cmd = [str(python), str(script_path)]
     cwd = script_path.parent
     start_ts = datetime.now()
     start = time.monotonic()
@@ -43,7 +60,10 @@ def run_tool_script(
 
     env = None
     if env_path:
-        env = {"VIRTUAL_ENV": str(env_path), **os.environ}
+        env = {**os.environ, "VIRTUAL_ENV": str(env_path)}
+        bin_dir = python.parent
+        if bin_dir.parent == Path(env_path):
+            env["PATH"] = os.pathsep.join([str(bin_dir), env.get("PATH", "")])
 
     process = subprocess.Popen(
         cmd,
@@ -52,7 +72,9 @@ def run_tool_script(
         text=True,
         env=env,
         cwd=cwd,
+        **popen_kwargs(limits),
     )
+    apply_io_priority(process, limits)
 
     stdout_lines: list[str] = []
     assert process.stdout is not None
@@ -64,11 +86,15 @@ def run_tool_script(
             if log_fn:
                 log_fn(line, "info")
 
-    process.wait()
+    _, usage = wait_with_usage(process)
     duration = time.monotonic() - start
     logger.info(f"Script exited with code {process.returncode} in {duration:.2f}s")
     if log_fn:
         log_fn(f"Return code: {process.returncode} (duration {duration:.2f}s)", "info")
+    if usage is not None:
+        logger.info(f"Resource usage: {usage.summary()}")
+        if log_fn:
+            log_fn(f"Resource usage: {usage.summary()}", "info")
 
     stdout = "\n".join(stdout_lines)
     return process.returncode, stdout, ""
@@ -0,0 +1,341 @@
+"""Text-to-speech synthesis in chunks with an on-disk audio cache.
+
+Text is split into sentence-sized chunks. All chunks of a request that are
+not cached are synthesized by one helper process running in the backend's
+environment (see :mod:`backend_installer`), so a model is loaded once per
+request, and each chunk is reported as soon as its file is written. Callers
+can start playing the first chunk while later ones are still rendering.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from .backend_installer import ensure_backend_installed
+from .stderr_capture import StderrCapture
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "cache" / "tts"
+
+
+class TtsError(RuntimeError):
+    """Raised when speech could not be synthesized."""
+
+
+# Runs in the backend environment after the backend's ``synth`` definition.
+# Reads {"voice": ..., "chunks": [{"text", "part", "out"}]} from stdin and
+# prints each output path once the file is complete.
+_DRIVER = """
+import json, os, sys
+job = json.load(sys.stdin)
+for chunk in job["chunks"]:
+    synth(chunk["text"], job["voice"], chunk["part"])
+    os.replace(chunk["part"], chunk["out"])
+    print(chunk["out"], flush=True)
+"""
+
+_GTTS = """
+from gtts import gTTS
+
+def synth(text, voice, out):
+    gTTS(text, lang=voice or "en").save(out)
+"""
+
+_EDGE = """
+import asyncio
+import edge_tts
+
+def synth(text, voice, out):
+    asyncio.run(edge_tts.Communicate(text, voice or "en-US-AriaNeural").save(out))
+"""
+
+_PIPER = """
+import wave
+try:
+    from piper import PiperVoice
+except ImportError:
+    from piper.voice import PiperVoice
+_voice = None
+
+def synth(text, voice, out):
+    global _voice
+    if not voice:
+        sys.exit("Set tts_voice_piper to the path of a Piper .onnx voice model")
+    if _voice is None:
+        _voice = PiperVoice.load(voice)
+    with wave.open(out, "wb") as wav:
+        if hasattr(_voice, "synthesize_wav"):
+            _voice.synthesize_wav(text, wav)
+        else:
+            _voice.synthesize(text, wav)
+"""
+
+_KOKORO = """
+import numpy as np
+import soundfile as sf
+from kokoro import KPipeline
+_pipeline = None
+
+def synth(text, voice, out):
+    global _pipeline
+    voice = voice or "af_heart"
+    if _pipeline is None:
+        _pipeline = KPipeline(lang_code=voice[0])
+    audio = [np.asarray(piece) for _, _, piece in _pipeline(text, voice=voice)]
+    sf.write(out, np.concatenate(audio) if audio else np.zeros(0), 24000)
+"""
+
+
+@dataclass(frozen=True)
+class TtsBackend:
+    """How to synthesize speech with one backend.
+
+    ``script`` defines ``synth(text, voice, out)`` and runs in the
+    interpreter that :func:`ensure_backend_installed` returns for ``name``,
+    or in the GUI's interpreter if ``install`` is false.
+    """
+
+    name: str
+    extension: str
+    script: str
+    offline: bool = False
+    install: bool = True
+
+
+BACKENDS: dict[str, TtsBackend] = {}
+
+
+def register_backend(backend: TtsBackend) -> None:
+    BACKENDS[backend.name] = backend
+
+
+register_backend(TtsBackend("gtts", ".mp3", _GTTS))
+register_backend(TtsBackend("edge", ".mp3", _EDGE))
+register_backend(TtsBackend("piper", ".wav", _PIPER, offline=True))
+register_backend(TtsBackend("kokoro", ".wav", _KOKORO, offline=True))
+
+def voice_setting(backend: str) -> str:
+    """Return the settings key holding the voice for ``backend``."""
+    return f"tts_voice_{backend}"
+
+
+def voice_for(settings: dict, backend: str) -> str:
+    """Return the configured voice for ``backend``, or ``""`` for its default.
+
+    A voice only means something to one backend, so each has its own key.
+    """
+    return str(settings.get(voice_setting(backend)) or "")
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n\s*")
+
+
+def split_chunks(text: str, max_chars: int = 300) -> list[str]:
+    """Split ``text`` into chunks of whole sentences up to ``max_chars``.
+
+    The first chunk is a single sentence so playback can start quickly.
+    Sentences longer than ``max_chars`` are split between words.
+    """
+    pieces: list[str] = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+
+    chunks: list[str] = []
+    for piece in pieces:
+        if len(chunks) > 1 and len(chunks[-1]) + 1 + len(piece) <= max_chars:
+            chunks[-1] += " " + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+class AudioCache:
+    """Synthesized audio files keyed by backend, voice and text.
+
+    The least recently used files are deleted once the cache holds more
+    than ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path | None = None, max_bytes: int = 100 * 1024 * 1024) -> None:
+        self.directory = Path(directory) if directory is not None else CACHE_DIR
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # file name -> size on disk, least recently used first
+        self._index: OrderedDict[str, int] | None = None
+
+    def path_for(self, backend: TtsBackend, voice: str, text: str) -> Path:
+        key = hashlib.sha256(f"{backend.name}\0{voice}\0{text}".encode("utf-8"))
+        return self.directory / f"{key.hexdigest()}{backend.extension}"
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            entries = []
+            try:
+                for entry in os.scandir(self.directory):
+                    if ".part" not in entry.name:
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name, stat.st_size))
+            except FileNotFoundError:
+                pass
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+        return self._index
+
+    def get(self, path: Path) -> Path | None:
+        """Return ``path`` if it is cached and mark it as recently used."""
+        with self._lock:
+            index = self._load_index()
+            if path.name not in index:
+                return None
+            if not path.exists():
+                index.pop(path.name, None)
+                return None
+            index.move_to_end(path.name)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+
+    def add(self, path: Path, keep: set[str] | None = None) -> None:
+        """Record a newly written file and evict old ones.
+
+        Files named in ``keep`` (still queued for playback) are not evicted.
+        """
+        with self._lock:
+            index = self._load_index()
+            index[path.name] = path.stat().st_size
+            index.move_to_end(path.name)
+            total = sum(index.values())
+            for name in list(index):
+                if total <= self.max_bytes:
+                    break
+                if name == path.name or (keep and name in keep):
+                    continue
+                total -= index.pop(name)
+                try:
+                    (self.directory / name).unlink()
+                except FileNotFoundError:
+                    pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in list(self._load_index()):
+                try:
+                    (self.directory / name).unlink()
+                except FileNotFoundError:
+                    pass
+            self._index = OrderedDict()
+
+
+def _kill_on_stop(process: subprocess.Popen, stop: threading.Event) -> None:
+    while process.poll() is None:
+        if stop.wait(0.1):
+            process.kill()
+            return
+
+
+def synthesize(
+    text: str,
+    backend: str | TtsBackend,
+    voice: str = "",
+    cache: AudioCache | None = None,
+    stop: threading.Event | None = None,
+    max_chars: int = 300,
+) -> Iterator[Path]:
+    """Yield audio files for the chunks of ``text`` in order.
+
+    Cached chunks are yielded right away; the others are yielded as the
+    helper process finishes them. Setting ``stop`` ends synthesis early and
+    kills the helper process, even while a chunk is rendering.
+    """
+    spec = BACKENDS.get(backend) if isinstance(backend, str) else backend
+    if spec is None:
+        raise TtsError(f"Unknown TTS backend: {backend}")
+    cache = cache or AudioCache()
+    chunks = split_chunks(text, max_chars)
+    paths = [cache.path_for(spec, voice, chunk) for chunk in chunks]
+    missing = [
+        (chunk, path) for chunk, path in zip(chunks, paths) if cache.get(path) is None
+    ]
+    wanted = {path.name for path in paths}
+
+    process = None
+    stderr = None
+    if missing:
+        if spec.install:
+            python = ensure_backend_installed(spec.name)
+            if python is None:
+                raise TtsError(f"Could not install the {spec.name} backend")
+        else:
+            python = Path(sys.executable)
+        cache.directory.mkdir(parents=True, exist_ok=True)
+        job = {
+            "voice": voice,
+            "chunks": [
+                {
+                    "text": chunk,
+                    "part": str(path.with_name(path.stem + ".part" + path.suffix)),
+                    "out": str(path),
+                }
+                for chunk, path in missing
+            ],
+        }
+        process = subprocess.Popen(
+            [str(python), "-c", spec.script + _DRIVER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+        )
+        stderr = StderrCapture(process.stderr).start()
+        process.stdin.write(json.dumps(job))
+        process.stdin.close()
+        if stop is not None:
+            # Reading the next path blocks while a chunk renders, so the
+            # helper is killed from here as soon as stop is set
+            threading.Thread(
+                target=_kill_on_stop, args=(process, stop), daemon=True
+            ).start()
+
+    pending = {path.name for _, path in missing}
+    try:
+        for path in paths:
+            if stop is not None and stop.is_set():
+                return
+            if path.name in pending:
+                line = process.stdout.readline().strip()
+                if line != str(path):
+                    break
+                pending.discard(path.name)
+                cache.add(path, keep=wanted)
+            yield path
+    finally:
+        if process is not None:
+            if process.poll() is None and (pending or (stop and stop.is_set())):
+                process.kill()
+            return_code = process.wait()
+            stderr.join(5.0)
+            stderr.discard()
+            if pending and not (stop and stop.is_set()) and return_code:
+                message = stderr.text().strip().splitlines()
+                raise TtsError(
+                    message[-1] if message else f"{spec.name} exited with {return_code}"
+                )
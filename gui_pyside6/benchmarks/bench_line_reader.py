@@ -0,0 +1,85 @@
+"""Compare reading CLI output in text mode against ``iter_lines``.
+
+Run from the repository root::
+
+    python -m gui_pyside6.benchmarks.bench_line_reader
+
+A child process writes the same output for each reader: once read with
+``text=True, bufsize=1`` and ``rstrip`` per line, as ``start_session`` used
+to, and once through the binary ``iter_lines`` reader. Besides the time, the
+peak memory traced while reading is shown; the ``long line`` scenario writes
+a single line without a newline, which text mode has to hold in full.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from gui_pyside6.backend.line_reader import iter_lines
+
+WRITER = """
+import sys
+block = ("x" * {width} + {end!r}).encode() * 1000
+for _ in range({lines} // 1000):
+    sys.stdout.buffer.write(block)
+"""
+
+
+def _spawn(lines: int, width: int, end: str, **kwargs) -> subprocess.Popen:
+    code = WRITER.format(lines=lines, width=width, end=end)
+    return subprocess.Popen(
+        [sys.executable, "-c", code], stdout=subprocess.PIPE, **kwargs
+    )
+
+
+def read_text_mode(lines: int, width: int, end: str) -> int:
+    process = _spawn(lines, width, end, text=True, bufsize=1)
+    count = sum(1 for line in process.stdout if line.rstrip("\n") is not None)
+    process.wait()
+    return count
+
+
+def read_iter_lines(lines: int, width: int, end: str) -> int:
+    process = _spawn(lines, width, end, bufsize=0)
+    count = sum(1 for _ in iter_lines(process.stdout))
+    process.wait()
+    return count
+
+
+def measure(reader, lines: int, width: int, end: str, repeat: int) -> tuple[float, float]:
+    """Return the best time in seconds and the peak traced memory in MB."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        reader(lines, width, end)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    reader(lines, width, end)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=2_000_000)
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    size_mb = args.lines * (args.width + 1) / 1e6
+    scenarios = (("short lines", "\n"), ("long line", "x"))
+    readers = (("text mode", read_text_mode), ("iter_lines", read_iter_lines))
+    for title, end in scenarios:
+        print(f"{title} ({size_mb:.0f} MB)")
+        for name, reader in readers:
+            seconds, peak = measure(reader, args.lines, args.width, end, args.repeat)
+            print(f"  {name:>10}: {seconds:.3f}s, peak {peak:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Replay a recorded session through the main window and time it.
+
+Run from the repository root::
+
+    QT_QPA_PLATFORM=offscreen python -m gui_pyside6.benchmarks.bench_replay session.jsonl.gz
+
+Recordings come from the ``record_sessions`` setting or
+``headless run --record``. Without a file a synthetic recording mixing prose,
+code and a diff is generated. The replay runs at maximum speed through
+``ReplayWorker`` and ``MainWindow.append_output``, so the output view,
+highlighter, diff detection and history store are all exercised without the
+CLI. History is written to a temporary database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from PySide6.QtWidgets import QApplication
+
+from gui_pyside6.backend import session_recorder
+from gui_pyside6.backend.agent_manager import AgentManager
+from gui_pyside6.backend.history_store import HistoryStore
+from gui_pyside6.ui.main_window import MainWindow
+
+SAMPLE = [
+    "I updated the handler so that empty requests return early:",
+    "```python",
+    "def handle(request, *args, **kwargs):",
+    "    if request is None or not args:  # nothing to do",
+    "        return None",
+    "```",
+    "diff --git a/app.py b/app.py",
+    "--- a/app.py",
+    "+++ b/app.py",
+    "@@ -1,2 +1,2 @@",
+    "-old = 1",
+    "+new = 2",
+    "Running tests: 27 passed, 1 failed in 3.21s",
+]
+
+
+def synthetic_recording(path: Path, lines: int) -> Path:
+    recorder = session_recorder.SessionRecorder(path, prompt="synthetic")
+    for i in range(lines):
+        recorder.record(SAMPLE[i % len(SAMPLE)])
+    recorder.close()
+    return path
+
+
+def replay_once(app: QApplication, path: Path, history_path: Path) -> float:
+    store = HistoryStore(history_path)
+    window = MainWindow(AgentManager(), {}, history_store=store)
+    start = time.perf_counter()
+    window.replay_session(path, speed=0)
+    # session_finished releases the worker once the replay is done
+    while window.worker is not None:
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    window.close()
+    store.close()
+    return elapsed
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", nargs="?", help="recording to replay")
+    parser.add_argument("--lines", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if args.recording:
+            path = Path(args.recording)
+        else:
+            path = synthetic_recording(tmp_dir / "synthetic.jsonl.gz", args.lines)
+        count = len(session_recorder.load_recording(path).events)
+        best = min(
+            replay_once(app, path, tmp_dir / f"history-{i}.sqlite3")
+            for i in range(args.repeat)
+        )
+    print(f"{count} lines in {best:.3f}s ({count / best:,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
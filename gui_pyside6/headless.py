@@ -0,0 +1,227 @@
+"""Command line front end for the Codex backend that never imports Qt.
+
+Usage::
+
+    python -m gui_pyside6.headless run "Explain main.py" --file main.py
+    python -m gui_pyside6.headless batch prompts.jsonl -o results.jsonl
+    python -m gui_pyside6.headless agents
+    python -m gui_pyside6.headless replay session.jsonl.gz --speed 0
+    python -m gui_pyside6.headless serve --port 8765
+
+Settings, agents, the result cache and the CLI flags are the same as in the
+GUI. Output lines go to stdout, errors to stderr. ``run`` exits with the
+Codex return code, or ``2`` when the CLI or credentials are missing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import shlex
+import sys
+
+from .backend import codex_adapter
+from .backend.agent_manager import AgentManager
+from .backend.settings_manager import read_settings
+from .utils.api_key import lookup_api_key, lookup_base_url
+
+# Providers that run without an API key, as in MainWindow.start_codex
+_KEYLESS_PROVIDERS = {"local", "ollama", "custom"}
+
+
+def _settings(args: argparse.Namespace) -> dict:
+    # Not a store, so command line overrides are never written back
+    settings = read_settings()
+    if args.provider:
+        settings["provider"] = args.provider
+    if args.model:
+        settings["model"] = args.model
+    if args.cli_path:
+        settings["cli_path"] = args.cli_path
+    return settings
+
+
+def _check_credentials(settings: dict) -> str | None:
+    """Return an error message if the provider has no key or base URL."""
+    provider = settings.get("provider", "openai")
+    if provider in _KEYLESS_PROVIDERS:
+        return None
+    if not lookup_api_key(provider):
+        return (
+            f"No API key for provider '{provider}'. Set "
+            f"{provider.upper()}_API_KEY or OPENAI_API_KEY."
+        )
+    info = settings.get("providers", {}).get(provider, {})
+    if not lookup_base_url(provider, info.get("baseURL")):
+        return (
+            f"No base URL for provider '{provider}'. Set "
+            f"{provider.upper()}_BASE_URL or OPENAI_BASE_URL."
+        )
+    return None
+
+
+def _select_agent(manager: AgentManager, settings: dict, name: str | None) -> dict:
+    name = name or settings.get("selected_agent", "")
+    if name and manager.get_agent(name) is None:
+        raise SystemExit(f"Unknown agent: {name}")
+    return manager.get_agent(name) or manager.active_agent or {}
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    settings = _settings(args)
+    agent = _select_agent(AgentManager(), settings, args.agent)
+    prompt = args.prompt
+    if prompt == "-":
+        prompt = sys.stdin.read().strip()
+
+    cmd = codex_adapter.build_command(
+        prompt,
+        agent,
+        settings,
+        view=args.view,
+        images=args.image,
+        files=args.file,
+        cwd=args.cwd,
+    )
+    if args.print_command:
+        print(shlex.join(cmd))
+        return 0
+
+    try:
+        codex_adapter.ensure_cli_available(settings)
+    except FileNotFoundError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    error = _check_credentials(settings)
+    if error:
+        print(error, file=sys.stderr)
+        return 2
+
+    try:
+        for line in codex_adapter.start_session(
+            prompt,
+            agent,
+            settings,
+            view=args.view,
+            images=args.image,
+            files=args.file,
+            cwd=args.cwd,
+            cmd=cmd,
+            use_cache=args.cache,
+            record_to=args.record,
+        ):
+            print(line, flush=True)
+    except codex_adapter.CodexError as exc:
+        sys.stderr.write(exc.stderr)
+        print(exc, file=sys.stderr)
+        return exc.return_code or 1
+    except KeyboardInterrupt:
+        codex_adapter.stop_session()
+        return 130
+    return 0
+
+
+def cmd_replay(args: argparse.Namespace) -> int:
+    from .backend import session_recorder
+
+    try:
+        recording = session_recorder.load_recording(args.recording)
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    try:
+        for line in session_recorder.replay(recording, speed=args.speed):
+            print(line, flush=True)
+    except KeyboardInterrupt:
+        return 130
+    return int(recording.footer.get("return_code") or 0)
+
+
+def cmd_batch(argv: list[str]) -> int:
+    from .backend import batch_runner
+
+    return batch_runner.main(argv)
+
+
+def cmd_serve(argv: list[str]) -> int:
+    from .backend import control_server
+
+    return control_server.main(argv)
+
+
+def cmd_agents(args: argparse.Namespace) -> int:
+    settings = read_settings()
+    selected = settings.get("selected_agent", "")
+    for agent in AgentManager().agents:
+        name = agent.get("name", "")
+        marker = "*" if name == selected else " "
+        description = agent.get("description", "")
+        print(f"{marker} {name}" + (f" - {description}" if description else ""))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m gui_pyside6.headless",
+        description="Run Codex sessions without the GUI.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run a single prompt")
+    run.add_argument("prompt", help="prompt text, or - to read it from stdin")
+    run.add_argument("--agent", help="agent name (default: selected agent)")
+    run.add_argument("--file", action="append", default=[], help="attach a file")
+    run.add_argument("--image", action="append", default=[], help="attach an image")
+    run.add_argument("--cwd", help="working directory for the CLI")
+    run.add_argument("--view", help="rollout file to view")
+    run.add_argument("--model", help="override the model setting")
+    run.add_argument("--provider", help="override the provider setting")
+    run.add_argument("--cli-path", help="override the Codex CLI path")
+    run.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="use the result cache (default: use_result_cache setting)",
+    )
+    run.add_argument(
+        "--print-command",
+        action="store_true",
+        help="print the CLI command instead of running it",
+    )
+    run.add_argument(
+        "--record",
+        metavar="PATH",
+        help="save the output with its timing for replay",
+    )
+    run.set_defaults(func=cmd_run)
+
+    replay = sub.add_parser("replay", help="print a recorded session")
+    replay.add_argument("recording", help="file written by run --record")
+    replay.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="playback speed factor; 0 replays without delays (default: 1)",
+    )
+    replay.set_defaults(func=cmd_replay)
+
+    # Arguments after "batch" and "serve" are handed to their modules unparsed
+    sub.add_parser("batch", help="run a prompt list (see batch --help)")
+    sub.add_parser("serve", help="start the local control server (see serve --help)")
+
+    agents = sub.add_parser("agents", help="list available agents")
+    agents.set_defaults(func=cmd_agents)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["batch"]:
+        return cmd_batch(argv[1:])
+    if argv[:1] == ["serve"]:
+        return cmd_serve(argv[1:])
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
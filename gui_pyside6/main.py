@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import os
 import sys
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QColor, QPalette
 from PySide6.QtCore import Qt
 
+from . import logger
 from .backend.settings_manager import load_settings
 from .backend.agent_manager import AgentManager
+from .backend.backend_installer import provision_backends, shutdown_provisioning
 from .ui import MainWindow
+from .ui.workers import worker_pool
 
 
 def apply_theme(app: QApplication, theme: str) -> None:
@@ -39,14 +43,47 @@ def main() -> None:
 
     settings = load_settings()
     apply_theme(app, settings.get("theme", "System"))
+    if settings.get("provision_backends"):
+        provision_backends(list(settings["provision_backends"]))
+    app.aboutToQuit.connect(shutdown_provisioning)
     agent_manager = AgentManager()
     agent_manager.set_active_agent(settings.get("selected_agent", ""))
 
+    server_error = None
+    if settings.get("control_server"):
+        from .backend.control_server import ControlServer
+
+        port = int(settings.get("control_server_port", 8765))
+        try:
+            server = ControlServer(
+                settings,
+                agent_manager,
+                port=port,
+                token=os.getenv("CODEX_GUI_SERVER_TOKEN"),
+            )
+        except OSError as exc:
+            # e.g. the port is taken; the GUI works without the server
+            server_error = f"Control server not started on port {port}: {exc}"
+            logger.error(server_error)
+        else:
+            server.start()
+            if server.token_path is not None:
+                print(
+                    f"Control server on {server.address}, token in {server.token_path}",
+                    file=sys.stderr,
+                )
+            app.aboutToQuit.connect(server.shutdown)
+
     window = MainWindow(agent_manager, settings)
     window.resize(800, 600)
     window.show()
+    if server_error:
+        window.status_bar.showMessage(server_error)
 
-    sys.exit(app.exec())
+    code = app.exec()
+    # Let background jobs that are still finishing release their resources
+    worker_pool().waitForDone(5000)
+    sys.exit(code)
 
 
 if __name__ == "__main__":
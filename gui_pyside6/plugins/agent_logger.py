@@ -1,30 +1,240 @@
-"""Plugin that logs prompts and responses to a file."""
+"""Plugin that logs prompts and responses to a file.
+
+Records are JSON lines with the session id and timings. They are handed to
+a background thread through a queue and written in batches, so logging
+never touches the disk on the GUI thread. The log lives in ``logs/`` and is
+rotated by size and, optionally, by age; rotated files can be gzipped.
+"""
 
 from __future__ import annotations
 
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
 from pathlib import Path
-from datetime import datetime
+
+LOG_PATH = Path(__file__).resolve().parent.parent / "logs" / "agent_log.jsonl"
+
+# Marks the end of the queue for the writer thread
+_CLOSE = object()
+
+
+class AgentLogWriter:
+    """Append JSON records to ``path`` from a background thread.
+
+    Records are written once ``batch_size`` of them are queued or
+    ``flush_interval`` seconds have passed. Before a batch would push the
+    file past ``max_bytes``, or when it is older than ``rotate_seconds``,
+    the file is renamed to ``<name>.1`` (``.1.gz`` with ``compress``) and
+    at most ``backup_count`` old files are kept. ``0`` disables a limit.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = LOG_PATH,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        rotate_seconds: float = 0,
+        compress: bool = True,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._fh = None
+        self._opened_at = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name="agent-logger", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, record: dict) -> None:
+        """Queue ``record``; returns immediately."""
+        self._queue.put(record)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Write what is queued, close the file and stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        batch: list[str] = []
+        deadline = None
+        closing = False
+        while not closing:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _CLOSE:
+                closing = True
+            elif item is not None:
+                batch.append(json.dumps(item, ensure_ascii=False, default=str))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                self._write_batch(batch)
+                batch = []
+            deadline = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def _write_batch(self, lines: list[str]) -> None:
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            if self._fh is None:
+                self._open()
+            if self._should_rotate(len(data)):
+                self._rotate()
+            self._fh.write(data)
+            self._fh.flush()
+        except OSError as exc:
+            # Logging must never take the GUI down; drop the batch
+            print(f"Agent logger could not write {self.path}: {exc}")
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("ab")
+        self._opened_at = time.time()
+
+    def _should_rotate(self, incoming: int) -> bool:
+        size = self._fh.tell()
+        if not size:
+            return False
+        if self.max_bytes and size + incoming > self.max_bytes:
+            return True
+        return bool(
+            self.rotate_seconds and time.time() - self._opened_at >= self.rotate_seconds
+        )
+
+    def _backup_name(self, index: int) -> Path:
+        suffix = f".{index}.gz" if self.compress else f".{index}"
+        return self.path.with_name(self.path.name + suffix)
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        self._fh = None
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = self._backup_name(index)
+                if source.exists():
+                    os.replace(source, self._backup_name(index + 1))
+            target = self._backup_name(1)
+            if self.compress:
+                with self.path.open("rb") as src, gzip.open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                self.path.unlink()
+            else:
+                os.replace(self.path, target)
+        else:
+            self.path.unlink()
+        self._open()
+
+
+_writer: AgentLogWriter | None = None
+
+
+def get_writer(settings: dict | None = None) -> AgentLogWriter:
+    """Return the shared writer, creating it from the ``agent_log_*`` settings."""
+    global _writer
+    settings = settings or {}
+    if _writer is None:
+        _writer = AgentLogWriter(
+            LOG_PATH,
+            max_bytes=int(float(settings.get("agent_log_max_mb", 10)) * 1024 * 1024),
+            backup_count=int(settings.get("agent_log_backups", 5)),
+            rotate_seconds=float(settings.get("agent_log_rotate_hours", 0)) * 3600,
+            compress=bool(settings.get("agent_log_compress", True)),
+        )
+    return _writer
+
+
+@atexit.register
+def close_writer() -> None:
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
 
 
 def register(window) -> None:
     """Register the plugin with the main window."""
-    log_file = Path("agent_log.txt")
+    writer = get_writer(getattr(window, "settings", None))
+    state: dict = {"session": None, "start": 0.0, "lines": 0}
+
+    def elapsed() -> float:
+        return round(time.monotonic() - state["start"], 3)
 
     def log_prompt() -> None:
-        prompt = window.prompt_edit.toPlainText()
+        # Connected after MainWindow.start_codex, so a started run already
+        # has its history session; the same id is used in gui.log
+        session = window.current_session_id
+        if session is None:
+            return
         current = window.agent_list.currentItem()
-        agent = current.text() if current else ""
-        with log_file.open("a", encoding="utf-8") as fh:
-            fh.write(f"\n[{datetime.now().isoformat()}] Agent: {agent}\n")
-            fh.write(prompt + "\n")
+        state.update(session=session, start=time.monotonic(), lines=0)
+        writer.write(
+            {
+                "ts": round(time.time(), 3),
+                "event": "prompt",
+                "session": state["session"],
+                "agent": current.text() if current else "",
+                "text": window.prompt_edit.toPlainText(),
+            }
+        )
 
     def wrap_append(original_func):
         def inner(text: str) -> None:
-            with log_file.open("a", encoding="utf-8") as fh:
-                fh.write(text + "\n")
+            state["lines"] += 1
+            writer.write(
+                {
+                    "ts": round(time.time(), 3),
+                    "event": "output",
+                    "session": state["session"],
+                    "t": elapsed() if state["session"] else None,
+                    "text": text,
+                }
+            )
             original_func(text)
 
         return inner
 
+    def wrap_finished(original_func):
+        def inner() -> None:
+            if state["session"] is not None:
+                writer.write(
+                    {
+                        "ts": round(time.time(), 3),
+                        "event": "finished",
+                        "session": state["session"],
+                        "duration": elapsed(),
+                        "lines": state["lines"],
+                    }
+                )
+            original_func()
+
+        return inner
+
     window.run_btn.clicked.connect(log_prompt)
     window.append_output = wrap_append(window.append_output)
+    window.session_finished = wrap_finished(window.session_finished)
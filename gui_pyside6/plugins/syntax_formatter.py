@@ -1,64 +1,243 @@
-"""Plugin that adds a Format button to the main window."""
+"""Plugin that adds a Format button to the main window.
+
+Fenced code blocks in the prompt are formatted with the formatter registered
+for their language; a prompt without fences is formatted as a whole (JSON
+if it parses as JSON, Python otherwise). Formatting runs on a worker thread
+and results are memoized by language and content hash.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import importlib
+import json
+import re
+import shutil
 import subprocess
-import sys
-import tempfile
-from pathlib import Path
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
 
+from PySide6.QtCore import Signal
 from PySide6.QtWidgets import QPushButton
 
+from ..backend.backend_installer import ensure_backend_installed
+from ..ui.workers import PooledWorker
+from ..utils.highlighter import canonical_language
 
-def _ensure_black() -> None:
-    """Ensure the ``black`` package is available."""
-    try:
-        import black  # type: ignore  # noqa: F401
-    except Exception:  # pylint: disable=broad-except
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "black"])
 
+class FormatError(Exception):
+    """Raised by a formatter that cannot format its input."""
+
+
+class FormatterUnavailable(FormatError):
+    """Raised when the tool behind a formatter is missing.
+
+    Unlike other errors this is not memoized, so formatting works once the
+    tool has been installed.
+    """
+
+
+# Formatters take source text and return it formatted or raise FormatError
+Formatter = Callable[[str], str]
+_formatters: dict[str, Formatter] = {}
+
+_CACHE_SIZE = 128
+_cache: OrderedDict[tuple[str, str], tuple[str | None, str | None]] = OrderedDict()
+_cache_lock = threading.Lock()
 
-def _format_text(text: str) -> tuple[str | None, str | None]:
-    """Format the given Python code using ``black``."""
-    with tempfile.NamedTemporaryFile("w+", delete=False, suffix=".py") as tmp:
-        tmp.write(text)
-        tmp.flush()
-        tmp_path = Path(tmp.name)
+_FENCE_RE = re.compile(r"^```[ \t]*([\w+#.-]*)[^\n]*\n(.*?)^```[ \t]*$", re.M | re.S)
 
+
+def register_formatter(language: str, formatter: Formatter) -> None:
+    """Use ``formatter`` for ``language`` (a name or alias, e.g. ``"py"``)."""
+    _formatters[canonical_language(language) or language.lower()] = formatter
+    clear_cache()
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _run_stdin(cmd: list[str], text: str) -> str:
     result = subprocess.run(
-        [sys.executable, "-m", "black", "-q", str(tmp_path)],
-        capture_output=True,
-        text=True,
+        cmd, input=text, capture_output=True, text=True, encoding="utf-8"
     )
     if result.returncode != 0:
-        error = result.stderr.strip() or "Formatting failed"
-        tmp_path.unlink(missing_ok=True)
-        return None, error
-    formatted = tmp_path.read_text(encoding="utf-8")
-    tmp_path.unlink(missing_ok=True)
-    return formatted, None
+        raise FormatError(result.stderr.strip() or f"{cmd[0]} failed")
+    return result.stdout
+
+
+def _import_black():
+    try:
+        return importlib.import_module("black")
+    except ImportError:
+        return None
+
+
+def format_python(text: str) -> str:
+    """Format with ``black.format_str`` in process.
+
+    black is imported on first use. When it is missing it is installed
+    through the backend installer, which blocks the calling worker thread
+    but not the GUI; if it ends up in another environment it is run there
+    as ``python -m black -``.
+    """
+    black = _import_black()
+    if black is None:
+        python = ensure_backend_installed("black")
+        if python is None:
+            raise FormatterUnavailable("black is not installed and could not be installed")
+        importlib.invalidate_caches()
+        black = _import_black()
+        if black is None:
+            return _run_stdin([str(python), "-m", "black", "-q", "-"], text)
+    try:
+        return black.format_str(text, mode=black.Mode())
+    except Exception as exc:  # pylint: disable=broad-except
+        raise FormatError(str(exc)) from exc
+
+
+def format_json(text: str) -> str:
+    try:
+        data = json.loads(text)
+    except ValueError as exc:
+        raise FormatError(f"Invalid JSON: {exc}") from exc
+    return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+
+def _command_formatter(name: str, *args: str) -> Formatter:
+    """Return a formatter running ``name`` on stdin, if it is on PATH."""
+
+    def formatter(text: str) -> str:
+        exe = shutil.which(name)
+        if exe is None:
+            raise FormatterUnavailable(f"{name} is not installed")
+        return _run_stdin([exe, *args], text)
+
+    return formatter
+
+
+register_formatter("python", format_python)
+register_formatter("json", format_json)
+register_formatter("rust", _command_formatter("rustfmt", "--emit", "stdout"))
+register_formatter(
+    "javascript", _command_formatter("prettier", "--stdin-filepath", "snippet.ts")
+)
+
+
+def format_code(language: str, text: str) -> tuple[str | None, str | None]:
+    """Return ``(formatted, error)`` for ``text``, memoized by content hash.
+
+    Only results and :class:`FormatError` messages from the formatter itself
+    are memoized; a missing tool or an unexpected exception is retried on the
+    next call.
+    """
+    language = canonical_language(language) or language.lower()
+    formatter = _formatters.get(language)
+    if formatter is None:
+        return None, f"No formatter for {language}"
+    key = (language, hashlib.sha256(text.encode("utf-8")).hexdigest())
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+    try:
+        result: tuple[str | None, str | None] = (formatter(text), None)
+    except FormatterUnavailable as exc:
+        return None, str(exc)
+    except FormatError as exc:
+        result = (None, str(exc))
+    except Exception as exc:  # pylint: disable=broad-except
+        return None, f"{type(exc).__name__}: {exc}"
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def _detect_language(text: str) -> str:
+    if text.lstrip()[:1] in ("{", "["):
+        try:
+            json.loads(text)
+            return "json"
+        except ValueError:
+            pass
+    return "python"
+
+
+def format_prompt(text: str) -> tuple[str | None, str | None]:
+    """Format the fenced blocks of ``text``, or all of it if it has none."""
+    matches = list(_FENCE_RE.finditer(text))
+    if not matches:
+        return format_code(_detect_language(text), text)
+
+    parts: list[str] = []
+    errors: list[str] = []
+    pos = 0
+    for match in matches:
+        language = canonical_language(match.group(1)) if match.group(1) else None
+        body = match.group(2)
+        if language is None or language not in _formatters:
+            continue
+        formatted, error = format_code(language, body)
+        if error:
+            errors.append(f"{language}: {error}")
+            continue
+        if not formatted.endswith("\n"):
+            formatted += "\n"
+        parts += [text[pos : match.start(2)], formatted]
+        pos = match.end(2)
+    parts.append(text[pos:])
+    return "".join(parts), "\n".join(errors) or None
+
+
+class FormatWorker(PooledWorker):
+    """Format prompt text off the GUI thread."""
+
+    done = Signal(str, object, object)  # original, formatted, error
+
+    def __init__(self, text: str) -> None:
+        super().__init__()
+        self.text = text
+
+    def run(self) -> None:
+        formatted, error = format_prompt(self.text)
+        self.done.emit(self.text, formatted, error)
 
 
 def register(window) -> None:
     """Register the plugin with the main window."""
-    _ensure_black()
-
     button = QPushButton("Format")
     window.button_bar.addWidget(button)
+    workers: list[FormatWorker] = []
+
+    def on_done(original: str, formatted: str | None, error: str | None) -> None:
+        button.setEnabled(True)
+        if error:
+            window.output_view.appendPlainText(f"Format error: {error}")
+        # Keep edits made while formatting ran
+        current = window.prompt_edit.toPlainText()
+        if formatted is not None and formatted != original and current == original:
+            window.prompt_edit.setPlainText(formatted)
+
+    def on_finished(worker: FormatWorker) -> None:
+        if worker in workers:
+            workers.remove(worker)
+        worker.deleteLater()
 
     def on_click() -> None:
         original = window.prompt_edit.toPlainText()
         if not original.strip():
             return
-        try:
-            formatted, error = _format_text(original)
-        except Exception as exc:  # pylint: disable=broad-except
-            window.output_view.appendPlainText(f"Format error: {exc}")
-            return
-        if error:
-            window.output_view.appendPlainText(f"Format error: {error}")
-            return
-        if formatted is not None:
-            window.prompt_edit.setPlainText(formatted)
+        worker = FormatWorker(original)
+        worker.done.connect(on_done)
+        worker.finished.connect(lambda w=worker: on_finished(w))
+        workers.append(worker)
+        button.setEnabled(False)
+        worker.start()
 
     button.clicked.connect(on_click)
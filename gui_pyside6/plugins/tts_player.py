@@ -1,62 +1,164 @@
-"""Plugin that speaks text using gTTS.
+"""Plugin that speaks text with a selectable TTS backend.
 
-The *Speak* button now reads the most recent line from ``window.output_view``.
-If the output is empty, it falls back to the current prompt text.
+The *Speak* button reads the text selected in ``window.output_view``, or the
+whole output if nothing is selected, falling back to the current prompt.
+Speech is synthesized sentence by sentence on a worker thread (see
+:mod:`backend.tts_engine`) and playback starts with the first chunk while
+later ones are still rendering. Clicking the button again stops.
 """
 
 from __future__ import annotations
 
-import tempfile
-from pathlib import Path
+import threading
+from collections import deque
 
-from PySide6.QtCore import QUrl
+from PySide6.QtCore import QUrl, Signal
 from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
-from PySide6.QtWidgets import QPushButton
-
-from ..backend.backend_installer import ensure_backend_installed
+from PySide6.QtWidgets import QComboBox, QPushButton
+
+from ..backend.settings_manager import save_settings
+from ..backend.tts_engine import (
+    BACKENDS,
+    AudioCache,
+    TtsError,
+    synthesize,
+    voice_for,
+    voice_setting,
+)
+from ..ui.workers import PooledWorker
+
+
+class TtsWorker(PooledWorker):
+    """Synthesize ``text`` and report each chunk's audio file as it is ready."""
+
+    chunk_ready = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, text: str, backend: str, voice: str, cache: AudioCache) -> None:
+        super().__init__()
+        self.text = text
+        self.backend = backend
+        self.voice = voice
+        self.cache = cache
+        self.stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def run(self) -> None:
+        try:
+            for path in synthesize(
+                self.text, self.backend, self.voice, self.cache, stop=self.stop_event
+            ):
+                self.chunk_ready.emit(str(path))
+        except TtsError as exc:
+            self.failed.emit(str(exc))
+
+
+def _text_to_speak(window) -> str:
+    cursor = window.output_view.textCursor()
+    # Qt separates selected paragraphs with U+2029
+    text = cursor.selectedText().replace("\u2029", "\n").strip()
+    if not text:
+        text = window.output_view.toPlainText().strip()
+    if not text:
+        text = window.prompt_edit.toPlainText().strip()
+    return text
 
 
 def register(window) -> None:
     """Register the plugin with the main window."""
+    settings = getattr(window, "settings", None)
+    if settings is None:
+        settings = {}
+    # Older versions kept one voice for all backends; it belongs to the
+    # backend that was selected at the time
+    if "tts_voice" in settings:
+        legacy_voice = settings.pop("tts_voice")
+        key = voice_setting(settings.get("tts_backend", "gtts"))
+        if legacy_voice and not settings.get(key):
+            settings[key] = legacy_voice
+        if hasattr(window, "settings"):
+            save_settings(settings)
+
+    backend_box = QComboBox()
+    for name, backend in BACKENDS.items():
+        backend_box.addItem(f"{name} (offline)" if backend.offline else name, name)
+    index = backend_box.findData(settings.get("tts_backend", "gtts"))
+    backend_box.setCurrentIndex(max(index, 0))
     button = QPushButton("Speak")
+    window.button_bar.addWidget(backend_box)
     window.button_bar.addWidget(button)
 
+    cache_mb = float(settings.get("tts_cache_mb", 100))
+    cache = AudioCache(max_bytes=int(cache_mb * 1024 * 1024))
     player = QMediaPlayer()
     audio_output = QAudioOutput()
     player.setAudioOutput(audio_output)
-
-    def cleanup(tmp_path: Path) -> None:
-        """Delete the temporary MP3 file if it exists."""
-        if tmp_path.exists():
-            tmp_path.unlink(missing_ok=True)
-
-    current: list[Path] = [Path()]
-
-    def on_state_changed(state: QMediaPlayer.PlaybackState) -> None:
-        """Release and delete the current file when playback stops."""
-        if state == QMediaPlayer.StoppedState:
-            # Clear the source so the file handle can be released
+    queued: deque[str] = deque()
+    state: dict = {"worker": None}
+
+    def play_next() -> None:
+        if queued:
+            player.setSource(QUrl.fromLocalFile(queued.popleft()))
+            player.play()
+        else:
+            # Release the file handle of the last chunk
             player.setSource(QUrl())
-            cleanup(current[0])
-
-    player.playbackStateChanged.connect(on_state_changed)
+            if state["worker"] is None:
+                button.setText("Speak")
+
+    def on_chunk(worker: TtsWorker, path: str) -> None:
+        if state["worker"] is not worker:
+            return  # stopped; the worker is still winding down
+        queued.append(path)
+        if player.playbackState() == QMediaPlayer.StoppedState:
+            play_next()
+
+    def on_status(status: QMediaPlayer.MediaStatus) -> None:
+        if status in (QMediaPlayer.EndOfMedia, QMediaPlayer.InvalidMedia):
+            play_next()
+
+    def on_failed(message: str) -> None:
+        window.output_view.appendPlainText(f"TTS error: {message}")
+
+    def on_finished(worker: TtsWorker) -> None:
+        if state["worker"] is worker:
+            state["worker"] = None
+            if not queued and player.playbackState() == QMediaPlayer.StoppedState:
+                button.setText("Speak")
+        worker.deleteLater()
+
+    def stop() -> None:
+        if state["worker"] is not None:
+            state["worker"].stop()
+            state["worker"] = None
+        queued.clear()
+        player.stop()
+        player.setSource(QUrl())
+        button.setText("Speak")
 
     def on_click() -> None:
-        lines = window.output_view.toPlainText().strip().splitlines()
-        text = lines[-1] if lines else ""
-        if not text:
-            text = window.prompt_edit.toPlainText().strip()
+        if state["worker"] is not None or player.playbackState() != QMediaPlayer.StoppedState:
+            stop()
+            return
+        text = _text_to_speak(window)
         if not text:
             return
-
-        ensure_backend_installed("gtts")
-        from gtts import gTTS
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp:
-            gTTS(text).save(tmp.name)
-            tmp_path = Path(tmp.name)
-        current[0] = tmp_path
-        player.setSource(QUrl.fromLocalFile(str(tmp_path)))
-        player.play()
-
+        backend = backend_box.currentData()
+        worker = TtsWorker(text, backend, voice_for(settings, backend), cache)
+        worker.chunk_ready.connect(lambda path, w=worker: on_chunk(w, path))
+        worker.failed.connect(on_failed)
+        worker.finished.connect(lambda w=worker: on_finished(w))
+        state["worker"] = worker
+        button.setText("Stop")
+        worker.start()
+
+    def on_backend_changed() -> None:
+        settings["tts_backend"] = backend_box.currentData()
+        if hasattr(window, "settings"):
+            save_settings(settings)
+
+    player.mediaStatusChanged.connect(on_status)
+    backend_box.currentIndexChanged.connect(on_backend_changed)
     button.clicked.connect(on_click)
@@ -0,0 +1,89 @@
+import gzip
+import json
+import time
+import types
+
+from gui_pyside6.plugins import agent_logger
+from gui_pyside6.plugins.agent_logger import AgentLogWriter
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_writer_batches_records_in_background(tmp_path):
+    path = tmp_path / "agent_log.jsonl"
+    writer = AgentLogWriter(path, batch_size=1000, flush_interval=0.2)
+    for i in range(10):
+        writer.write({"event": "output", "session": "s1", "text": f"line {i}"})
+    assert not path.exists() or path.stat().st_size == 0
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not (path.exists() and path.stat().st_size):
+        time.sleep(0.05)
+    assert [r["text"] for r in _records(path)] == [f"line {i}" for i in range(10)]
+
+    writer.write({"event": "finished", "session": "s1"})
+    writer.close()
+    assert _records(path)[-1] == {"event": "finished", "session": "s1"}
+
+
+def test_writer_rotates_and_compresses(tmp_path):
+    path = tmp_path / "agent_log.jsonl"
+    writer = AgentLogWriter(path, max_bytes=200, backup_count=2, batch_size=1)
+    for i in range(20):
+        writer.write({"text": "x" * 50, "n": i})
+    writer.close()
+
+    backups = sorted(p.name for p in tmp_path.iterdir())
+    assert backups == ["agent_log.jsonl", "agent_log.jsonl.1.gz", "agent_log.jsonl.2.gz"]
+    assert path.stat().st_size <= 200
+    with gzip.open(tmp_path / "agent_log.jsonl.1.gz", "rt") as fh:
+        rotated = [json.loads(line)["n"] for line in fh]
+    current = [record["n"] for record in _records(path)]
+    assert rotated[-1] + 1 == current[0]
+    assert current[-1] == 19
+
+
+class _Clicked:
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+
+class _Window:
+    def __init__(self):
+        self.settings = {}
+        self.run_btn = types.SimpleNamespace(clicked=_Clicked())
+        self.agent_list = types.SimpleNamespace(currentItem=lambda: None)
+        self.prompt_edit = types.SimpleNamespace(toPlainText=lambda: "hello")
+        self.current_session_id = None
+        self.output = []
+
+    def append_output(self, text):
+        self.output.append(text)
+
+    def session_finished(self):
+        self.current_session_id = None
+
+
+def test_records_use_the_window_session_id(tmp_path, monkeypatch):
+    writer = AgentLogWriter(tmp_path / "agent_log.jsonl", batch_size=1)
+    monkeypatch.setattr(agent_logger, "get_writer", lambda settings=None: writer)
+    window = _Window()
+    agent_logger.register(window)
+
+    # Clicking Run without starting a session logs nothing
+    window.run_btn.clicked.slots[0]()
+    window.current_session_id = 7
+    window.run_btn.clicked.slots[0]()
+    window.append_output("out")
+    window.session_finished()
+    writer.close()
+
+    records = _records(tmp_path / "agent_log.jsonl")
+    assert [r["event"] for r in records] == ["prompt", "output", "finished"]
+    assert {r["session"] for r in records} == {7}
+    assert window.output == ["out"]
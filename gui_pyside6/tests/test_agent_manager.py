@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from gui_pyside6.backend import agent_loader, agent_manager
+from gui_pyside6.backend.agent_manager import AgentManager
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _count_parses(monkeypatch):
+    parsed = []
+    original = agent_loader._parse_agent
+
+    def counting(path):
+        parsed.append(os.path.basename(path))
+        return original(path)
+
+    monkeypatch.setattr(agent_loader, "_parse_agent", counting)
+    return parsed
+
+
+def test_reload_only_parses_changed_files(tmp_path, monkeypatch):
+    for idx in range(5):
+        _write(tmp_path / f"agent_{idx}.json", {"name": f"Agent {idx}"})
+    parsed = _count_parses(monkeypatch)
+
+    manager = AgentManager([tmp_path])
+    assert len(parsed) == 5
+    assert [a["name"] for a in manager.agents] == [f"Agent {i}" for i in range(5)]
+
+    parsed.clear()
+    manager.reload()
+    assert parsed == []
+
+    _write(tmp_path / "agent_2.json", {"name": "Agent Two", "model": "x"})
+    (tmp_path / "agent_4.json").unlink()
+    manager.reload()
+    assert parsed == ["agent_2.json"]
+    assert manager.get_agent("Agent Two")["model"] == "x"
+    assert manager.get_agent("Agent 4") is None
+
+
+def test_save_rename_delete_update_index_without_rescan(tmp_path, monkeypatch):
+    _write(tmp_path / "first.json", {"name": "First", "model": "m"})
+    manager = AgentManager([tmp_path])
+
+    def no_rescan(*args, **kwargs):
+        pytest.fail("agent directories were rescanned")
+
+    monkeypatch.setattr(agent_manager, "scan_agents", no_rescan)
+    assert manager.set_active_agent("First")
+
+    manager.save_agent({"name": "Second"}, tmp_path / "second.json")
+    assert [a["name"] for a in manager.agents] == ["First", "Second"]
+
+    new = manager.rename_agent(
+        {"_path": str(tmp_path / "first.json")}, tmp_path / "renamed_agent"
+    )
+    assert new == tmp_path / "renamed_agent.json"
+    assert not (tmp_path / "first.json").exists()
+    renamed = manager.get_agent("Renamed Agent")
+    assert renamed["model"] == "m"
+    assert manager.active_agent is renamed
+    assert manager.get_agent("First") is None
+
+    manager.delete_agent(renamed)
+    assert [a["name"] for a in manager.agents] == ["Second"]
+    assert manager.active_agent["name"] == "Second"
@@ -0,0 +1,126 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+from gui_pyside6.backend import backend_installer
+
+
+def _setup(monkeypatch, tmp_path, packages):
+    monkeypatch.setattr(backend_installer, "_LEDGER_PATH", tmp_path / "installed.json")
+    monkeypatch.setattr(backend_installer, "_verified", set())
+    monkeypatch.setattr(backend_installer, "WHEEL_CACHE_DIR", tmp_path / "wheels")
+    monkeypatch.setattr(
+        backend_installer, "_load_requirements", lambda: {"demo": packages}
+    )
+    monkeypatch.setattr(sys, "base_prefix", "/not-the-prefix")
+    calls = []
+    monkeypatch.setattr(backend_installer, "_run_pip", lambda cmd: calls.append(cmd))
+    return calls
+
+
+def test_satisfied_requirements_skip_pip(monkeypatch, tmp_path):
+    calls = _setup(monkeypatch, tmp_path, ["pytest>=1.0"])
+    backend_installer.ensure_backend_installed("demo")
+    backend_installer.ensure_backend_installed("demo")
+    assert calls == []
+    ledger = backend_installer._load_ledger()
+    assert len(ledger) == 1
+    entry = next(iter(ledger.values()))
+    assert entry["backend"] == "demo"
+    assert entry["python"] == str(Path(sys.executable))
+
+
+def test_ledger_skips_metadata_check_in_a_new_process(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, ["pytest>=1.0"])
+    monkeypatch.setattr(backend_installer, "_site_mtime", lambda python: 123.0)
+    backend_installer.ensure_backend_installed("demo")
+
+    probes = []
+
+    def probe(packages, python):
+        probes.append(packages)
+        return True
+
+    monkeypatch.setattr(backend_installer, "requirements_satisfied", probe)
+    # A new process starts without the in-memory memo
+    monkeypatch.setattr(backend_installer, "_verified", set())
+    backend_installer.ensure_backend_installed("demo")
+    assert probes == []
+
+    # Packages changed since the install: check the metadata again
+    monkeypatch.setattr(backend_installer, "_verified", set())
+    monkeypatch.setattr(backend_installer, "_site_mtime", lambda python: 456.0)
+    backend_installer.ensure_backend_installed("demo")
+    assert probes == [["pytest>=1.0"]]
+    entry = next(iter(backend_installer._load_ledger().values()))
+    assert entry["site_mtime"] == 456.0
+
+
+def test_missing_requirements_run_pip(monkeypatch, tmp_path):
+    calls = _setup(monkeypatch, tmp_path, ["surely-not-installed-pkg>=1.0"])
+    python = backend_installer.ensure_backend_installed("demo")
+    assert python == Path(sys.executable)
+    # Wheels are collected into the shared cache, then installed from it.
+    assert [c[3] for c in calls] == ["wheel", "install"]
+    assert "--no-index" in calls[1]
+    assert calls[1][-1] == "surely-not-installed-pkg>=1.0"
+    # The ledger now records the install and the process memo skips pip.
+    backend_installer.ensure_backend_installed("demo")
+    assert len(calls) == 2
+
+
+def test_force_reinstall(monkeypatch, tmp_path):
+    calls = _setup(monkeypatch, tmp_path, ["pytest"])
+    backend_installer.ensure_backend_installed("demo", force=True)
+    assert "--force-reinstall" in calls[-1]
+
+
+def test_isolated_backends_get_own_environment(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, [])
+    monkeypatch.setattr(backend_installer, "VENVS_DIR", tmp_path / "venvs")
+    monkeypatch.setattr(
+        backend_installer,
+        "_load_requirements",
+        lambda: {
+            "shared": ["gTTS"],
+            "heavy": {"packages": ["TTS"], "isolated": True},
+        },
+    )
+    specs = backend_installer.load_backend_specs()
+    assert not specs["shared"].isolated
+    assert specs["heavy"].isolated
+    assert backend_installer.backend_python("shared") == Path(sys.executable)
+    heavy = backend_installer.backend_python("heavy")
+    assert heavy.parent.parent == tmp_path / "venvs" / "heavy"
+
+
+def test_provision_backends_runs_in_background(monkeypatch, tmp_path):
+    _setup(monkeypatch, tmp_path, ["pytest"])
+    futures = backend_installer.provision_backends(["demo", "unknown"])
+    assert list(futures) == ["demo"]
+    assert futures["demo"].result(timeout=10) == Path(sys.executable)
+
+
+def test_shutdown_terminates_running_provisioning(monkeypatch, tmp_path):
+    run_pip = backend_installer._run_pip
+    _setup(monkeypatch, tmp_path, ["surely-not-installed-pkg"])
+    monkeypatch.setattr(backend_installer, "_shutting_down", threading.Event())
+    monkeypatch.setattr(backend_installer, "_executor", None)
+    monkeypatch.setattr(
+        backend_installer,
+        "_pip_install",
+        lambda python, packages, force: run_pip(
+            [sys.executable, "-c", "import time; time.sleep(60)"]
+        ),
+    )
+    future = backend_installer.provision_backends(["demo"])["demo"]
+    deadline = time.monotonic() + 10
+    while not backend_installer._pip_processes and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    backend_installer.shutdown_provisioning()
+    assert future.result(timeout=10) is None
+    assert time.monotonic() - started < 10
+    assert not backend_installer._pip_processes
@@ -0,0 +1,105 @@
+import json
+import sys
+import textwrap
+
+from gui_pyside6.backend.batch_runner import (
+    BatchItem,
+    BatchRunner,
+    completed_ids,
+    load_items,
+)
+
+
+FAKE_CLI = textwrap.dedent(
+    """
+    import os, sys, time
+    prompt = sys.argv[-1]
+    if prompt.startswith("flaky"):
+        marker = prompt.split(":", 1)[1]
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            sys.stderr.write("temporary failure")
+            sys.exit(3)
+    if prompt == "slow":
+        time.sleep(10)
+    print("done: " + prompt)
+    """
+)
+
+
+def _settings(tmp_path):
+    script = tmp_path / "fake_codex.py"
+    script.write_text(FAKE_CLI)
+    return {"cli_path": f'"{sys.executable}" "{script}"'}
+
+
+def test_load_items_from_jsonl_csv_and_glob(tmp_path):
+    jsonl = tmp_path / "items.jsonl"
+    jsonl.write_text('{"id": "a", "prompt": "one", "files": ["x.py"]}\n\n{"prompt": "two"}\n')
+    items = load_items(jsonl)
+    assert [(i.id, i.prompt, i.files) for i in items] == [("a", "one", ["x.py"]), ("3", "two", [])]
+
+    table = tmp_path / "items.csv"
+    table.write_text("id,prompt,files\nb,fix it,a.py;b.py\n")
+    (item,) = load_items(table)
+    assert item.files == ["a.py", "b.py"]
+
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "m.py").write_text("")
+    (globbed,) = load_items(str(tmp_path / "src" / "*.py"), "Review {path}")
+    assert globbed.prompt.startswith("Review ") and globbed.files == [globbed.id]
+
+
+def test_batch_runner_retries_times_out_and_streams_jsonl(tmp_path):
+    output = tmp_path / "results.jsonl"
+    seen = []
+    runner = BatchRunner(
+        {},
+        _settings(tmp_path),
+        concurrency=3,
+        retries=1,
+        backoff=0.01,
+        timeout=1.0,
+        output_path=output,
+        on_result=seen.append,
+    )
+    items = [
+        BatchItem("ok", "hello"),
+        BatchItem("flaky", f"flaky:{tmp_path / 'marker'}"),
+        BatchItem("slow", "slow"),
+    ]
+    results = {r.id: r for r in runner.run(items)}
+
+    assert results["ok"].status == "ok"
+    assert results["ok"].output == ["done: hello"]
+    assert results["flaky"].status == "ok"
+    assert results["flaky"].attempts == 2
+    assert results["slow"].status == "timeout"
+    assert results["slow"].attempts == 2
+    assert len(seen) == 3
+    written = [json.loads(line) for line in output.read_text().splitlines()]
+    assert {w["id"] for w in written} == {"ok", "flaky", "slow"}
+
+
+def test_batch_runner_resume_skips_completed_items(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text(
+        '{"id": "a", "status": "ok"}\n{"id": "b", "status": "error"}\n{"id": "c", "sta'
+    )
+    runner = BatchRunner({}, _settings(tmp_path), output_path=output, resume=True)
+    items = [BatchItem("a", "one"), BatchItem("b", "two"), BatchItem("c", "three")]
+    results = runner.run(items)
+
+    assert sorted(r.id for r in results) == ["b", "c"]
+    assert runner.skipped == 1
+    assert completed_ids(output) == {"a", "b", "c"}
+
+
+def test_batch_runner_fails_items_with_unknown_agents(tmp_path):
+    runner = BatchRunner({}, _settings(tmp_path), agents={"Known": {}})
+    items = [BatchItem("a", "one", agent="Known"), BatchItem("b", "two", agent="Typo")]
+    results = {r.id: r for r in runner.run(items)}
+    assert results["a"].status == "ok"
+    assert results["b"].status == "error"
+    assert results["b"].error == "Unknown agent: Typo"
+    assert results["b"].attempts == 0
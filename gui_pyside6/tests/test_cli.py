@@ -1,4 +1,7 @@
 import os
+import sys
+import time
+
 import pytest
 try:
     from PySide6.QtWidgets import QApplication
@@ -7,6 +10,7 @@ except Exception as exc:  # pylint: disable=broad-except
 
 from gui_pyside6.backend import codex_adapter
 from gui_pyside6.backend.agent_manager import AgentManager
+from gui_pyside6.backend.history_store import HistoryStore
 from gui_pyside6.ui import main_window as main_window_module
 
 
@@ -34,7 +38,33 @@ def test_build_command_with_uv_sandbox():
     assert cmd[-1] == "hi"
 
 
-def test_start_codex_handles_command(monkeypatch):
+def test_build_command_reuses_cached_template(monkeypatch):
+    agent = {"temperature": 0.3, "model": "gpt"}
+    settings = {"cli_path": "npx codex", "quiet": True}
+    codex_adapter._template_cache.clear()
+    calls = []
+    original = codex_adapter._compile_template
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(codex_adapter, "_compile_template", counting)
+    first = codex_adapter.build_command("a", agent, settings, files=["x.py"])
+    second = codex_adapter.build_command("b", agent, settings, images=["y.png"])
+    assert len(calls) == 1
+    assert first[:-3] == second[:-3]
+    assert first[-3:] == ["--file", "x.py", "a"]
+    assert second[-3:] == ["--image", "y.png", "b"]
+
+    settings["quiet"] = False
+    third = codex_adapter.build_command("c", agent, settings)
+    assert len(calls) == 2
+    assert "--quiet" in first
+    assert "--quiet" not in third
+
+
+def test_start_codex_handles_command(monkeypatch, tmp_path):
     os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
     app = QApplication.instance() or QApplication([])
 
@@ -70,7 +100,9 @@ def test_start_codex_handles_command(monkeypatch):
 
     agent_manager = AgentManager()
     settings = {}
-    window = main_window_module.MainWindow(agent_manager, settings)
+    window = main_window_module.MainWindow(
+        agent_manager, settings, history_store=HistoryStore(tmp_path / "history.sqlite3")
+    )
     window.prompt_edit.setPlainText("hi")
     window.start_codex()
     assert window.progress_dialog is not None
@@ -79,7 +111,7 @@ def test_start_codex_handles_command(monkeypatch):
     assert window.progress_dialog is None
 
 
-def test_session_error_triggers_message_box(monkeypatch):
+def test_session_error_triggers_message_box(monkeypatch, tmp_path):
     os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
     app = QApplication.instance() or QApplication([])
 
@@ -122,7 +154,9 @@ def test_session_error_triggers_message_box(monkeypatch):
 
     agent_manager = AgentManager()
     settings = {}
-    window = main_window_module.MainWindow(agent_manager, settings)
+    window = main_window_module.MainWindow(
+        agent_manager, settings, history_store=HistoryStore(tmp_path / "history.sqlite3")
+    )
     window.prompt_edit.setPlainText("oops")
     window.start_codex()
     assert window.progress_dialog is not None
@@ -136,13 +170,15 @@ def test_session_error_triggers_message_box(monkeypatch):
     assert window.status_bar.currentMessage() == "Session failed"
 
 
-def test_clear_button_clears_prompt(monkeypatch):
+def test_clear_button_clears_prompt(monkeypatch, tmp_path):
     os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
     app = QApplication.instance() or QApplication([])
 
     agent_manager = AgentManager()
     settings = {}
-    window = main_window_module.MainWindow(agent_manager, settings)
+    window = main_window_module.MainWindow(
+        agent_manager, settings, history_store=HistoryStore(tmp_path / "history.sqlite3")
+    )
 
     assert hasattr(window, "clear_btn")
 
@@ -150,3 +186,162 @@ def test_clear_button_clears_prompt(monkeypatch):
     window.clear_btn.click()
     assert window.prompt_edit.toPlainText() == ""
 
+
+
+def test_large_diff_goes_to_patch_view(monkeypatch, tmp_path):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+
+    agent_manager = AgentManager()
+    window = main_window_module.MainWindow(
+        agent_manager,
+        {"patch_view_min_lines": 5},
+        history_store=HistoryStore(tmp_path / "history.sqlite3"),
+    )
+    parsed = []
+    monkeypatch.setattr(window, "_patch_parsed", parsed.append)
+
+    window.append_output("Proposed change:")
+    window.append_output("diff --git a/a.py b/a.py")
+    window.append_output("@@ -1,2 +1,3 @@")
+    for line in [" x", "-y", "+z", "+w"]:
+        window.append_output(line)
+    assert window.output_view.toPlainText().endswith("[Diff] receiving... 1 lines\n")
+    window.append_output("Done.")
+    for worker in list(window._diff_workers):
+        worker.wait()
+    app.processEvents()
+
+    output = window.output_view.toPlainText()
+    assert "+z" not in output
+    assert "[Patch] 6 diff lines" in output
+    assert output.strip().endswith("Done.")
+    assert "+z" not in window.history_view.toPlainText()
+    assert len(parsed) == 1
+    assert parsed[0].summary() == "1 file changed, +2 -1"
+
+    window.append_output("@@ -1 +1 @@")
+    window.session_finished()
+    assert window.output_view.toPlainText().strip().endswith("@@ -1 +1 @@")
+    assert "[Diff]" not in window.output_view.toPlainText()
+
+
+def test_history_panel_pages_from_store(tmp_path):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    window = main_window_module.MainWindow(AgentManager(), {}, history_store=store)
+    window._history_session = store.start_session("prompt")
+    window.history_view.session_started()
+    for i in range(500):
+        window.append_output(f"line {i}")
+    window.append_output("Error: boom")
+
+    model = window.history_view.history_model
+    model.page_size = 50
+    model.refresh()
+    assert model.rowCount() == 501
+    assert model.data(model.index(0)) == "> prompt"
+    assert model.data(model.index(500)) == "line 499"
+    for row in range(0, 501, 25):
+        model.data(model.index(row))
+
+    # Scrolling up from the bottom pages by id, never by offset
+    model.refresh()
+    offsets = []
+    original = store.fetch_entries
+    store.fetch_entries = lambda *a, **k: offsets.append(a) or original(*a, **k)
+    rows = [model.data(model.index(row)) for row in range(500, -1, -1)]
+    assert offsets == []
+    assert rows[0] == "line 499" and rows[-1] == "> prompt"
+    assert rows[::-1][1:] == [f"line {i}" for i in range(500)]
+    assert len(model._pages) <= model.max_pages
+    window.clear_history()
+    assert model.rowCount() == 0
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses /proc")
+def test_session_stop_is_async_and_kills_grandchildren(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    script = tmp_path / "fake_codex.py"
+    script.write_text(
+        "import signal, subprocess, sys, time\n"
+        "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "print('ready', flush=True)\n"
+        "time.sleep(60)\n"
+    )
+    session = codex_adapter.CodexSession()
+    lines = session.run("p", {}, cmd=[sys.executable, str(script)])
+    assert next(lines) == "ready"
+
+    started = time.monotonic()
+    session.stop(timeout=0.5)
+    assert time.monotonic() - started < 0.2
+    assert list(lines) == []
+    assert time.monotonic() - started < 5
+    child_pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            # A killed child may linger as a zombie until it is reaped
+            with open(f"/proc/{child_pid}/stat") as fh:
+                if fh.read().split()[2] == "Z":
+                    break
+        except FileNotFoundError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("grandchild survived stop()")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="uses POSIX signals")
+def test_session_stop_cancels_kill_timer_once_process_exits():
+    session = codex_adapter.CodexSession()
+    cmd = [sys.executable, "-c", "import time; print('ready', flush=True); time.sleep(60)"]
+    lines = session.run("p", {}, cmd=cmd)
+    assert next(lines) == "ready"
+    session.stop(timeout=30)
+    timer = session._kill_timer
+    assert timer is not None
+    assert list(lines) == []
+    # Cancelled right away rather than firing at a reused process group later
+    assert timer.finished.is_set()
+    assert session._kill_timer is None
+
+
+def test_session_stopped_before_start_never_spawns(tmp_path):
+    marker = tmp_path / "ran"
+    cmd = [sys.executable, "-c", f"open({str(marker)!r}, 'w'); print('ran')"]
+    session = codex_adapter.CodexSession()
+    session.stop()
+    assert list(session.run("p", {}, cmd=cmd)) == []
+    assert list(session.stream(cmd)) == []
+    assert session.terminated and not marker.exists()
+
+    session.prepare()
+    assert list(session.run("p", {}, cmd=cmd)) == ["ran"]
+    assert not session.terminated
+
+
+def test_login_streams_output_and_redeem_times_out(tmp_path):
+    script = tmp_path / "fake_codex.py"
+    script.write_text(
+        "import sys, time\n"
+        "print('open the browser', flush=True)\n"
+        "time.sleep(1 if '--login' in sys.argv else 30)\n"
+        "print('done')\n"
+    )
+    settings = {"cli_path": f'"{sys.executable}" "{script}"'}
+
+    started = time.monotonic()
+    lines = codex_adapter.login(settings)
+    assert next(lines) == "open the browser"
+    assert time.monotonic() - started < 0.9
+    assert list(lines) == ["done"]
+
+    with pytest.raises(codex_adapter.CodexTimeout):
+        list(codex_adapter.redeem_free_credits(settings, timeout=0.5))
+    assert not codex_adapter._default_session.running
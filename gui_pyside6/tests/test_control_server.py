@@ -0,0 +1,142 @@
+import http.client
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+from gui_pyside6.backend.control_server import (
+    ControlServer,
+    ServerSession,
+    SlowConsumerError,
+)
+
+FAKE_CLI = (
+    "import sys, time\n"
+    "prompt = sys.argv[-1]\n"
+    "if prompt == 'slow':\n"
+    "    print('started', flush=True)\n"
+    "    time.sleep(30)\n"
+    "for i in range(int(prompt)):\n"
+    "    print(f'line {i}')\n"
+)
+
+
+@pytest.fixture
+def server(tmp_path):
+    script = tmp_path / "fake_codex.py"
+    script.write_text(FAKE_CLI)
+    srv = ControlServer(
+        {"cli_path": f'"{sys.executable}" "{script}"'},
+        port=0,
+        token_path=tmp_path / "token",
+    )
+    srv.start()
+    yield srv
+    srv.shutdown()
+
+
+def _request(server, method, path, body=None, headers=None):
+    host, port = server.httpd.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    payload = json.dumps(body).encode() if body is not None else None
+    all_headers = {
+        "Authorization": f"Bearer {server.token}",
+        "Content-Type": "application/json",
+    }
+    all_headers.update(headers or {})
+    conn.request(method, path, body=payload, headers=all_headers)
+    response = conn.getresponse()
+    return response.status, response.read().decode()
+
+
+def _events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        events.append(fields)
+    return events
+
+
+def test_start_stream_and_list_sessions(server):
+    status, body = _request(server, "POST", "/sessions", {"prompt": "5"})
+    assert status == 201
+    session_id = json.loads(body)["id"]
+
+    status, body = _request(server, "GET", f"/sessions/{session_id}/stream")
+    assert status == 200
+    events = _events(body)
+    assert [e["data"] for e in events[:-1]] == [f"line {i}" for i in range(5)]
+    assert events[-1]["event"] == "end"
+    assert json.loads(events[-1]["data"])["status"] == "finished"
+
+    # Resuming after the last seen id only returns the rest
+    _, body = _request(server, "GET", f"/sessions/{session_id}/stream?from=3")
+    assert [e.get("data") for e in _events(body)[:-1]] == ["line 3", "line 4"]
+
+    _, body = _request(server, "GET", "/sessions")
+    assert [s["id"] for s in json.loads(body)] == [session_id]
+    assert _request(server, "POST", "/sessions", {})[0] == 400
+    assert _request(server, "GET", "/sessions/99")[0] == 404
+
+
+def test_stop_running_session(server):
+    _, body = _request(server, "POST", "/sessions", {"prompt": "slow"})
+    session_id = json.loads(body)["id"]
+    session = server.get(session_id)
+    deadline = time.monotonic() + 10
+    while session.info()["lines"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    status, _ = _request(server, "POST", f"/sessions/{session_id}/stop")
+    assert status == 200
+    session.join(10)
+    assert session.status == "stopped"
+
+
+def test_rejects_requests_a_browser_could_send(server, tmp_path):
+    token_file = tmp_path / "token"
+    assert token_file.read_text().strip() == server.token
+    assert token_file.stat().st_mode & 0o077 == 0
+
+    cross_origin = {
+        "Content-Type": "text/plain",
+        "Origin": "http://evil.example",
+    }
+    status, _ = _request(server, "POST", "/sessions", {"prompt": "1"}, cross_origin)
+    assert 400 <= status < 500
+    for headers in (
+        {"Origin": "http://evil.example"},
+        {"Content-Type": "text/plain"},
+        {"Host": "evil.example"},
+        {"Authorization": ""},
+    ):
+        status, _ = _request(server, "POST", "/sessions", {"prompt": "1"}, headers)
+        assert 400 <= status < 500, headers
+    assert _request(server, "GET", "/sessions", headers={"Host": "evil.example"})[0] == 403
+    assert server.list_sessions() == []
+
+
+def test_rejects_bad_content_length(server):
+    for length, expected in (("abc", 400), ("-1", 400), (str(10**9), 413)):
+        headers = {"Content-Length": length}
+        status, _ = _request(server, "POST", "/sessions", {"prompt": "1"}, headers)
+        assert status == expected, length
+    assert server.list_sessions() == []
+
+
+def test_lagging_reader_pauses_producer_then_gets_dropped():
+    session = ServerSession(1, "p", max_lag=3, stall_timeout=0.5)
+    key = session.subscribe()
+    producer = threading.Thread(target=lambda: [session.append(str(i)) for i in range(10)])
+    producer.start()
+    time.sleep(0.2)
+    assert session.info()["lines"] == 3
+
+    first, lines, _ = session.read(key, timeout=1)
+    assert (first, lines) == (0, ["0", "1", "2"])
+    producer.join(5)
+    assert not producer.is_alive()
+    with pytest.raises(SlowConsumerError):
+        session.read(key)
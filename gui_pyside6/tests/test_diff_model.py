@@ -0,0 +1,71 @@
+from gui_pyside6.utils.diff_model import DiffAccumulator, parse_unified_diff
+
+
+PATCH = """diff --git a/app.py b/app.py
+index 123..456 100644
+--- a/app.py
++++ b/app.py
+@@ -1,3 +1,3 @@
+ import os
+--- removed line that looks like a header
++print("hi")
+ x = 1
+@@ -10 +10,2 @@
+-old
++new
++more
+\\ No newline at end of file
+diff --git a/README.md b/README.md
+--- a/README.md
++++ b/README.md
+@@ -1 +1 @@
+-a
++b""".splitlines()
+
+
+def test_parse_unified_diff_builds_hunk_model():
+    model = parse_unified_diff(PATCH)
+    assert [f.path for f in model.files] == ["app.py", "README.md"]
+    first = model.files[0]
+    assert len(first.hunks) == 2
+    assert first.header[-1] == "+++ b/app.py"
+    hunk = first.hunks[0]
+    assert (hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count) == (1, 3, 1, 3)
+    assert hunk.lines[1] == "--- removed line that looks like a header"
+    assert (hunk.added, hunk.removed) == (1, 1)
+    assert first.hunks[1].lines[-1].startswith("\\ No newline")
+    assert (first.hunks[1].old_count, first.hunks[1].new_count) == (1, 2)
+    assert model.summary() == "2 files changed, +4 -3"
+    assert model.line_count == len(PATCH)
+
+
+def test_diff_accumulator_splits_stream():
+    acc = DiffAccumulator()
+    out = []
+    for line in ["Here is the change:", *PATCH, "", "All done."]:
+        completed = acc.feed(line)
+        if completed:
+            out.append(("diff", len(completed)))
+        if not acc.active:
+            out.append(("text", line))
+    assert out == [
+        ("text", "Here is the change:"),
+        ("diff", len(PATCH)),
+        ("text", ""),
+        ("text", "All done."),
+    ]
+    assert acc.finish() is None
+
+
+def test_diff_accumulator_ends_diff_by_hunk_counts():
+    acc = DiffAccumulator()
+    lines = ["--- a/x", "+++ b/x", "@@ -1,3 +1,3 @@", " keep", "", "-old", "+new"]
+    for line in lines:
+        assert acc.feed(line) is None
+        assert acc.active
+    assert acc.line_count == len(lines)
+    # Markdown after the patch is output, not part of the diff
+    assert acc.feed("- updated the parser") == lines
+    assert not acc.active
+    assert acc.feed("  indented prose") is None
+    assert not acc.active
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from gui_pyside6 import headless
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_headless_import_does_not_load_qt():
+    code = (
+        "import sys, gui_pyside6.headless; "
+        "print(any(m.startswith('PySide6') for m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_headless_run_streams_output_and_return_code(tmp_path, capsys):
+    script = tmp_path / "fake_codex.py"
+    script.write_text(
+        "import sys\n"
+        "if '--help' in sys.argv: sys.exit(0)\n"
+        "print('echo: ' + sys.argv[-1])\n"
+        "sys.exit(4 if sys.argv[-1] == 'fail' else 0)\n"
+    )
+    cli = f'"{sys.executable}" "{script}"'
+    base = ["run", "--provider", "local", "--cli-path", cli, "--no-cache"]
+
+    assert headless.main([*base, "hello"]) == 0
+    assert capsys.readouterr().out.splitlines()[-1] == "echo: hello"
+
+    assert headless.main([*base, "fail"]) == 4
+    assert "exited with code 4" in capsys.readouterr().err
@@ -0,0 +1,108 @@
+import pytest
+try:
+    from PySide6.QtGui import QGuiApplication, QTextDocument
+except Exception as exc:  # pylint: disable=broad-except
+    pytest.skip(f"PySide6 not available: {exc}", allow_module_level=True)
+
+from gui_pyside6.utils.highlighter import OutputHighlighter, PythonHighlighter, get_lexer
+
+
+def _formats(doc, line):
+    block = doc.findBlockByNumber(line)
+    return [(r.start, r.length, r.format.foreground().color().name())
+            for r in block.layout().formats()]
+
+
+def test_keywords_strings_and_comments_in_one_pass():
+    app = QGuiApplication.instance() or QGuiApplication([])
+    doc = QTextDocument()
+    highlighter = PythonHighlighter(doc)
+    doc.setPlainText("if x: s = 'not # a comment'  # def")
+    highlighter.rehighlight()
+    formats = _formats(doc, 0)
+    keyword = highlighter.keyword_format.foreground().color().name()
+    string = highlighter.string_format.foreground().color().name()
+    comment = highlighter.comment_format.foreground().color().name()
+    assert (0, 2, keyword) in formats
+    assert (10, 17, string) in formats
+    assert (29, 5, comment) in formats
+    assert all(color != keyword for start, _, color in formats if start > 0)
+    assert app is not None
+
+
+def test_triple_quoted_string_spans_blocks():
+    app = QGuiApplication.instance() or QGuiApplication([])
+    doc = QTextDocument()
+    highlighter = PythonHighlighter(doc)
+    doc.setPlainText('x = """start\nfor in\nend""" and y')
+    highlighter.rehighlight()
+    string = highlighter.string_format.foreground().color().name()
+    keyword = highlighter.keyword_format.foreground().color().name()
+    assert doc.findBlockByNumber(1).userState() == 1
+    assert _formats(doc, 1) == [(0, 6, string)]
+    last = _formats(doc, 2)
+    assert (0, 6, string) in last
+    assert (7, 3, keyword) in last
+    assert doc.findBlockByNumber(2).userState() == -1
+    assert app is not None
+
+
+def test_output_highlighter_skips_prose_and_dispatches_fences(monkeypatch):
+    app = QGuiApplication.instance() or QGuiApplication([])
+    doc = QTextDocument()
+    highlighter = OutputHighlighter(doc)
+    calls = []
+    original = highlighter._highlight_code
+
+    def record(text, lexer, inner):
+        calls.append((text, lexer.name))
+        return original(text, lexer, inner)
+
+    monkeypatch.setattr(highlighter, "_highlight_code", record)
+    doc.setPlainText(
+        "Here is the fix for the import:\n"
+        "```py\n"
+        "import os  # needed\n"
+        "```\n"
+        "and then it returns None\n"
+        "```js\n"
+        "const x = 1;\n"
+        "```"
+    )
+    highlighter.rehighlight()
+    keyword = highlighter.keyword_format.foreground().color().name()
+    assert calls == [("import os  # needed", "python"), ("const x = 1;", "javascript")]
+    assert _formats(doc, 0) == []
+    assert _formats(doc, 4) == []
+    assert (0, 6, keyword) in _formats(doc, 2)
+    assert (0, 5, keyword) in _formats(doc, 6)
+    assert app is not None
+
+
+def test_output_highlighter_colors_unified_diff():
+    app = QGuiApplication.instance() or QGuiApplication([])
+    doc = QTextDocument()
+    highlighter = OutputHighlighter(doc)
+    doc.setPlainText(
+        "diff --git a/x.py b/x.py\n"
+        "@@ -1,2 +1,2 @@\n"
+        "-old = 1\n"
+        "+new = 2\n"
+        " same\n"
+        "Done."
+    )
+    highlighter.rehighlight()
+    added = highlighter.formats["diff_added"].foreground().color().name()
+    removed = highlighter.formats["diff_removed"].foreground().color().name()
+    assert _formats(doc, 2) == [(0, 8, removed)]
+    assert _formats(doc, 3) == [(0, 8, added)]
+    assert _formats(doc, 4) == []
+    assert _formats(doc, 5) == []
+    assert doc.findBlockByNumber(5).userState() == -1
+    assert app is not None
+
+
+def test_lexers_are_compiled_once_per_language():
+    assert get_lexer("py") is get_lexer("python")
+    assert get_lexer("tsx") is get_lexer("javascript")
+    assert get_lexer("brainfuck") is None
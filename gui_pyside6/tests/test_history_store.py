@@ -0,0 +1,45 @@
+import sqlite3
+
+from gui_pyside6.backend.history_store import HistoryStore
+
+
+def test_history_store_batches_and_survives_reopen(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    store = HistoryStore(path, batch_size=3, flush_interval=60)
+    session = store.start_session("fix bug", agent="Python Expert", model="gpt")
+    other = sqlite3.connect(str(path))
+
+    def committed():
+        return other.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    store.append(session, "line 1")
+    store.append(session, "line 2")
+    # Not committed yet, but visible to the store's own reads
+    assert committed() == 1
+    assert store.count_entries() == 3
+    assert store.fetch_entries_before(None, 1)[0].text == "line 2"
+    assert committed() == 1
+    store.append(session, "line 3")
+    assert committed() == 4
+    other.close()
+    store.append(session, "line 4")
+    store.finish_session(session)
+    store.close()
+
+    reopened = HistoryStore(path)
+    assert reopened.count_entries() == 5
+    entries = reopened.fetch_entries(1, 2)
+    assert [e.text for e in entries] == ["line 1", "line 2"]
+    assert reopened.fetch_entries(0, 1)[0].kind == "prompt"
+    after = reopened.fetch_entries_after(entries[0].id, 2)
+    assert [e.text for e in after] == ["line 2", "line 3"]
+    assert reopened.fetch_entries_before(entries[1].id, 5)[-1] == entries[0]
+    assert [e.text for e in reopened.fetch_entries_before(None, 2)] == ["line 3", "line 4"]
+    (record,) = reopened.list_sessions()
+    assert (record.prompt, record.agent, record.model) == ("fix bug", "Python Expert", "gpt")
+    assert record.status == "finished"
+    assert record.duration is not None and record.duration >= 0
+    assert reopened.list_sessions(before_id=record.id) == []
+    reopened.clear()
+    assert reopened.count_entries() == 0
+    reopened.close()
@@ -0,0 +1,19 @@
+import io
+
+from gui_pyside6.backend.line_reader import iter_lines
+
+
+def test_lines_split_across_chunks_and_multibyte_characters():
+    data = "héllo wörld\r\nsecond\rthird\n\nlast".encode("utf-8")
+    lines = list(iter_lines(io.BytesIO(data), chunk_size=3))
+    assert lines == ["héllo wörld", "second", "third", "", "last"]
+
+
+def test_long_lines_are_soft_wrapped():
+    data = b"x" * 25 + b"\n" + b"y" * 10 + b"\nz"
+    lines = list(iter_lines(io.BytesIO(data), max_line_chars=10, chunk_size=4))
+    assert lines == ["x" * 10, "x" * 10, "x" * 5, "y" * 10, "z"]
+
+
+def test_invalid_bytes_are_replaced():
+    assert list(iter_lines(io.BytesIO(b"ok\xff\n"))) == ["ok�"]
@@ -0,0 +1,63 @@
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+import gui_pyside6
+from gui_pyside6 import JsonFormatter, SamplingFilter
+
+
+def _record(name="gui_pyside6.output", level=logging.INFO, msg="line", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_context_fields():
+    record = _record(msg="hello %s", session=7, agent="Coder", elapsed=1.5)
+    record.args = ("world",)
+    data = json.loads(JsonFormatter().format(record))
+    assert data["msg"] == "hello world"
+    assert data["level"] == "INFO"
+    assert data["logger"] == "gui_pyside6.output"
+    assert (data["session"], data["agent"], data["elapsed"]) == (7, "Coder", 1.5)
+
+
+def test_sampling_filter_keeps_every_nth_info_record():
+    sampler = SamplingFilter({"gui_pyside6.output": 3})
+    kept = [sampler.filter(_record()) for _ in range(9)]
+    assert kept.count(True) == 3
+    assert sampler.filter(_record(level=logging.ERROR))
+    assert sampler.filter(_record(name="gui_pyside6.backend"))
+
+
+def test_queue_handler_defers_formatting_to_listener():
+    records: list[str] = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            records.append(self.format(record))
+
+    target = Collect()
+    target.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    handler = gui_pyside6._NonBlockingQueueHandler(log_queue)
+    listener = QueueListener(log_queue, target)
+    test_logger = logging.getLogger("gui_pyside6.tests.queue")
+    test_logger.propagate = False
+    test_logger.addHandler(handler)
+    listener.start()
+    try:
+        test_logger.warning("value %d", 42, extra={"session": 3})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            test_logger.exception("failed")
+    finally:
+        listener.stop()
+        test_logger.removeHandler(handler)
+
+    first, second = (json.loads(text) for text in records)
+    assert (first["msg"], first["session"]) == ("value 42", 3)
+    assert second["msg"] == "failed"
+    assert "ValueError: boom" in second["exc"]
@@ -0,0 +1,52 @@
+import tracemalloc
+
+import pytest
+
+from gui_pyside6.utils import memory_diagnostics as diag
+
+
+@pytest.fixture
+def tracing():
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def test_snapshot_diff_reports_growth(tmp_path, tracing):
+    old = diag.take_snapshot()
+    leak = [bytearray(1024) for _ in range(200)]  # noqa: F841
+    new = diag.take_snapshot()
+
+    lines = diag.diff_snapshots(old, new)
+    assert any("test_memory_diagnostics.py" in line for line in lines)
+
+    path = diag.export_diff(old, new, tmp_path / "diff.txt")
+    text = path.read_text()
+    assert text.startswith("Snapshot diff written")
+    assert "test_memory_diagnostics.py" in text
+
+
+def test_diagnostics_panel_counts_threads_and_exports(tmp_path, tracing):
+    pytest.importorskip("PySide6")
+    from PySide6.QtCore import QThread
+    from PySide6.QtWidgets import QApplication
+
+    from gui_pyside6.ui.diagnostics_panel import DiagnosticsPanel
+
+    app = QApplication.instance() or QApplication([])
+    panel = DiagnosticsPanel(interval=0)
+    threads = [QThread() for _ in range(3)]
+    panel.refresh()
+    sample = panel.monitor.samples[-1]
+    assert sample.workers >= len(threads)
+    assert sample.running_workers == 0
+    assert panel.details_view.toPlainText().startswith("Live QObjects by class:")
+
+    assert panel.export_diff(str(tmp_path / "none.txt")) is None
+    panel.take_snapshot()
+    panel.take_snapshot()
+    assert panel.export_btn.isEnabled()
+    assert panel.export_diff(str(tmp_path / "diff.txt")).exists()
+    panel.deleteLater()
+    del app
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+import pytest
+
+from gui_pyside6.backend.process_limits import (
+    ResourceLimits,
+    popen_kwargs,
+    wait_with_usage,
+)
+
+
+def test_limits_from_settings_ignore_unset_values():
+    limits = ResourceLimits.from_settings(
+        {"limit_cpu_seconds": 10, "limit_memory_mb": 0, "process_ionice": "9"}
+    )
+    assert limits == ResourceLimits(cpu_seconds=10)
+    assert limits.active
+    assert not ResourceLimits.from_settings({}).active
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX rlimits")
+def test_limits_apply_to_child_and_usage_is_reported():
+    code = (
+        "import os, resource; "
+        "print(resource.getrlimit(resource.RLIMIT_NOFILE)[0], os.nice(0), os.getsid(0) == os.getpid())"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        text=True,
+        **popen_kwargs(ResourceLimits(open_files=64, nice=3)),
+    )
+    output = process.stdout.read().split()
+    return_code, usage = wait_with_usage(process)
+
+    assert return_code == 0
+    assert output[0] == "64"
+    assert int(output[1]) >= 3
+    assert output[2] == "True"
+    assert usage is not None and usage.max_rss_mb > 0
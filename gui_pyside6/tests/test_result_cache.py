@@ -0,0 +1,68 @@
+import sys
+
+import pytest
+
+from gui_pyside6.backend import codex_adapter, result_cache
+from gui_pyside6.backend.result_cache import ResultCache, cache_key
+
+
+def test_cache_key_tracks_attachment_content(tmp_path):
+    source = tmp_path / "a.py"
+    source.write_text("x = 1\n")
+    cmd = ["codex", "--file", "a.py", "explain"]
+    first = cache_key(cmd, {"provider": "openai"}, files=["a.py"], cwd=str(tmp_path))
+    again = cache_key(cmd, {"provider": "openai"}, files=["a.py"], cwd=str(tmp_path))
+    assert first == again
+    source.write_text("x = 2\n")
+    changed = cache_key(cmd, {"provider": "openai"}, files=["a.py"], cwd=str(tmp_path))
+    assert changed != first
+    other = cache_key(cmd, {"provider": "ollama"}, files=["a.py"], cwd=str(tmp_path))
+    assert other != changed
+
+
+def test_result_cache_ttl_and_lru_eviction(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path, ttl=10, max_entries=2)
+    cache.put("a", ["1"])
+    cache.put("b", ["2"])
+    assert cache.get("a") == ["1"]  # "a" is now the most recently used
+    cache.put("c", ["3"])
+    assert cache.get("b") is None
+    assert cache.get("a") == ["1"]
+
+    # A fresh instance rebuilds its index from disk
+    reopened = ResultCache(tmp_path, ttl=10, max_entries=2)
+    assert reopened.get("c") == ["3"]
+    now = result_cache.time.time()
+    monkeypatch.setattr(result_cache.time, "time", lambda: now + 11)
+    assert reopened.get("c") is None
+    assert not (tmp_path / "c.json").exists()
+
+
+def test_start_session_replays_cached_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "_cache", ResultCache(tmp_path))
+    cmd = [sys.executable, "-c", "print('one'); print('two')"]
+    settings = {"use_result_cache": True}
+    first = list(
+        codex_adapter.start_session("p", {}, settings, cmd=cmd, cwd=str(tmp_path))
+    )
+    assert first == ["one", "two"]
+
+    def no_spawn(*args, **kwargs):
+        raise RuntimeError("cached run should not spawn the CLI")
+
+    hits = []
+    monkeypatch.setattr(codex_adapter.subprocess, "Popen", no_spawn)
+    second = list(
+        codex_adapter.start_session(
+            "p", {}, settings, cmd=cmd, cwd=str(tmp_path),
+            on_cache_hit=lambda: hits.append(True),
+        )
+    )
+    assert second == first
+    assert hits == [True]
+    with pytest.raises(RuntimeError, match="spawn"):
+        list(
+            codex_adapter.start_session(
+                "p", {}, settings, cmd=cmd, cwd=str(tmp_path), use_cache=False
+            )
+        )
@@ -0,0 +1,73 @@
+import sys
+import threading
+
+from gui_pyside6 import headless
+from gui_pyside6.backend import codex_adapter, session_recorder
+
+
+def test_recorded_session_replays_same_lines(tmp_path):
+    script = tmp_path / "fake_codex.py"
+    script.write_text(
+        "import time\n"
+        "print('first', flush=True)\n"
+        "time.sleep(0.2)\n"
+        "print('second')\n"
+    )
+    path = tmp_path / "session.jsonl.gz"
+    session = codex_adapter.CodexSession()
+    lines = list(
+        session.run(
+            "hi", {}, {}, cmd=[sys.executable, str(script)], record_to=path
+        )
+    )
+    assert lines == ["first", "second"]
+
+    recording = session_recorder.load_recording(path)
+    assert recording.header["prompt"] == "hi"
+    assert recording.lines == lines
+    assert recording.footer["return_code"] == 0
+    first, second = (offset for offset, _ in recording.events)
+    assert second - first >= 0.15
+    assert list(session_recorder.replay(path, speed=0)) == lines
+
+
+def test_replay_speed_scales_delays(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    recorder = session_recorder.SessionRecorder(path)
+    recorder.record("a")
+    recorder.close()
+    recording = session_recorder.load_recording(path)
+    recording.events = [(0.0, "a"), (2.0, "b"), (4.0, "c")]
+
+    delays = []
+    lines = list(session_recorder.replay(recording, speed=4, sleep=delays.append))
+    assert lines == ["a", "b", "c"]
+    assert len(delays) == 2
+    assert 0.45 < delays[0] <= 0.5 and 0.95 < delays[1] <= 1.0
+
+    assert list(session_recorder.replay(recording, speed=0, sleep=delays.append)) == lines
+    assert len(delays) == 2
+
+    stop = threading.Event()
+    stop.set()
+    assert list(session_recorder.replay(recording, stop=stop)) == []
+
+
+def test_headless_records_and_replays(tmp_path, capsys):
+    script = tmp_path / "fake_codex.py"
+    script.write_text(
+        "import sys\n"
+        "if '--help' in sys.argv: sys.exit(0)\n"
+        "print('echo: ' + sys.argv[-1])\n"
+        "sys.exit(3)\n"
+    )
+    path = tmp_path / "run.jsonl.gz"
+    cli = f'"{sys.executable}" "{script}"'
+    args = ["run", "--provider", "local", "--cli-path", cli, "--no-cache"]
+
+    assert headless.main([*args, "--record", str(path), "hello"]) == 3
+    capsys.readouterr()
+    assert session_recorder.load_recording(path).footer["return_code"] == 3
+
+    assert headless.main(["replay", str(path), "--speed", "0"]) == 3
+    assert capsys.readouterr().out.splitlines() == ["echo: hello"]
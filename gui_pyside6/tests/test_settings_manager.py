@@ -0,0 +1,98 @@
+import json
+
+from gui_pyside6.backend import provider_loader, settings_manager
+from gui_pyside6.backend.settings_manager import SettingsStore
+
+
+def _store(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.setattr(
+        provider_loader, "USER_PROVIDERS_FILE", tmp_path / "providers.json"
+    )
+    return SettingsStore(
+        {"theme": "System", "providers": {"openai": {"name": "OpenAI"}}},
+        path=tmp_path / "settings.json",
+        **kwargs,
+    )
+
+
+def test_version_tracks_changes(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch)
+    start = store.version
+    store["theme"] = "System"
+    assert store.version == start
+    store["theme"] = "Dark"
+    store.update(quiet=True)
+    store.pop("quiet")
+    assert store.version == start + 3
+
+
+def test_save_is_debounced_and_skips_unchanged_files(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch, debounce=60)
+    store["theme"] = "Dark"
+    store.save()
+    store.save()
+    assert not (tmp_path / "settings.json").exists()
+    assert store.dirty
+
+    store.flush()
+    data = json.loads((tmp_path / "settings.json").read_text())
+    assert data == {"theme": "Dark"}
+    assert (tmp_path / "providers.json").exists()
+    assert not store.dirty
+
+    mtime = (tmp_path / "settings.json").stat().st_mtime_ns
+    (tmp_path / "providers.json").unlink()
+    store.flush()
+    assert (tmp_path / "settings.json").stat().st_mtime_ns == mtime
+    assert not (tmp_path / "providers.json").exists()
+
+    # Nested changes are picked up by content comparison
+    store["providers"]["local"] = {"name": "Local"}
+    store.save()
+    store.flush()
+    assert "local" in json.loads((tmp_path / "providers.json").read_text())
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch, debounce=0)
+    store["theme"] = "Light"
+    store.save()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "providers.json",
+        "settings.json",
+    ]
+
+
+def test_save_settings_writes_plain_dict_immediately(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings_manager, "SETTINGS_PATH", tmp_path / "settings.json")
+    monkeypatch.setattr(
+        provider_loader, "USER_PROVIDERS_FILE", tmp_path / "providers.json"
+    )
+    settings_manager.save_settings({"theme": "Dark", "providers": {}})
+    assert json.loads((tmp_path / "settings.json").read_text()) == {"theme": "Dark"}
+
+
+def test_loaded_settings_are_only_written_after_changes(tmp_path, monkeypatch):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"theme": "Dark"}))
+    monkeypatch.setattr(settings_manager, "SETTINGS_PATH", path)
+    monkeypatch.setattr(
+        provider_loader, "USER_PROVIDERS_FILE", tmp_path / "providers.json"
+    )
+    store = settings_manager.load_settings()
+    store.path = path
+    assert store["theme"] == "Dark" and "tts_backend" in store
+    assert not store.dirty
+    store.flush()
+    assert json.loads(path.read_text()) == {"theme": "Dark"}
+    assert not (tmp_path / "providers.json").exists()
+
+    store["theme"] = "Light"
+    store.flush()
+    assert json.loads(path.read_text())["theme"] == "Light"
+
+    # Stores are flushed at exit without being kept alive
+    assert store in settings_manager._stores.values()
+    key = id(store)
+    del store
+    assert key not in settings_manager._stores
@@ -0,0 +1,56 @@
+import io
+import os
+import sys
+
+from gui_pyside6.backend import codex_adapter
+from gui_pyside6.backend.stderr_capture import StderrCapture
+
+
+def test_small_output_stays_in_memory():
+    capture = StderrCapture(io.BytesIO(b"warning\nerror\n")).start()
+    capture.join()
+    assert capture.text() == "warning\nerror\n"
+    assert not capture.truncated
+    assert capture.spill_path is None
+
+
+def test_large_output_keeps_head_and_tail_and_spills():
+    data = b"".join(b"line %06d\n" % i for i in range(20_000))
+    capture = StderrCapture(io.BytesIO(data), head_bytes=100, tail_bytes=100).start()
+    capture.join()
+    text = capture.text()
+    assert capture.truncated
+    assert text.startswith("line 000000\n")
+    assert text.endswith("line 019999\n")
+    assert f"[{len(data) - 200} bytes omitted]" in text
+    with open(capture.spill_path, "rb") as fh:
+        assert fh.read() == data
+    path = capture.spill_path
+    capture.discard()
+    assert not os.path.exists(path)
+
+
+def test_codex_error_keeps_full_stderr_in_file(tmp_path):
+    script = tmp_path / "fake_codex.py"
+    script.write_text(
+        "import sys\n"
+        "for i in range(50_000):\n"
+        "    sys.stderr.write(f'problem {i}\\n')\n"
+        "print('partial')\n"
+        "sys.exit(2)\n"
+    )
+    session = codex_adapter.CodexSession()
+    lines = []
+    try:
+        for line in session.run("p", {}, cmd=[sys.executable, str(script)]):
+            lines.append(line)
+    except codex_adapter.CodexError as exc:
+        error = exc
+    assert lines == ["partial"]
+    assert error.return_code == 2
+    assert len(error.stderr) < 40_000
+    assert error.stderr.startswith("problem 0\n")
+    assert error.stderr.rstrip().endswith("problem 49999")
+    full = error.full_stderr()
+    assert full.count("\n") == 50_000
+    os.unlink(error.stderr_path)
@@ -0,0 +1,71 @@
+from gui_pyside6.plugins import syntax_formatter as fmt
+
+
+def test_format_code_memoizes_by_content(monkeypatch):
+    calls = []
+
+    def upper(text):
+        calls.append(text)
+        return text.upper()
+
+    monkeypatch.setitem(fmt._formatters, "rust", upper)
+    fmt.clear_cache()
+    assert fmt.format_code("rs", "fn main() {}") == ("FN MAIN() {}", None)
+    assert fmt.format_code("rust", "fn main() {}") == ("FN MAIN() {}", None)
+    assert calls == ["fn main() {}"]
+
+    def broken(text):
+        raise fmt.FormatError("bad input")
+
+    monkeypatch.setitem(fmt._formatters, "rust", broken)
+    fmt.clear_cache()
+    assert fmt.format_code("rust", "x") == (None, "bad input")
+
+
+def test_format_prompt_formats_fenced_blocks_by_language(monkeypatch):
+    monkeypatch.setitem(fmt._formatters, "python", lambda text: "formatted()\n")
+    fmt.clear_cache()
+    prompt = (
+        "Fix this:\n"
+        "```python\n"
+        "x=1\n"
+        "```\n"
+        "and this config:\n"
+        "```json\n"
+        '{"a":1}\n'
+        "```\n"
+        "```text\n"
+        "left alone\n"
+        "```\n"
+    )
+    formatted, error = fmt.format_prompt(prompt)
+    assert error is None
+    assert formatted == (
+        "Fix this:\n"
+        "```python\n"
+        "formatted()\n"
+        "```\n"
+        "and this config:\n"
+        "```json\n"
+        '{\n  "a": 1\n}\n'
+        "```\n"
+        "```text\n"
+        "left alone\n"
+        "```\n"
+    )
+    assert fmt.format_prompt('[1,2]') == ("[\n  1,\n  2\n]\n", None)
+
+
+def test_format_code_does_not_memoize_missing_tools(monkeypatch):
+    installed = []
+
+    def rustfmt(text):
+        if not installed:
+            raise fmt.FormatterUnavailable("rustfmt is not installed")
+        return text.strip()
+
+    monkeypatch.setitem(fmt._formatters, "rust", rustfmt)
+    fmt.clear_cache()
+    assert fmt.format_code("rust", " x ") == (None, "rustfmt is not installed")
+    installed.append(True)
+    assert fmt.format_code("rust", " x ") == ("x", None)
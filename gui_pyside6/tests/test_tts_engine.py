@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from gui_pyside6.backend import tts_engine
+from gui_pyside6.backend.tts_engine import AudioCache, TtsBackend, TtsError
+
+# Writes the text itself as the "audio", in the GUI's interpreter
+FAKE = TtsBackend(
+    "fake",
+    ".txt",
+    "def synth(text, voice, out):\n"
+    "    if text == 'boom':\n"
+    "        raise SystemExit('synthesis failed')\n"
+    "    if text == 'slow.':\n"
+    "        import time; time.sleep(60)\n"
+    "    open(out, 'w').write(voice + ':' + text)\n",
+    install=False,
+)
+
+
+def test_split_chunks_starts_small_and_respects_limit():
+    text = "First one. Second sentence here! Third?\nFourth " + "word " * 30
+    chunks = tts_engine.split_chunks(text, max_chars=40)
+    assert chunks[0] == "First one."
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_synthesize_streams_chunks_and_reuses_cache(tmp_path, monkeypatch):
+    cache = AudioCache(tmp_path, max_bytes=10_000)
+    text = "Hello there. General Kenobi."
+    paths = list(tts_engine.synthesize(text, FAKE, "v", cache, max_chars=20))
+    assert [p.read_text() for p in paths] == ["v:Hello there.", "v:General Kenobi."]
+    assert not list(tmp_path.glob("*.part*"))
+
+    other = list(tts_engine.synthesize("Hello there.", FAKE, "w", cache))
+    assert other[0] != paths[0]
+
+    def no_process(*args, **kwargs):
+        raise AssertionError("cached chunks must not be synthesized again")
+
+    monkeypatch.setattr(tts_engine.subprocess, "Popen", no_process)
+    assert list(tts_engine.synthesize(text, FAKE, "v", cache, max_chars=20)) == paths
+    monkeypatch.undo()
+
+    with pytest.raises(TtsError, match="synthesis failed"):
+        list(tts_engine.synthesize("boom", FAKE, "v", cache))
+
+
+def test_audio_cache_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=10)
+    paths = [cache.path_for(FAKE, "", str(i)) for i in range(3)]
+    for path in paths[:2]:
+        path.write_text("12345")
+        cache.add(path)
+    assert cache.get(paths[0]) == paths[0]
+    paths[2].write_text("12345")
+    cache.add(paths[2])
+    assert [p.exists() for p in paths] == [True, False, True]
+    assert cache.get(paths[1]) is None
+    # A fresh instance rebuilds its index from the directory
+    assert AudioCache(tmp_path, max_bytes=10).get(paths[2]) == paths[2]
+
+
+def test_voice_is_configured_per_backend():
+    settings = {"tts_voice_piper": "/models/en.onnx", "tts_voice_gtts": ""}
+    assert tts_engine.voice_for(settings, "piper") == "/models/en.onnx"
+    assert tts_engine.voice_for(settings, "gtts") == ""
+    assert tts_engine.voice_for(settings, "kokoro") == ""
+
+
+def test_stop_kills_helper_while_a_chunk_renders(tmp_path):
+    cache = AudioCache(tmp_path)
+    stop = threading.Event()
+    chunks = tts_engine.synthesize("Quick. slow.", FAKE, "v", cache, stop=stop)
+    assert next(chunks).read_text() == "v:Quick."
+    threading.Timer(0.2, stop.set).start()
+    started = time.monotonic()
+    assert list(chunks) == []
+    assert time.monotonic() - started < 10
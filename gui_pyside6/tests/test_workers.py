@@ -0,0 +1,127 @@
+import os
+import threading
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from gui_pyside6.ui.workers import PooledWorker, worker_pool
+
+
+class RecordingJob(PooledWorker):
+    def __init__(self, idents: set) -> None:
+        super().__init__()
+        self.idents = idents
+
+    def run(self) -> None:
+        self.idents.add(threading.get_ident())
+
+
+def test_pooled_workers_reuse_threads_and_finish_cleanly():
+    app = QApplication.instance() or QApplication([])
+    idents: set[int] = set()
+    running_when_finished = []
+    jobs = [RecordingJob(idents) for _ in range(200)]
+    for job in jobs:
+        job.finished.connect(
+            lambda job=job: running_when_finished.append(job.isRunning())
+        )
+        job.start()
+    for job in jobs:
+        assert job.wait(10)
+    app.processEvents()
+
+    assert running_when_finished == [False] * len(jobs)
+    assert len(idents) <= worker_pool().maxThreadCount()
+
+
+def test_pooled_worker_survives_exceptions():
+    app = QApplication.instance() or QApplication([])
+
+    class FailingJob(PooledWorker):
+        def run(self) -> None:
+            raise RuntimeError("boom")
+
+    job = FailingJob()
+    finished = []
+    job.finished.connect(lambda: finished.append(True))
+    job.start()
+    assert job.wait(10)
+    app.processEvents()
+    assert finished == [True]
+    assert not job.isRunning()
+
+
+def test_pooled_worker_subclasses_must_define_run():
+    with pytest.raises(TypeError, match="must define run"):
+
+        class NoRun(PooledWorker):
+            pass
+
+
+def test_tools_panel_runs_scripts_without_blocking(monkeypatch, tmp_path):
+    app = QApplication.instance() or QApplication([])
+    from gui_pyside6.ui import tools_panel
+
+    (tmp_path / "demo.py").write_text("print('hi')\n")
+    release = threading.Event()
+
+    def slow_run(script_path, backend_name=None, limits=None):
+        # Stands in for creating the backend environment
+        release.wait(10)
+        return 0, f"ran {script_path.name} with {backend_name}", ""
+
+    monkeypatch.setattr(tools_panel, "run_tool_script", slow_run)
+    monkeypatch.setattr(tools_panel, "provision_backends", lambda names: {})
+    monkeypatch.setattr(tools_panel.ToolsPanel, "tools_dir", lambda self: tmp_path)
+    panel = tools_panel.ToolsPanel()
+    panel.list_widget.setCurrentRow(0)
+    panel.backend_combo.addItem("demo-backend", "demo-backend")
+    panel.backend_combo.setCurrentIndex(panel.backend_combo.count() - 1)
+
+    panel.run_selected()
+    assert "Provisioning backend 'demo-backend'" in panel.output_view.toPlainText()
+    assert not panel.run_btn.isEnabled()
+
+    worker = panel.worker
+    release.set()
+    assert worker.wait(10)
+    app.processEvents()
+    assert panel.output_view.toPlainText() == "ran demo.py with demo-backend"
+    assert panel.run_btn.isEnabled()
+    assert panel.worker is None
+
+
+def test_batch_dialog_closes_after_cancelled_items_finish(monkeypatch):
+    app = QApplication.instance() or QApplication([])
+    from gui_pyside6.backend.batch_runner import BatchItem
+    from gui_pyside6.ui import batch_dialog
+
+    release = threading.Event()
+
+    def slow_run(self, items):
+        # Stands in for an item whose CLI is just starting
+        release.wait(10)
+        return []
+
+    monkeypatch.setattr(batch_dialog.BatchRunner, "run", slow_run)
+    monkeypatch.setattr(
+        batch_dialog, "load_items", lambda source, prompt=None: [BatchItem("a", "p")]
+    )
+    dialog = batch_dialog.BatchDialog({}, {})
+    dialog.show()
+    dialog.start_batch()
+    worker = dialog.worker
+
+    dialog.reject()
+    assert dialog.isVisible()
+    assert worker.runner.cancelled
+
+    release.set()
+    assert worker.wait(10)
+    app.processEvents()
+    app.processEvents()
+    assert not dialog.isVisible()
+    assert dialog.worker is None
@@ -23,7 +23,7 @@ from PySide6.QtWidgets import (
     QStackedWidget,
 )
 
-from ..backend.agent_loader import AGENTS_DIR
+from ..backend.agent_loader import USER_AGENTS_DIR
 from ..backend.agent_manager import AgentManager
 
 
@@ -35,7 +35,7 @@ class AgentEditorDialog(QDialog):
     ) -> None:
         super().__init__(parent)
         self.agent_path: Path | None = None
-        data = agent or {}
+        data = dict(agent or {})
         if "_path" in data:
             self.agent_path = Path(data.pop("_path"))
         self.setWindowTitle("Edit Agent" if agent else "New Agent")
@@ -165,10 +165,11 @@ class AgentEditorDialog(QDialog):
         path = self.agent_path
         if path is None:
             default = data["name"].lower().replace(" ", "_") or "agent"
+            USER_AGENTS_DIR.mkdir(parents=True, exist_ok=True)
             file_path, _ = QFileDialog.getSaveFileName(
                 self,
                 "Save Agent",
-                str(AGENTS_DIR / f"{default}.json"),
+                str(USER_AGENTS_DIR / f"{default}.json"),
                 "JSON Files (*.json)",
             )
             if not file_path:
@@ -250,10 +251,11 @@ class AgentJsonDialog(QDialog):
         if data is None:
             return
         default = data.get("name", "agent").lower().replace(" ", "_")
+        USER_AGENTS_DIR.mkdir(parents=True, exist_ok=True)
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "Save Agent As",
-            str(AGENTS_DIR / f"{default}.json"),
+            str(USER_AGENTS_DIR / f"{default}.json"),
             "JSON Files (*.json)",
         )
         if not file_path:
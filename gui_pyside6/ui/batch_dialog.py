@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QDoubleSpinBox,
+    QFileDialog,
+    QFormLayout,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QMessageBox,
+    QPushButton,
+    QSpinBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from .workers import PooledWorker
+from ..backend.batch_runner import BatchItem, BatchResult, BatchRunner, load_items
+
+
+class BatchWorker(PooledWorker):
+    """Run a :class:`BatchRunner` off the GUI thread."""
+
+    result_ready = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, runner: BatchRunner, items: list[BatchItem]) -> None:
+        super().__init__()
+        self.runner = runner
+        self.items = items
+        runner.on_result = self.result_ready.emit
+
+    def run(self) -> None:
+        try:
+            self.runner.run(self.items)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.error.emit(str(exc))
+
+
+class BatchDialog(QDialog):
+    """Run a list of prompts with the active agent and show the results.
+
+    ``agents`` maps names to agents for items that set an ``agent`` column.
+    """
+
+    def __init__(
+        self,
+        agent: dict,
+        settings: dict,
+        agents: dict[str, dict] | None = None,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Batch Run")
+        self.agent = agent
+        self.settings = settings
+        self.agents = agents or {}
+        self.worker: BatchWorker | None = None
+        self._close_pending = False
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        source_row = QHBoxLayout()
+        self.source_edit = QLineEdit()
+        self.source_edit.setPlaceholderText("prompts.jsonl, prompts.csv or src/**/*.py")
+        browse_btn = QPushButton("Browse")
+        browse_btn.clicked.connect(self.browse_source)
+        source_row.addWidget(self.source_edit)
+        source_row.addWidget(browse_btn)
+        form.addRow("Source:", source_row)
+
+        self.prompt_edit = QLineEdit()
+        self.prompt_edit.setPlaceholderText("Prompt template for globs, e.g. Review {path}")
+        form.addRow("Prompt:", self.prompt_edit)
+
+        self.output_edit = QLineEdit("batch_results.jsonl")
+        form.addRow("Results file:", self.output_edit)
+
+        self.resume_check = QCheckBox("Skip items that already succeeded in the results file")
+        self.resume_check.setChecked(True)
+        form.addRow("", self.resume_check)
+
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 32)
+        self.concurrency_spin.setValue(4)
+        form.addRow("Concurrency:", self.concurrency_spin)
+
+        self.retries_spin = QSpinBox()
+        self.retries_spin.setRange(0, 10)
+        self.retries_spin.setValue(2)
+        form.addRow("Retries:", self.retries_spin)
+
+        self.timeout_spin = QDoubleSpinBox()
+        self.timeout_spin.setRange(0, 24 * 3600)
+        self.timeout_spin.setValue(600)
+        self.timeout_spin.setSuffix(" s")
+        form.addRow("Timeout:", self.timeout_spin)
+        layout.addLayout(form)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Item", "Status", "Attempts", "Time"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        btn_row = QHBoxLayout()
+        self.run_btn = QPushButton("Run")
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        close_btn = QPushButton("Close")
+        btn_row.addWidget(self.run_btn)
+        btn_row.addWidget(self.cancel_btn)
+        btn_row.addStretch(1)
+        btn_row.addWidget(close_btn)
+        layout.addLayout(btn_row)
+
+        self.run_btn.clicked.connect(self.start_batch)
+        self.cancel_btn.clicked.connect(self.cancel_batch)
+        close_btn.clicked.connect(self.reject)
+
+    def browse_source(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select Prompt List", "", "Prompt lists (*.jsonl *.ndjson *.csv)"
+        )
+        if path:
+            self.source_edit.setText(path)
+
+    def start_batch(self) -> None:
+        source = self.source_edit.text().strip()
+        try:
+            items = load_items(source, self.prompt_edit.text().strip() or None)
+        except (OSError, ValueError) as exc:
+            QMessageBox.warning(self, "Batch Run", str(exc))
+            return
+        if not items:
+            QMessageBox.information(self, "Batch Run", "No items to run.")
+            return
+        runner = BatchRunner(
+            self.agent,
+            self.settings,
+            agents=self.agents,
+            concurrency=self.concurrency_spin.value(),
+            retries=self.retries_spin.value(),
+            timeout=self.timeout_spin.value() or None,
+            output_path=self.output_edit.text().strip() or None,
+            resume=self.resume_check.isChecked(),
+        )
+        self.table.setRowCount(0)
+        self.summary_label.clear()
+        self.worker = BatchWorker(runner, items)
+        self.worker.result_ready.connect(self.add_result)
+        self.worker.error.connect(lambda msg: QMessageBox.warning(self, "Batch Run", msg))
+        self.worker.finished.connect(self.batch_finished)
+        self.run_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.worker.start()
+
+    def add_result(self, result: BatchResult) -> None:
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        status = QTableWidgetItem(result.status)
+        status.setToolTip(result.error or "\n".join(result.output[-20:]))
+        self.table.setItem(row, 0, QTableWidgetItem(result.id))
+        self.table.setItem(row, 1, status)
+        self.table.setItem(row, 2, QTableWidgetItem(str(result.attempts)))
+        self.table.setItem(row, 3, QTableWidgetItem(f"{result.duration:.1f}s"))
+
+    def cancel_batch(self) -> None:
+        if self.worker is not None:
+            self.worker.runner.cancel()
+
+    def batch_finished(self) -> None:
+        self.run_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        if self.worker is not None:
+            skipped = self.worker.runner.skipped
+            if skipped:
+                self.summary_label.setText(
+                    f"Skipped {skipped} item(s) already completed in the results file."
+                )
+            self.worker.deleteLater()
+            self.worker = None
+
+    def reject(self) -> None:  # type: ignore[override]
+        if self.worker is not None and self.worker.isRunning():
+            # Cancel and close again once the worker is done, instead of
+            # blocking the event loop here
+            if not self._close_pending:
+                self._close_pending = True
+                self.cancel_batch()
+                self.cancel_btn.setEnabled(False)
+                self.worker.finished.connect(self.reject, Qt.QueuedConnection)
+            return
+        super().reject()
@@ -10,16 +10,28 @@ from PySide6.QtWidgets import (
     QPushButton,
 )
 import logging
+from collections import deque
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QObject, Qt, Signal
 
 from .. import logger
 
 
+class _LogBridge(QObject):
+    """Carry log records from any thread to the console on the GUI thread."""
+
+    record = Signal(str, str)  # text, level
+
+
 class DebugConsole(QDockWidget):
-    """Dockable widget that displays log output."""
+    """Dockable widget that displays log output.
 
-    def __init__(self, parent: QWidget | None = None) -> None:
+    Only the last ``max_entries`` messages are kept. New messages are
+    appended to the view instead of redrawing it, and messages logged on
+    other threads are passed to the GUI thread through a queued signal.
+    """
+
+    def __init__(self, parent: QWidget | None = None, max_entries: int = 5000) -> None:
         super().__init__("Debug Console", parent)
         self.setAllowedAreas(Qt.BottomDockWidgetArea | Qt.TopDockWidgetArea)
 
@@ -29,6 +41,7 @@ class DebugConsole(QDockWidget):
 
         self.view = QPlainTextEdit()
         self.view.setReadOnly(True)
+        self.view.setMaximumBlockCount(max_entries)
         layout.addWidget(self.view)
 
         row = QHBoxLayout()
@@ -46,7 +59,10 @@ class DebugConsole(QDockWidget):
         row.addWidget(clear_btn)
         layout.addLayout(row)
 
-        self._entries: list[tuple[str, str]] = []  # (level, text)
+        # (level, text) of the most recent messages
+        self._entries: deque[tuple[str, str]] = deque(maxlen=max_entries)
+        self._bridge = _LogBridge(self)
+        self._bridge.record.connect(self.append)
 
         self.setWidget(container)
 
@@ -58,7 +74,7 @@ class DebugConsole(QDockWidget):
             def emit(self, record: logging.LogRecord) -> None:
                 msg = self.format(record)
                 level = "error" if record.levelno >= logging.ERROR else "info"
-                self.console.append(msg, level)
+                self.console._bridge.record.emit(msg, level)
 
         self._handler = _LogHandler(self)
         self._handler.setFormatter(logging.Formatter("%(message)s"))
@@ -70,7 +86,13 @@ class DebugConsole(QDockWidget):
 
     def append(self, text: str, level: str = "info") -> None:
         self._entries.append((level, text))
-        self._refresh_view()
+        if self._visible(level):
+            self.view.appendPlainText(text)
+
+    def _visible(self, level: str) -> bool:
+        if level == "error":
+            return self.error_check.isChecked()
+        return self.info_check.isChecked()
 
     def append_info(self, text: str) -> None:
         self.append(text, "info")
@@ -83,11 +105,6 @@ class DebugConsole(QDockWidget):
         self.view.clear()
 
     def _refresh_view(self) -> None:
-        show_info = self.info_check.isChecked()
-        show_err = self.error_check.isChecked()
-        lines: list[str] = []
-        for level, text in self._entries:
-            if (level == "info" and show_info) or (level == "error" and show_err):
-                lines.append(text)
+        lines = [text for level, text in self._entries if self._visible(level)]
         self.view.setPlainText("\n".join(lines))
         self.view.verticalScrollBar().setValue(self.view.verticalScrollBar().maximum())
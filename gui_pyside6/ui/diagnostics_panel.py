@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QThread, QTimer
+from PySide6.QtGui import QFontDatabase
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDockWidget,
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QPlainTextEdit,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .. import logger
+from .workers import PooledWorker
+from ..utils import memory_diagnostics as diag
+
+
+class DiagnosticsPanel(QDockWidget):
+    """Dockable view of memory use, live Qt objects and allocation snapshots.
+
+    Every ``interval`` seconds (``0`` disables sampling) the process memory
+    and the number of live ``QObject`` wrappers and background workers are
+    recorded, also while the panel is hidden, so growth over a long session
+    shows up.
+    **Snapshot** records the top ``tracemalloc`` allocators; once two
+    snapshots exist the first is kept as a baseline and **Export Diff**
+    writes what grew between the baseline and the latest snapshot.
+    """
+
+    def __init__(self, parent: QWidget | None = None, interval: float = 10.0) -> None:
+        super().__init__("Diagnostics", parent)
+        self.setObjectName("DiagnosticsPanel")
+        self.monitor = diag.MemoryMonitor()
+        self.baseline = None
+        self.latest = None
+
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        fixed = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        self.history_view = QPlainTextEdit()
+        self.history_view.setReadOnly(True)
+        self.history_view.setFont(fixed)
+        self.history_view.setMaximumBlockCount(self.monitor.max_samples)
+        layout.addWidget(self.history_view)
+
+        self.details_view = QPlainTextEdit()
+        self.details_view.setReadOnly(True)
+        self.details_view.setFont(fixed)
+        self.details_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        layout.addWidget(self.details_view, 2)
+
+        row = QHBoxLayout()
+        self.trace_check = QCheckBox("Trace Allocations")
+        self.trace_check.setToolTip(
+            "Record Python allocations with tracemalloc (slows the GUI down)"
+        )
+        self.trace_check.setChecked(diag.traced_mb() is not None)
+        self.trace_check.toggled.connect(self._toggle_tracing)
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        snapshot_btn = QPushButton("Snapshot")
+        snapshot_btn.clicked.connect(self.take_snapshot)
+        self.export_btn = QPushButton("Export Diff...")
+        self.export_btn.setEnabled(False)
+        self.export_btn.clicked.connect(lambda: self.export_diff())
+        row.addWidget(self.trace_check)
+        row.addStretch(1)
+        row.addWidget(refresh_btn)
+        row.addWidget(snapshot_btn)
+        row.addWidget(self.export_btn)
+        layout.addLayout(row)
+
+        self.setWidget(container)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        if interval > 0:
+            self.timer.start(int(interval * 1000))
+
+    def _toggle_tracing(self, enabled: bool) -> None:
+        if enabled:
+            diag.start_tracing()
+        else:
+            diag.stop_tracing()
+            self.baseline = self.latest = None
+            self.export_btn.setEnabled(False)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Take a memory sample and show the live object counts."""
+        objects = diag.live_instances(QObject)
+        workers = [obj for obj in objects if isinstance(obj, (QThread, PooledWorker))]
+        running = 0
+        for worker in workers:
+            try:
+                running += worker.isRunning()
+            except RuntimeError:
+                # The C++ object is already gone
+                pass
+        sample = self.monitor.sample(len(objects), len(workers), running)
+        self.summary_label.setText(sample.summary())
+        self.history_view.appendPlainText(sample.summary())
+
+        lines = ["Live QObjects by class:"]
+        for name, count in diag.count_by_class(objects).most_common(15):
+            lines.append(f"{count:8d}  {name}")
+        if self.latest is not None:
+            lines += ["", "Top allocations (latest snapshot):"]
+            lines += diag.top_allocations(self.latest)
+        self.details_view.setPlainText("\n".join(lines))
+
+    def take_snapshot(self) -> None:
+        if not self.trace_check.isChecked():
+            # Toggling starts tracing; this first snapshot is the baseline
+            self.trace_check.setChecked(True)
+        snapshot = diag.take_snapshot()
+        if self.baseline is None:
+            self.baseline = snapshot
+        self.latest = snapshot
+        self.export_btn.setEnabled(self.baseline is not self.latest)
+        self.refresh()
+
+    def export_diff(self, path: str | None = None) -> Path | None:
+        if self.baseline is None or self.latest is None:
+            return None
+        if not path:
+            path, _ = QFileDialog.getSaveFileName(
+                self, "Export Snapshot Diff", "memory-diff.txt", "Text Files (*.txt)"
+            )
+            if not path:
+                return None
+        written = diag.export_diff(self.baseline, self.latest, path)
+        logger.info(f"Memory snapshot diff written to {written}")
+        return written
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+from PySide6.QtGui import QBrush, QColor, QFontDatabase
+from PySide6.QtWidgets import QAbstractItemView, QListView, QWidget
+
+from ..backend.history_store import HistoryEntry, HistoryStore
+
+
+class HistoryModel(QAbstractListModel):
+    """List model that pages entries in from a :class:`HistoryStore`.
+
+    Only the row count is kept for the whole history; entries are fetched a
+    page at a time when the view asks for them and at most ``max_pages``
+    pages stay cached, so memory does not grow with the history size.
+
+    Pages are read by keyset from the first or last id of a neighbouring
+    page, which the model remembers for every page it has seen, so
+    scrolling up from the bottom or down from the top costs the same however
+    long the history is. Only a jump to an unvisited page reads by offset.
+    """
+
+    def __init__(
+        self,
+        store: HistoryStore,
+        page_size: int = 200,
+        max_pages: int = 8,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.store = store
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages: OrderedDict[int, list[HistoryEntry]] = OrderedDict()
+        # Page number -> (first id, last id or None) of every page read so far
+        self._bounds: dict[int, tuple[int, int | None]] = {}
+        self._count = store.count_entries()
+        self._prompt_brush = QBrush(QColor("blue"))
+
+    def rowCount(self, parent: QModelIndex | None = None) -> int:  # type: ignore[override]
+        return 0 if parent is not None and parent.isValid() else self._count
+
+    def entry(self, row: int) -> HistoryEntry | None:
+        if not 0 <= row < self._count:
+            return None
+        page_no = row // self.page_size
+        page = self._pages.get(page_no)
+        if page is None or row - page_no * self.page_size >= len(page):
+            page = self._load_page(page_no)
+            self._pages[page_no] = page
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_no)
+        index = row - page_no * self.page_size
+        return page[index] if index < len(page) else None
+
+    def _load_page(self, page_no: int) -> list[HistoryEntry]:
+        size = self.page_size
+        start = page_no * size
+        previous = self._bounds.get(page_no - 1)
+        following = self._bounds.get(page_no + 1)
+        if previous is not None and previous[1] is not None:
+            page = self.store.fetch_entries_after(previous[1], size)
+        elif page_no == (self._count - 1) // size:
+            page = self.store.fetch_entries_before(None, self._count - start)
+        elif following is not None:
+            page = self.store.fetch_entries_before(following[0], size)
+        else:
+            page = self.store.fetch_entries(start, size)
+        if page:
+            # The last id of a partial page changes as rows are appended
+            last = page[-1].id if len(page) == size else None
+            self._bounds[page_no] = (page[0].id, last)
+        return page
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):  # type: ignore[override]
+        if not index.isValid():
+            return None
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole, Qt.ForegroundRole):
+            return None
+        entry = self.entry(index.row())
+        if entry is None:
+            return None
+        if role == Qt.DisplayRole:
+            return f"> {entry.text}" if entry.kind == "prompt" else entry.text
+        if role == Qt.ToolTipRole:
+            return datetime.fromtimestamp(entry.ts).strftime("%Y-%m-%d %H:%M:%S")
+        if entry.kind == "prompt":
+            return self._prompt_brush
+        return None
+
+    def rows_appended(self, count: int = 1) -> None:
+        """Notify the view that ``count`` entries were added to the store."""
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._count, self._count + count - 1)
+        self._count += count
+        self.endInsertRows()
+
+    def refresh(self) -> None:
+        """Re-read the row count and drop cached pages."""
+        self.beginResetModel()
+        self._pages.clear()
+        self._bounds.clear()
+        self._count = self.store.count_entries()
+        self.endResetModel()
+
+
+class HistoryPanel(QListView):
+    """Read-only view over the persistent session history."""
+
+    def __init__(self, store: HistoryStore, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.store = store
+        self.history_model = HistoryModel(store, parent=self)
+        self.setModel(self.history_model)
+        self.setUniformItemSizes(True)
+        self.setWordWrap(False)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.scrollToBottom()
+
+    def record(self, session_id: int | None, text: str, kind: str = "output") -> None:
+        """Store ``text`` and show it at the end of the list."""
+        at_bottom = (
+            self.verticalScrollBar().value() >= self.verticalScrollBar().maximum()
+        )
+        self.store.append(session_id, text, kind)
+        self.history_model.rows_appended(1)
+        if at_bottom:
+            self.scrollToBottom()
+
+    def session_started(self) -> None:
+        """Show the prompt row written by :meth:`HistoryStore.start_session`."""
+        self.history_model.rows_appended(1)
+        self.scrollToBottom()
+
+    def clear(self) -> None:
+        self.store.clear()
+        self.history_model.refresh()
+
+    def toPlainText(self) -> str:
+        """Return every row as text, like ``QPlainTextEdit.toPlainText``.
+
+        This loads the whole history and is meant for small histories.
+        """
+        model = self.history_model
+        return "\n".join(
+            model.data(model.index(row)) or "" for row in range(model.rowCount())
+        )
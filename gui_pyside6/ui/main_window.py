@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 
-from PySide6.QtCore import QThread, Signal, Qt, QStringListModel, QSize, QUrl
+from PySide6.QtCore import QObject, Signal, Qt, QStringListModel, QSize, QUrl
 from PySide6.QtGui import (
     QFontDatabase,
     QAction,
@@ -33,6 +33,7 @@ from PySide6.QtWidgets import (
     QFileDialog,
     QLineEdit,
     QLabel,
+    QCheckBox,
     QStyle,
     QProgressDialog,
 )
@@ -40,18 +41,29 @@ from PySide6.QtWidgets import (
 from .settings_dialog import SettingsDialog
 from .tools_panel import ToolsPanel
 from .debug_console import DebugConsole
+from .patch_view import DiffParseWorker, PatchView
+from .diagnostics_panel import DiagnosticsPanel
+from .workers import PooledWorker
+from .history_panel import HistoryPanel
 from .agent_editor_dialog import AgentEditorDialog, AgentJsonDialog
-from ..backend.settings_manager import save_settings
-from .. import logger
+from ..backend.settings_manager import save_settings, flush_settings
+from .. import get_logger, logger
 
-from ..backend import codex_adapter
+from ..backend import codex_adapter, session_recorder
 from ..backend.agent_manager import AgentManager
+from ..backend.history_store import HistoryStore
 from ..plugins.loader import load_plugins
-from ..utils.highlighter import PythonHighlighter
+from ..utils.highlighter import OutputHighlighter
+from ..utils.diff_model import DiffAccumulator, PatchModel
 from ..utils.file_scanner import find_source_files
 from ..utils.project_paths import get_common_paths
 from ..utils.api_key import ensure_api_key, ensure_base_url
 from pathlib import Path
+import threading
+import time
+
+# Lines streamed by workers; sampled in the log file (CODEX_GUI_LOG_SAMPLING)
+output_logger = get_logger("output")
 
 
 class ImageDropList(QListWidget):
@@ -135,13 +147,12 @@ class PromptEdit(QPlainTextEdit):
             self.pathCompletionRequested.emit()
 
 
-class CodexWorker(QThread):
-    """Worker thread to stream Codex output."""
+class CodexWorker(PooledWorker):
+    """Pooled worker to stream Codex output."""
 
     line_received = Signal(str)
     log_line = Signal(str, str)  # level, text
     error = Signal(str)
-    finished = Signal()
 
     def __init__(
         self,
@@ -152,6 +163,9 @@ class CodexWorker(QThread):
         images: list[str] | None = None,
         files: list[str] | None = None,
         cwd: str | None = None,
+        cmd: list[str] | None = None,
+        use_cache: bool | None = None,
+        record_to: str | Path | None = None,
     ) -> None:
         super().__init__()
         self.prompt = prompt
@@ -161,8 +175,11 @@ class CodexWorker(QThread):
         self.images = images or []
         self.files = files or []
         self.cwd = cwd
+        self.cmd = cmd
+        self.use_cache = use_cache
+        self.record_to = record_to
 
-    def run(self) -> None:  # type: ignore[override]
+    def run(self) -> None:
         try:
             for line in codex_adapter.start_session(
                 self.prompt,
@@ -172,6 +189,12 @@ class CodexWorker(QThread):
                 images=self.images,
                 files=self.files,
                 cwd=self.cwd,
+                cmd=self.cmd,
+                use_cache=self.use_cache,
+                on_cache_hit=lambda: self.log_line.emit(
+                    "info", "Replaying cached result"
+                ),
+                record_to=self.record_to,
             ):
                 self.line_received.emit(line)
                 self.log_line.emit("info", line)
@@ -181,27 +204,66 @@ class CodexWorker(QThread):
                 self.log_line.emit("error", err_line)
             self.line_received.emit(f"Error: {exc}")
             self.log_line.emit("error", str(exc))
+            if exc.stderr_path:
+                self.log_line.emit(
+                    "info", f"Complete stderr output: {exc.stderr_path}"
+                )
             self.error.emit(exc.stderr.strip() or str(exc))
         except Exception as exc:  # pylint: disable=broad-except
             self.line_received.emit(f"Error: {exc}")
             self.log_line.emit("error", str(exc))
         finally:
-            self.finished.emit()
+            usage = codex_adapter.session_usage()
+            if usage is not None:
+                self.log_line.emit("info", f"Resource usage: {usage.summary()}")
 
 
-class CodexCommandWorker(QThread):
-    """Worker thread for simple Codex CLI commands."""
+class ReplayWorker(PooledWorker):
+    """Pooled worker that replays a recorded session."""
+
+    line_received = Signal(str)
+    log_line = Signal(str, str)
+    error = Signal(str)
+
+    def __init__(self, path: str | Path, speed: float = 1.0) -> None:
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        count = 0
+        start = time.perf_counter()
+        try:
+            recording = session_recorder.load_recording(self.path)
+            for line in session_recorder.replay(
+                recording, speed=self.speed, stop=self.stop_event
+            ):
+                self.line_received.emit(line)
+                self.log_line.emit("info", line)
+                count += 1
+            elapsed = time.perf_counter() - start
+            self.log_line.emit(
+                "info", f"Replayed {count} lines in {elapsed:.2f}s from {self.path}"
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            self.line_received.emit(f"Error: {exc}")
+            self.log_line.emit("error", str(exc))
+            self.error.emit(str(exc))
+
+
+class CodexCommandWorker(PooledWorker):
+    """Pooled worker for simple Codex CLI commands."""
 
     line_received = Signal(str)
     log_line = Signal(str, str)
     error = Signal(str)
-    finished = Signal()
 
     def __init__(self, run_fn) -> None:
         super().__init__()
         self.run_fn = run_fn
 
-    def run(self) -> None:  # type: ignore[override]
+    def run(self) -> None:
         self.log_line.emit("debug", "Spawning CLI command")
         try:
             for line in self.run_fn():
@@ -225,19 +287,33 @@ class CodexCommandWorker(QThread):
             self.error.emit(str(exc))
         finally:
             self.log_line.emit("debug", "CLI command finished")
-            self.finished.emit()
 
 
 class MainWindow(QMainWindow):
     """Primary application window."""
 
-    def __init__(self, agent_manager: AgentManager, settings: dict) -> None:
+    def __init__(
+        self,
+        agent_manager: AgentManager,
+        settings: dict,
+        history_store: HistoryStore | None = None,
+    ) -> None:
         super().__init__()
         self.agent_manager = agent_manager
         self.settings = settings
-        self.worker: QThread | None = None
+        self.history_store = history_store or HistoryStore()
+        self._history_session: int | None = None
+        # When the current session or command started, for log timings
+        self._session_started = time.monotonic()
+        self.worker: PooledWorker | None = None
         self._session_failed = False
+        self._session_stopped = False
+        self._close_pending = False
         self.progress_dialog: QProgressDialog | None = None
+        self._diff_lines = DiffAccumulator()
+        # Line count last shown in the "[Diff]" placeholder, 0 if none
+        self._diff_shown = 0
+        self._diff_workers: list[DiffParseWorker] = []
 
         self.setWindowTitle("Codex-GUI")
 
@@ -262,6 +338,10 @@ class MainWindow(QMainWindow):
         self.stop_action.triggered.connect(self.stop_codex)
         file_menu.addAction(self.stop_action)
 
+        batch_action = QAction("Batch Run...", self)
+        batch_action.triggered.connect(self.open_batch_dialog)
+        file_menu.addAction(batch_action)
+
         settings_action = QAction("Settings", self)
         settings_action.triggered.connect(self.open_settings_dialog)
         settings_menu.addAction(settings_action)
@@ -304,6 +384,18 @@ class MainWindow(QMainWindow):
         self.debug_console.visibilityChanged.connect(toggle_console_action.setChecked)
         view_menu.addAction(toggle_console_action)
 
+        self.patch_view = PatchView(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.patch_view)
+        self.patch_view.hide()
+        view_menu.addAction(self.patch_view.toggleViewAction())
+
+        self.diagnostics_panel = DiagnosticsPanel(
+            self, interval=float(self.settings.get("diagnostics_interval", 60) or 0)
+        )
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.diagnostics_panel)
+        self.diagnostics_panel.hide()
+        view_menu.addAction(self.diagnostics_panel.toggleViewAction())
+
         clear_history_action = QAction("Clear History", self)
         clear_history_action.triggered.connect(self.clear_history)
         history_menu.addAction(clear_history_action)
@@ -316,6 +408,10 @@ class MainWindow(QMainWindow):
         view_action.triggered.connect(self.select_rollout_file)
         history_menu.addAction(view_action)
 
+        replay_action = QAction("Replay Recording...", self)
+        replay_action.triggered.connect(self.select_recording_file)
+        history_menu.addAction(replay_action)
+
         # Instantiate status bar
         self.status_bar = self.statusBar()
 
@@ -447,7 +543,7 @@ class MainWindow(QMainWindow):
         inner_splitter.setStretchFactor(1, 2)
         center_layout.addWidget(inner_splitter)
 
-        self.highlighter = PythonHighlighter(self.output_view.document())
+        self.highlighter = OutputHighlighter(self.output_view.document())
 
         button_bar = QHBoxLayout()
         center_layout.addLayout(button_bar)
@@ -466,6 +562,13 @@ class MainWindow(QMainWindow):
         self.stop_btn.clicked.connect(self.stop_codex)
         button_bar.addWidget(self.stop_btn)
 
+        self.bypass_cache_check = QCheckBox("Bypass Cache")
+        self.bypass_cache_check.setToolTip(
+            "Run the CLI even if an identical run is in the result cache"
+        )
+        button_bar.addWidget(self.bypass_cache_check)
+        self._update_cache_toggle()
+
         QShortcut(
             QKeySequence(Qt.CTRL | Qt.Key_Return), self
         ).activated.connect(self.start_codex)
@@ -479,8 +582,7 @@ class MainWindow(QMainWindow):
         splitter.addWidget(center_widget)
 
         # ----------------------- Right Panel -----------------------
-        self.history_view = QPlainTextEdit()
-        self.history_view.setReadOnly(True)
+        self.history_view = HistoryPanel(self.history_store)
         splitter.addWidget(self.history_view)
 
         splitter.setStretchFactor(1, 1)
@@ -502,6 +604,11 @@ class MainWindow(QMainWindow):
         # Load optional plugins defined in plugins/manifest.json
         load_plugins(self)
 
+    @property
+    def current_session_id(self) -> int | None:
+        """History id of the running session, as logged in ``session`` fields."""
+        return self._history_session
+
     def start_codex(
         self, prompt: str | None = None, view_path: str | None = None
     ) -> None:
@@ -535,11 +642,19 @@ class MainWindow(QMainWindow):
         agent_item = self.agent_list.currentItem()
         agent_name = agent_item.text() if agent_item else ""
         self.agent_manager.set_active_agent(agent_name)
-        self.settings["selected_agent"] = agent_name
-        save_settings(self.settings)
+        if self.settings.get("selected_agent") != agent_name:
+            self.settings["selected_agent"] = agent_name
+            save_settings(self.settings)
         agent = self.agent_manager.active_agent or {}
 
         self.output_view.clear()
+        self._history_session = self.history_store.start_session(
+            prompt_text,
+            agent=agent_name,
+            model=str(self.settings.get("model", "")),
+            provider=provider,
+        )
+        self.history_view.session_started()
         image_paths = [
             self.image_list.item(i).data(Qt.UserRole)
             for i in range(self.image_list.count())
@@ -565,6 +680,7 @@ class MainWindow(QMainWindow):
         if self.settings.get("verbose"):
             self.append_output("$ " + cmd_str)
         logger.info("$ " + cmd_str)
+        codex_adapter.prepare_session()
         self.worker = CodexWorker(
             prompt_text,
             agent,
@@ -573,8 +689,17 @@ class MainWindow(QMainWindow):
             images=image_paths,
             files=file_paths,
             cwd=cwd_arg,
+            cmd=cmd,
+            use_cache=self._use_result_cache(),
+            record_to=(
+                session_recorder.recording_path()
+                if self.settings.get("record_sessions")
+                else None
+            ),
         )
         self._session_failed = False
+        self._session_stopped = False
+        self._session_started = time.monotonic()
         self.worker.line_received.connect(self.append_output)
         self.worker.log_line.connect(self.handle_log_line)
         self.worker.error.connect(self._session_error)
@@ -597,6 +722,50 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage(msg)
 
     def append_output(self, text: str) -> None:
+        # Diffs are held back until they end so large ones can be shown in
+        # the patch view instead of line by line; meanwhile a placeholder
+        # line shows how much has arrived.
+        completed = self._diff_lines.feed(text)
+        if completed:
+            self._remove_diff_placeholder()
+            self._show_diff(completed)
+        if self._diff_lines.active:
+            self._update_diff_placeholder()
+        else:
+            self._insert_output(text)
+
+    def _diff_placeholder_cursor(self) -> QTextCursor | None:
+        """Return a cursor selecting the placeholder, the last line of output."""
+        if not self._diff_shown:
+            return None
+        cursor = self.output_view.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.movePosition(QTextCursor.PreviousBlock)
+        if not cursor.block().text().startswith("[Diff]"):
+            return None
+        cursor.movePosition(QTextCursor.StartOfBlock)
+        cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        return cursor
+
+    def _update_diff_placeholder(self) -> None:
+        count = self._diff_lines.line_count
+        if self._diff_shown and count - self._diff_shown < 50:
+            return
+        text = f"[Diff] receiving... {count} lines"
+        cursor = self._diff_placeholder_cursor()
+        if cursor is None:
+            cursor = self.output_view.textCursor()
+            cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text + "\n", QTextCharFormat())
+        self._diff_shown = count
+
+    def _remove_diff_placeholder(self) -> None:
+        cursor = self._diff_placeholder_cursor()
+        if cursor is not None:
+            cursor.removeSelectedText()
+        self._diff_shown = 0
+
+    def _insert_output(self, text: str) -> None:
         cursor = self.output_view.textCursor()
         cursor.movePosition(QTextCursor.End)
         fmt = QTextCharFormat()
@@ -606,32 +775,91 @@ class MainWindow(QMainWindow):
         cursor.insertText(text + "\n", fmt)
         self.output_view.setTextCursor(cursor)
         if not is_error:
-            self.history_view.appendPlainText(text)
+            self.history_view.record(self._history_session, text)
+
+    def _show_diff(self, lines: list[str]) -> None:
+        if len(lines) < int(self.settings.get("patch_view_min_lines", 200)):
+            self._insert_output("\n".join(lines))
+            return
+        self._insert_output(
+            f"[Patch] {len(lines)} diff lines shown in the Patch View"
+        )
+        worker = DiffParseWorker(lines)
+        worker.parsed.connect(self._patch_parsed)
+        worker.finished.connect(lambda w=worker: self._diff_worker_done(w))
+        self._diff_workers.append(worker)
+        worker.start()
+
+    def _diff_worker_done(self, worker: DiffParseWorker) -> None:
+        if worker in self._diff_workers:
+            self._diff_workers.remove(worker)
+        worker.deleteLater()
+
+    def _patch_parsed(self, model: PatchModel) -> None:
+        self.patch_view.add_patch(model)
+        self.patch_view.show()
+        self.patch_view.raise_()
+        self.status_bar.showMessage(f"Patch: {model.summary()}")
 
     def handle_log_line(self, level: str, text: str) -> None:
+        extra = {
+            "session": self._history_session,
+            "agent": self.settings.get("selected_agent") or None,
+            "elapsed": round(time.monotonic() - self._session_started, 3),
+        }
         if level == "error":
-            logger.error(text)
+            output_logger.error(text, extra=extra)
+        elif level == "debug":
+            output_logger.debug(text, extra=extra)
         else:
-            logger.info(text)
+            output_logger.info(text, extra=extra)
 
     def session_finished(self) -> None:
+        pending = self._diff_lines.finish()
+        self._remove_diff_placeholder()
+        if pending:
+            self._show_diff(pending)
+        if self._session_failed:
+            status = "failed"
+        elif self._session_stopped:
+            status = "stopped"
+        else:
+            status = "finished"
+        if self._history_session is not None:
+            self.history_store.finish_session(self._history_session, status)
+            self._history_session = None
         self.run_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.run_action.setEnabled(True)
         self.stop_action.setEnabled(False)
         self._stop_spinner()
-        if self._session_failed:
-            self.status_bar.showMessage("Session failed")
-        else:
-            self.status_bar.showMessage("Session finished")
-        logger.info("Session finished")
+        self.status_bar.showMessage(f"Session {status}")
+        logger.info(f"Session {status}")
+        self._release_worker()
+
+    def _release_worker(self) -> None:
+        """Drop the finished worker and delete it with its connections."""
+        worker, self.worker = self.worker, None
+        if isinstance(worker, QObject):
+            worker.deleteLater()
 
     def stop_codex(self) -> None:
-        codex_adapter.stop_session()
-        if self.worker and self.worker.isRunning():
-            self.worker.wait(1000)
-        self.session_finished()
-        logger.info("Codex session stopped")
+        """Ask the running session to stop without blocking the GUI.
+
+        The CLI gets SIGTERM and is killed if it has not exited in time;
+        :meth:`session_finished` runs when the worker reports it is done.
+        """
+        if not (self.worker and self.worker.isRunning()) or self._session_stopped:
+            return
+        self._session_stopped = True
+        if isinstance(self.worker, ReplayWorker):
+            self.worker.stop_event.set()
+        else:
+            codex_adapter.stop_session()
+        self.stop_btn.setEnabled(False)
+        self.stop_action.setEnabled(False)
+        self.status_bar.showMessage("Stopping session...")
+        logger.info("Stopping Codex session")
 
     def on_agent_changed(self, name: str) -> None:
         """Handle selection changes in the agent list."""
@@ -644,12 +872,34 @@ class MainWindow(QMainWindow):
     def open_settings_dialog(self) -> None:
         dialog = SettingsDialog(self.settings, self, debug_console=self.debug_console)
         dialog.exec()
+        self._update_cache_toggle()
         self.status_bar.showMessage("Settings updated")
 
+    def _use_result_cache(self) -> bool:
+        return bool(self.settings.get("use_result_cache")) and (
+            not self.bypass_cache_check.isChecked()
+        )
+
+    def _update_cache_toggle(self) -> None:
+        self.bypass_cache_check.setVisible(
+            bool(self.settings.get("use_result_cache"))
+        )
+
     def open_tools_panel(self) -> None:
         dialog = ToolsPanel(self, debug_console=self.debug_console)
         dialog.exec()
 
+    def open_batch_dialog(self) -> None:
+        from .batch_dialog import BatchDialog
+
+        dialog = BatchDialog(
+            self.agent_manager.active_agent or {},
+            self.settings,
+            agents={a.get("name", ""): a for a in self.agent_manager.agents},
+            parent=self,
+        )
+        dialog.exec()
+
     def open_plugin_manager(self) -> None:
         from .plugin_manager_dialog import PluginManagerDialog
 
@@ -688,11 +938,13 @@ class MainWindow(QMainWindow):
         self.history_view.clear()
 
     def refresh_agent_list(self) -> None:
+        self.agent_list.setUpdatesEnabled(False)
         self.agent_list.clear()
         for agent in self.agent_manager.agents:
             item = QListWidgetItem(agent.get("name", ""))
             item.setToolTip(agent.get("description", ""))
             self.agent_list.addItem(item)
+        self.agent_list.setUpdatesEnabled(True)
 
     def _start_spinner(self) -> None:
         if self.progress_dialog:
@@ -944,6 +1196,56 @@ class MainWindow(QMainWindow):
         if filename:
             self.view_rollout(filename)
 
+    def select_recording_file(self) -> None:
+        filename, _ = QFileDialog.getOpenFileName(
+            self,
+            "Select recording",
+            str(session_recorder.RECORDINGS_DIR),
+            "Recordings (*.jsonl.gz)",
+        )
+        if not filename:
+            return
+        speeds = ["1x", "2x", "10x", "Maximum"]
+        choice, ok = QInputDialog.getItem(
+            self, "Replay Speed", "Speed:", speeds, 0, False
+        )
+        if not ok:
+            return
+        speed = 0.0 if choice == "Maximum" else float(choice.rstrip("x"))
+        self.replay_session(filename, speed)
+
+    def replay_session(self, path: str | Path, speed: float = 1.0) -> None:
+        """Feed a recorded session through the output view and history.
+
+        ``speed`` scales the original timing; ``0`` replays as fast as
+        possible. No CLI is started.
+        """
+        if self.worker and self.worker.isRunning():
+            return
+        self.output_view.clear()
+        self._history_session = self.history_store.start_session(
+            f"[Replay] {Path(path).name}",
+            agent="",
+            model="",
+            provider="replay",
+        )
+        self.history_view.session_started()
+        self.worker = ReplayWorker(path, speed)
+        self._session_failed = False
+        self._session_stopped = False
+        self._session_started = time.monotonic()
+        self.worker.line_received.connect(self.append_output)
+        self.worker.log_line.connect(self.handle_log_line)
+        self.worker.error.connect(self._session_error)
+        self.worker.finished.connect(self.session_finished)
+        self._start_spinner()
+        self.worker.start()
+        self.run_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.run_action.setEnabled(False)
+        self.stop_action.setEnabled(True)
+        self.status_bar.showMessage(f"Replaying {Path(path).name}...")
+
     # ------------------------------------------------------------------
     # CLI helper commands
     # ------------------------------------------------------------------
@@ -978,6 +1280,7 @@ class MainWindow(QMainWindow):
             logger.error(str(exc))
             return
         self.output_view.clear()
+        codex_adapter.prepare_session()
         self.worker = CodexCommandWorker(fn)
         self.worker.line_received.connect(self.append_output)
         self.worker.log_line.connect(self.handle_log_line)
@@ -985,10 +1288,13 @@ class MainWindow(QMainWindow):
         self.worker.finished.connect(
             lambda: self._command_finished(done_msg), Qt.QueuedConnection
         )
+        self._session_stopped = False
+        self._session_started = time.monotonic()
         self.run_btn.setEnabled(False)
         self.run_action.setEnabled(False)
-        self.stop_btn.setEnabled(False)
-        self.stop_action.setEnabled(False)
+        # Commands stream through the default session, so Stop works for them
+        self.stop_btn.setEnabled(True)
+        self.stop_action.setEnabled(True)
         self.login_action.setEnabled(False)
         self.free_action.setEnabled(False)
         self.status_bar.showMessage("Running command...")
@@ -1016,14 +1322,22 @@ class MainWindow(QMainWindow):
         self.free_action.setEnabled(True)
         self.status_bar.showMessage(msg)
         logger.info(msg)
-        self.worker = None
+        self._release_worker()
 
     def closeEvent(self, event) -> None:  # type: ignore[override]
         """Handle the window closing."""
         if self.worker and self.worker.isRunning():
-            # If a Codex session or command is running, stop it first
-            self.stop_codex()
-            # Ensure the worker thread has fully finished
-            self.worker.wait()
+            # Stop the session and close again once the worker is done,
+            # instead of blocking the event loop here
+            if not self._close_pending:
+                self._close_pending = True
+                self.stop_codex()
+                self.worker.finished.connect(self.close, Qt.QueuedConnection)
+            event.ignore()
+            return
+        for worker in list(self._diff_workers):
+            worker.wait()
         save_settings(self.settings)
+        flush_settings(self.settings)
+        self.history_store.close()
         super().closeEvent(event)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QBrush, QColor, QFontDatabase
+from PySide6.QtWidgets import (
+    QDockWidget,
+    QHBoxLayout,
+    QPushButton,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .workers import PooledWorker
+from ..utils.diff_model import FileDiff, Hunk, PatchModel, parse_unified_diff
+
+_LINE_COLORS = {"+": "darkGreen", "-": "red", "\\": "gray"}
+
+
+class DiffParseWorker(PooledWorker):
+    """Parse diff lines into a :class:`PatchModel` off the GUI thread."""
+
+    parsed = Signal(object)
+
+    def __init__(self, lines: list[str]) -> None:
+        super().__init__()
+        self.lines = lines
+
+    def run(self) -> None:
+        self.parsed.emit(parse_unified_diff(self.lines))
+
+
+class PatchView(QDockWidget):
+    """Dockable tree of parsed patches.
+
+    Patches are listed per file and hunk. Hunks start collapsed and their
+    lines are only turned into tree items when a hunk is first expanded.
+    """
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__("Patch View", parent)
+        self.setAllowedAreas(
+            Qt.RightDockWidgetArea | Qt.BottomDockWidgetArea | Qt.LeftDockWidgetArea
+        )
+
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Change", "+", "-"])
+        self.tree.setUniformRowHeights(True)
+        self.tree.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.tree.itemExpanded.connect(self._populate_hunk)
+        layout.addWidget(self.tree)
+
+        row = QHBoxLayout()
+        row.addStretch(1)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear)
+        row.addWidget(clear_btn)
+        layout.addLayout(row)
+
+        self.setWidget(container)
+        self._brushes = {
+            prefix: QBrush(QColor(color)) for prefix, color in _LINE_COLORS.items()
+        }
+
+    def add_patch(self, model: PatchModel) -> QTreeWidgetItem:
+        """Add ``model`` as a new top-level entry and return its item."""
+        root = QTreeWidgetItem(
+            [f"Patch: {model.summary()}", str(model.added), str(model.removed)]
+        )
+        root.addChildren([self._file_item(diff) for diff in model.files])
+        self.tree.addTopLevelItem(root)
+        root.setExpanded(True)
+        self.tree.scrollToItem(root)
+        return root
+
+    def clear(self) -> None:
+        self.tree.clear()
+
+    def _file_item(self, diff: FileDiff) -> QTreeWidgetItem:
+        item = QTreeWidgetItem(
+            [diff.path or "(unknown file)", str(diff.added), str(diff.removed)]
+        )
+        item.setToolTip(0, "\n".join(diff.header))
+        item.addChildren([self._hunk_item(hunk) for hunk in diff.hunks])
+        return item
+
+    def _hunk_item(self, hunk: Hunk) -> QTreeWidgetItem:
+        item = QTreeWidgetItem([hunk.header, str(hunk.added), str(hunk.removed)])
+        item.setData(0, Qt.UserRole, hunk)
+        if hunk.line_count:
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        return item
+
+    def _populate_hunk(self, item: QTreeWidgetItem) -> None:
+        hunk = item.data(0, Qt.UserRole)
+        if not isinstance(hunk, Hunk) or item.childCount():
+            return
+        children = []
+        for line in hunk.lines:
+            child = QTreeWidgetItem([line])
+            brush = self._brushes.get(line[:1])
+            if brush is not None:
+                child.setForeground(0, brush)
+            children.append(child)
+        self.tree.setUpdatesEnabled(False)
+        item.addChildren(children)
+        self.tree.setUpdatesEnabled(True)
@@ -237,6 +237,15 @@ class SettingsDialog(QDialog):
         self.auto_scan_check = QCheckBox("Auto Scan Files")
         self.auto_scan_check.setChecked(bool(settings.get("auto_scan_files", True)))
         misc_layout.addWidget(self.auto_scan_check)
+
+        self.result_cache_check = QCheckBox("Cache Results")
+        self.result_cache_check.setToolTip(
+            "Replay the output of identical runs (same command, files and images)"
+        )
+        self.result_cache_check.setChecked(
+            bool(settings.get("use_result_cache", False))
+        )
+        misc_layout.addWidget(self.result_cache_check)
         layout.addWidget(misc_row)
 
         layout.addWidget(QLabel("Free Credit Timeout (s):"))
@@ -520,6 +529,7 @@ class SettingsDialog(QDialog):
         self.settings["project_doc"] = self.project_doc_edit.text().strip()
         self.settings["writable_root"] = self.writable_root_edit.text().strip()
         self.settings["auto_scan_files"] = self.auto_scan_check.isChecked()
+        self.settings["use_result_cache"] = self.result_cache_check.isChecked()
         self.settings["redeem_timeout"] = int(self.free_timeout_spin.value())
         save_settings(self.settings)
         super().accept()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+from PySide6.QtCore import Signal
 from PySide6.QtWidgets import (
     QDialog,
     QVBoxLayout,
@@ -15,7 +16,33 @@ from PySide6.QtWidgets import (
     QMessageBox,
 )
 
+from ..backend.process_limits import ResourceLimits
 from ..backend.tool_runner import run_tool_script
+from ..backend.backend_installer import provision_backends
+from .workers import PooledWorker
+
+
+class ToolRunWorker(PooledWorker):
+    """Install the backend if needed and run a tool script off the GUI thread."""
+
+    done = Signal(int, str, str)  # return code, stdout, stderr
+    failed = Signal(str)
+
+    def __init__(self, script_path: Path, backend_name: str | None, limits) -> None:
+        super().__init__()
+        self.script_path = script_path
+        self.backend_name = backend_name
+        self.limits = limits
+
+    def run(self) -> None:
+        try:
+            code, stdout, stderr = run_tool_script(
+                self.script_path, backend_name=self.backend_name, limits=self.limits
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            self.failed.emit(str(exc))
+        else:
+            self.done.emit(code, stdout, stderr)
 
 
 class ToolsPanel(QDialog):
@@ -24,6 +51,7 @@ class ToolsPanel(QDialog):
     def __init__(self, parent=None, debug_console=None) -> None:
         super().__init__(parent)
         self.debug_console = debug_console
+        self.worker: ToolRunWorker | None = None
         self.setWindowTitle("Tools")
 
         layout = QVBoxLayout(self)
@@ -37,6 +65,7 @@ class ToolsPanel(QDialog):
         self.backend_combo.addItem("(none)", None)
         for name in self.available_backends():
             self.backend_combo.addItem(name, name)
+        self.backend_combo.currentIndexChanged.connect(self.prepare_backend)
         row.addWidget(self.backend_combo)
         self.run_btn = QPushButton("Run")
         self.close_btn = QPushButton("Close")
@@ -69,6 +98,12 @@ class ToolsPanel(QDialog):
         except Exception:  # pylint: disable=broad-except
             return []
 
+    def prepare_backend(self) -> None:
+        """Start provisioning the selected backend's environment in the background."""
+        backend_name = self.backend_combo.currentData()
+        if backend_name:
+            provision_backends([backend_name])
+
     def load_scripts(self) -> None:
         self.list_widget.clear()
         tools = self.tools_dir()
@@ -81,14 +116,43 @@ class ToolsPanel(QDialog):
         if not item:
             QMessageBox.information(self, "No Selection", "Please select a script.")
             return
+        if self.worker is not None:
+            return
         script_path = self.tools_dir() / item.text()
         backend_name = self.backend_combo.currentData()
-        _, stdout, stderr = run_tool_script(
-            script_path,
-            backend_name=backend_name,
+        settings = getattr(self.parent(), "settings", None)
+        self.output_view.clear()
+        if backend_name:
+            # Creating the environment and installing packages can take minutes
+            self.output_view.appendPlainText(
+                f"Provisioning backend '{backend_name}' and running {item.text()}..."
+            )
+        else:
+            self.output_view.appendPlainText(f"Running {item.text()}...")
+        self.run_btn.setEnabled(False)
+        worker = ToolRunWorker(
+            script_path, backend_name, ResourceLimits.from_settings(settings)
         )
+        worker.done.connect(self._tool_done)
+        worker.failed.connect(self._tool_failed)
+        worker.finished.connect(self._tool_finished)
+        self.worker = worker
+        worker.start()
+
+    def _tool_done(self, code: int, stdout: str, stderr: str) -> None:
         self.output_view.clear()
         if stdout:
             self.output_view.appendPlainText(stdout)
         if stderr:
             self.output_view.appendPlainText(stderr)
+        if code:
+            self.output_view.appendPlainText(f"Exited with code {code}")
+
+    def _tool_failed(self, message: str) -> None:
+        self.output_view.appendPlainText(f"Error: {message}")
+
+    def _tool_finished(self) -> None:
+        if self.worker is not None:
+            self.worker.deleteLater()
+            self.worker = None
+        self.run_btn.setEnabled(True)
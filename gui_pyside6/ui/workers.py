@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+
+from PySide6.QtCore import QObject, QThread, QThreadPool, Signal
+
+from .. import logger
+
+_pool: QThreadPool | None = None
+
+
+def worker_pool() -> QThreadPool:
+    """Return the thread pool shared by the GUI's background workers.
+
+    Idle threads are reused for the next job and retired after 30 seconds,
+    so the number of threads stays bounded however many jobs run. A pool of
+    its own keeps long Codex sessions from occupying
+    ``QThreadPool.globalInstance()``.
+    """
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setObjectName("codex-gui-workers")
+        _pool.setMaxThreadCount(max(8, QThread.idealThreadCount()))
+        _pool.setExpiryTimeout(30_000)
+    return _pool
+
+
+class PooledWorker(QObject):
+    """A background job that runs :meth:`run` on :func:`worker_pool`.
+
+    The interface matches the ``QThread`` subclasses it replaces (``start``,
+    ``isRunning``, ``wait`` and a ``finished`` signal), but no thread is
+    created per job. ``isRunning()`` is already ``False`` when ``finished``
+    is emitted, so the receiver can start the next job or release the
+    worker with ``deleteLater()`` right away.
+
+    Subclasses must define ``run()``, which is called on a pool thread and
+    reports its results through the subclass's own signals; defining a
+    subclass without it raises ``TypeError``.
+    """
+
+    finished = Signal()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if not callable(getattr(cls, "run", None)):
+            raise TypeError(f"{cls.__name__} must define run()")
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._running = False
+        self._done = threading.Event()
+        self._done.set()
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._done.clear()
+        worker_pool().start(self._execute)
+
+    def _execute(self) -> None:
+        try:
+            self.run()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error(f"{type(self).__name__} failed: {exc}")
+        finally:
+            self._running = False
+            self.finished.emit()
+            self._done.set()
+
+    def isRunning(self) -> bool:
+        return self._running
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the job is done; ``False`` if ``timeout`` ran out."""
+        return self._done.wait(timeout)
@@ -3,9 +3,10 @@ from __future__ import annotations
 import json
 import os
 from pathlib import Path
-from PySide6.QtWidgets import QWidget, QDialog, QInputDialog
+from typing import TYPE_CHECKING
 
-from ..ui.api_key_dialog import ApiKeyDialog
+if TYPE_CHECKING:  # Qt is only imported when a dialog has to be shown
+    from PySide6.QtWidgets import QWidget
 
 CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
 KEY_FILE = CONFIG_DIR / "api_keys.json"
@@ -37,17 +38,12 @@ def _save_key(provider: str, key: str) -> None:
         pass
 
 
-def ensure_api_key(provider: str, parent: QWidget | None = None) -> bool:
-    """Ensure an API key is available for *provider*.
+def lookup_api_key(provider: str) -> str | None:
+    """Return the API key for *provider* without prompting.
 
-    Looks for ``<PROVIDER>_API_KEY`` or ``OPENAI_API_KEY`` in the environment.
-    If not found, tries ``config/api_keys.json`` and sets the variable when a
-    stored key exists. Otherwise an :class:`ApiKeyDialog` is shown. If the user
-    confirms the dialog and chooses to remember the key it will be written to the
-    config file. Returns ``True`` when a key is available, ``False`` if the
-    dialog was cancelled.
+    Checks ``<PROVIDER>_API_KEY``, ``OPENAI_API_KEY`` and then
+    ``config/api_keys.json``. A stored key is exported to the environment.
     """
-
     provider = provider.lower()
     env_var = f"{provider.upper()}_API_KEY"
 
@@ -59,10 +55,50 @@ def ensure_api_key(provider: str, parent: QWidget | None = None) -> bool:
             os.environ[env_var] = api_key
             if provider == "openai":
                 os.environ.setdefault("OPENAI_API_KEY", api_key)
+    return api_key or None
+
+
+def lookup_base_url(provider: str, default_url: str | None = None) -> str | None:
+    """Return the base URL for *provider* without prompting.
+
+    Uses ``<PROVIDER>_BASE_URL``, ``OPENAI_BASE_URL`` or *default_url* and
+    exports the result like :func:`ensure_base_url`.
+    """
+    provider = provider.lower()
+    env_var = f"{provider.upper()}_BASE_URL"
+
+    base_url = (
+        os.getenv(env_var)
+        or os.getenv("OPENAI_BASE_URL")
+        or default_url
+    )
+    if base_url:
+        os.environ[env_var] = base_url
+        if provider == "openai":
+            os.environ.setdefault("OPENAI_BASE_URL", base_url)
+    return base_url or None
+
+
+def ensure_api_key(provider: str, parent: QWidget | None = None) -> bool:
+    """Ensure an API key is available for *provider*.
 
-    if api_key:
+    Looks for ``<PROVIDER>_API_KEY`` or ``OPENAI_API_KEY`` in the environment.
+    If not found, tries ``config/api_keys.json`` and sets the variable when a
+    stored key exists. Otherwise an :class:`ApiKeyDialog` is shown. If the user
+    confirms the dialog and chooses to remember the key it will be written to the
+    config file. Returns ``True`` when a key is available, ``False`` if the
+    dialog was cancelled.
+    """
+
+    if lookup_api_key(provider):
         return True
 
+    from PySide6.QtWidgets import QDialog
+
+    from ..ui.api_key_dialog import ApiKeyDialog
+
+    provider = provider.lower()
+    env_var = f"{provider.upper()}_API_KEY"
     dialog = ApiKeyDialog(provider, parent)
     if dialog.exec() == QDialog.Accepted:
         key = dialog.api_key()
@@ -91,21 +127,13 @@ def ensure_base_url(
     dialog was cancelled.
     """
 
-    provider = provider.lower()
-    env_var = f"{provider.upper()}_BASE_URL"
-
-    base_url = (
-        os.getenv(env_var)
-        or os.getenv("OPENAI_BASE_URL")
-        or default_url
-    )
-
-    if base_url:
-        os.environ[env_var] = base_url
-        if provider == "openai":
-            os.environ.setdefault("OPENAI_BASE_URL", base_url)
+    if lookup_base_url(provider, default_url):
         return True
 
+    from PySide6.QtWidgets import QInputDialog
+
+    provider = provider.lower()
+    env_var = f"{provider.upper()}_BASE_URL"
     url, ok = QInputDialog.getText(
         parent,
         f"{provider.capitalize()} Base URL",
@@ -0,0 +1,265 @@
+"""Compact model of unified diffs printed by the Codex CLI."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterable
+
+# Lines that start a unified diff in plain output, and lines that continue one
+DIFF_START_PREFIXES = ("diff --git ", "diff -", "--- a/", "+++ b/", "@@ -", "Index: ")
+DIFF_CONTINUATION_PREFIXES = (
+    " ", "+", "-", "@@", "\\", "diff ", "index ", "new file", "deleted file",
+    "old mode", "new mode", "similarity", "rename ", "Binary files",
+)
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def is_diff_start(line: str) -> bool:
+    return line.startswith(DIFF_START_PREFIXES)
+
+
+def is_diff_continuation(line: str) -> bool:
+    return not line or line.startswith(DIFF_CONTINUATION_PREFIXES)
+
+
+@dataclass
+class Hunk:
+    """One ``@@`` section. The body is kept as a single string."""
+
+    header: str
+    old_start: int = 0
+    old_count: int = 0
+    new_start: int = 0
+    new_count: int = 0
+    added: int = 0
+    removed: int = 0
+    line_count: int = 0
+    body: str = ""
+
+    @property
+    def lines(self) -> list[str]:
+        return self.body.split("\n") if self.line_count else []
+
+
+@dataclass
+class FileDiff:
+    """Changes to a single file."""
+
+    old_path: str = ""
+    new_path: str = ""
+    header: list[str] = field(default_factory=list)
+    hunks: list[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        if self.new_path and self.new_path != "/dev/null":
+            return self.new_path
+        return self.old_path
+
+    @property
+    def added(self) -> int:
+        return sum(h.added for h in self.hunks)
+
+    @property
+    def removed(self) -> int:
+        return sum(h.removed for h in self.hunks)
+
+
+@dataclass
+class PatchModel:
+    """Parsed patch made of one or more file diffs."""
+
+    files: list[FileDiff] = field(default_factory=list)
+    line_count: int = 0
+
+    @property
+    def added(self) -> int:
+        return sum(f.added for f in self.files)
+
+    @property
+    def removed(self) -> int:
+        return sum(f.removed for f in self.files)
+
+    def summary(self) -> str:
+        count = len(self.files)
+        noun = "file" if count == 1 else "files"
+        return f"{count} {noun} changed, +{self.added} -{self.removed}"
+
+
+def _strip_prefix(path: str) -> str:
+    path = path.split("\t", 1)[0].strip()
+    if path.startswith(("a/", "b/")):
+        return path[2:]
+    return path
+
+
+def _close_hunk(hunk: Hunk | None, body: list[str]) -> None:
+    if hunk is not None:
+        hunk.body = "\n".join(body)
+        hunk.line_count = len(body)
+
+
+def parse_unified_diff(lines: Iterable[str]) -> PatchModel:
+    """Parse unified diff ``lines`` into a :class:`PatchModel`.
+
+    Text outside of any recognised file header is attached to a file entry
+    without paths so that nothing is dropped.
+    """
+    model = PatchModel()
+    current: FileDiff | None = None
+    hunk: Hunk | None = None
+    body: list[str] = []
+    total = 0
+    old_left = new_left = 0
+
+    for line in lines:
+        total += 1
+        if old_left > 0 or new_left > 0:
+            # Inside a hunk the line counts decide, so removed lines such as
+            # "--- x" are not mistaken for file headers.
+            body.append(line)
+            if line.startswith("+"):
+                hunk.added += 1
+                new_left -= 1
+            elif line.startswith("-"):
+                hunk.removed += 1
+                old_left -= 1
+            elif not line.startswith("\\"):
+                old_left -= 1
+                new_left -= 1
+            continue
+
+        starts_file = line.startswith(("diff ", "Index: ")) or (
+            line.startswith("--- ") and (current is None or current.hunks or hunk)
+        )
+        if starts_file:
+            _close_hunk(hunk, body)
+            hunk, body = None, []
+            current = FileDiff(header=[line])
+            model.files.append(current)
+            if line.startswith("diff --git "):
+                parts = line.split(" ")
+                if len(parts) >= 4:
+                    current.old_path = _strip_prefix(parts[2])
+                    current.new_path = _strip_prefix(parts[3])
+            elif line.startswith("--- "):
+                current.old_path = _strip_prefix(line[4:])
+            continue
+
+        if current is None:
+            current = FileDiff()
+            model.files.append(current)
+
+        match = _HUNK_RE.match(line)
+        if match:
+            _close_hunk(hunk, body)
+            body = []
+            old_start, old_count, new_start, new_count = match.groups()
+            hunk = Hunk(
+                header=line,
+                old_start=int(old_start),
+                old_count=int(old_count) if old_count is not None else 1,
+                new_start=int(new_start),
+                new_count=int(new_count) if new_count is not None else 1,
+            )
+            current.hunks.append(hunk)
+            old_left, new_left = hunk.old_count, hunk.new_count
+            continue
+
+        if hunk is None:
+            current.header.append(line)
+            if line.startswith("--- "):
+                current.old_path = _strip_prefix(line[4:])
+            elif line.startswith("+++ "):
+                current.new_path = _strip_prefix(line[4:])
+            continue
+
+        # Trailing lines after the counted body, e.g. "\ No newline at end"
+        body.append(line)
+
+    _close_hunk(hunk, body)
+    model.line_count = total
+    return model
+
+
+# Lines that may follow a complete hunk, or come before the first one
+_FILE_HEADER_PREFIXES = (
+    "diff ", "index ", "--- ", "+++ ", "new file", "deleted file", "old mode",
+    "new mode", "similarity", "rename ", "Binary files", "Index: ",
+)
+
+
+class DiffAccumulator:
+    """Collect diff lines out of a line stream.
+
+    :meth:`feed` returns the lines of a diff once the first line that does
+    not belong to it arrives. While :attr:`active` is ``True`` the line just
+    fed was taken into the current diff, and :attr:`line_count` tells how
+    many lines it has so far.
+
+    Hunk bodies are measured by the counts in their ``@@ -a,b +c,d @@``
+    header. Once both counts are used up only another hunk, a file header or
+    a ``\\ No newline`` marker continues the diff, so text after a patch
+    that happens to start with ``-``, ``+`` or a space is not swallowed.
+    """
+
+    def __init__(self) -> None:
+        self._lines: list[str] = []
+        self._old_left = 0
+        self._new_left = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self._lines)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._lines)
+
+    def _start_hunk(self, line: str) -> bool:
+        match = _HUNK_RE.match(line)
+        if match is None:
+            return False
+        _, old_count, _, new_count = match.groups()
+        self._old_left = int(old_count) if old_count is not None else 1
+        self._new_left = int(new_count) if new_count is not None else 1
+        return True
+
+    def _continues(self, line: str) -> bool:
+        if self._old_left > 0 or self._new_left > 0:
+            if line.startswith("+"):
+                self._new_left -= 1
+            elif line.startswith("-"):
+                self._old_left -= 1
+            elif not line or line.startswith(" "):
+                # Trailing whitespace of empty context lines is often stripped
+                self._old_left -= 1
+                self._new_left -= 1
+            elif not line.startswith("\\"):
+                return False
+            return True
+        if line.startswith("@@"):
+            return self._start_hunk(line)
+        return line.startswith(("\\", *_FILE_HEADER_PREFIXES))
+
+    def feed(self, line: str) -> list[str] | None:
+        completed = None
+        if self._lines:
+            if self._continues(line):
+                self._lines.append(line)
+                return None
+            completed = self.finish()
+        if is_diff_start(line):
+            self._start_hunk(line)
+            self._lines.append(line)
+        return completed
+
+    def finish(self) -> list[str] | None:
+        """Return the pending diff lines, if any, and reset."""
+        self._old_left = self._new_left = 0
+        if not self._lines:
+            return None
+        lines, self._lines = self._lines, []
+        return lines
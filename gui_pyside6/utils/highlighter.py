@@ -1,62 +1,378 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from PySide6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor
 from PySide6.QtCore import QRegularExpression
 
+from .diff_model import is_diff_continuation, is_diff_start
+
+
+PYTHON_KEYWORDS = [
+    "and",
+    "as",
+    "assert",
+    "break",
+    "class",
+    "continue",
+    "def",
+    "del",
+    "elif",
+    "else",
+    "except",
+    "False",
+    "finally",
+    "for",
+    "from",
+    "global",
+    "if",
+    "import",
+    "in",
+    "is",
+    "lambda",
+    "None",
+    "nonlocal",
+    "not",
+    "or",
+    "pass",
+    "raise",
+    "return",
+    "True",
+    "try",
+    "while",
+    "with",
+    "yield",
+]
+
+_JS_KEYWORDS = [
+    "async", "await", "break", "case", "catch", "class", "const", "continue",
+    "default", "delete", "do", "else", "export", "extends", "false", "finally",
+    "for", "from", "function", "if", "import", "in", "instanceof", "interface",
+    "let", "new", "null", "return", "static", "super", "switch", "this",
+    "throw", "true", "try", "type", "typeof", "undefined", "var", "void",
+    "while", "yield",
+]
+
+_RUST_KEYWORDS = [
+    "as", "async", "await", "break", "const", "continue", "crate", "else",
+    "enum", "extern", "false", "fn", "for", "if", "impl", "in", "let", "loop",
+    "match", "mod", "move", "mut", "pub", "ref", "return", "Self", "self",
+    "static", "struct", "super", "trait", "true", "type", "unsafe", "use",
+    "where", "while",
+]
+
+_SHELL_KEYWORDS = [
+    "case", "do", "done", "elif", "else", "esac", "export", "fi", "for",
+    "function", "if", "in", "local", "return", "then", "until", "while",
+]
+
+_DQ_STRING = r'"(?:[^"\\]|\\.)*"'
+_SQ_STRING = r"'(?:[^'\\]|\\.)*'"
+_NUMBER = r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+
+
+def _words(words: list[str]) -> str:
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+
+# Token tables per language. Each rule is ``(token, regex)``; the regexes must
+# not contain capturing groups because the matched alternative is identified
+# by its group number. ``multiline`` lists ``(open, close, token)`` for
+# constructs that may span blocks; their openers use the ``multiline`` token.
+_LANGUAGES: dict[str, dict] = {
+    "python": {
+        "aliases": ("py", "python3", "py3"),
+        "rules": [
+            ("keyword", _words(PYTHON_KEYWORDS)),
+            ("comment", r"#.*"),
+            ("multiline", r"\"\"\"|'''"),
+            ("string", f"{_DQ_STRING}|{_SQ_STRING}"),
+            ("number", _NUMBER),
+        ],
+        "multiline": (('"""', '"""', "string"), ("'''", "'''", "string")),
+    },
+    "javascript": {
+        "aliases": ("js", "jsx", "ts", "tsx", "typescript", "mjs", "node"),
+        "rules": [
+            ("keyword", _words(_JS_KEYWORDS)),
+            ("comment", r"//.*"),
+            ("multiline", r"/\*"),
+            ("string", f"{_DQ_STRING}|{_SQ_STRING}|`(?:[^`\\\\]|\\\\.)*`"),
+            ("number", _NUMBER),
+        ],
+        "multiline": (("/*", "*/", "comment"),),
+    },
+    "rust": {
+        "aliases": ("rs",),
+        "rules": [
+            ("keyword", _words(_RUST_KEYWORDS)),
+            ("comment", r"//.*"),
+            ("multiline", r"/\*"),
+            ("string", _DQ_STRING),
+            ("number", _NUMBER),
+        ],
+        "multiline": (("/*", "*/", "comment"),),
+    },
+    "json": {
+        "aliases": ("jsonc", "jsonl"),
+        "rules": [
+            ("keyword", _words(["true", "false", "null"])),
+            ("string", _DQ_STRING),
+            ("number", r"-?" + _NUMBER),
+        ],
+        "multiline": (),
+    },
+    "bash": {
+        "aliases": ("sh", "shell", "zsh", "console", "shell-session"),
+        "rules": [
+            ("keyword", _words(_SHELL_KEYWORDS)),
+            ("comment", r"(?<![^\s])#.*"),
+            ("string", f"{_DQ_STRING}|{_SQ_STRING}"),
+        ],
+        "multiline": (),
+    },
+}
+
+_ALIASES = {
+    alias: name
+    for name, spec in _LANGUAGES.items()
+    for alias in (name, *spec["aliases"])
+}
+_ALIASES.update({"diff": "diff", "patch": "diff", "udiff": "diff"})
+
+# Stable numeric ids stored in the block state; ``0`` is an unknown language
+_LANGUAGE_IDS = [None, "diff", *_LANGUAGES]
+
+_TOKEN_COLORS = {
+    "keyword": "blue",
+    "comment": "darkGreen",
+    "string": "darkRed",
+    "number": "darkMagenta",
+    "fence": "gray",
+    "diff_header": "darkBlue",
+    "diff_hunk": "darkCyan",
+    "diff_added": "darkGreen",
+    "diff_removed": "red",
+}
+
+# Block states of OutputHighlighter. Fenced blocks pack the language id, the
+# fence character and the lexer's multi-line state above _STATE_FENCE.
+_STATE_PROSE = -1
+_STATE_DIFF = 1
+_STATE_FENCE = 16
+
+
+def _format(color: str) -> QTextCharFormat:
+    fmt = QTextCharFormat()
+    fmt.setForeground(QColor(color))
+    return fmt
+
+
+@lru_cache(maxsize=None)
+def token_formats() -> dict[str, QTextCharFormat]:
+    """Return the character format used for each token type."""
+    return {token: _format(color) for token, color in _TOKEN_COLORS.items()}
+
+
+def canonical_language(name: str) -> str | None:
+    """Return the lexer name for a fence info string such as ``py``."""
+    return _ALIASES.get(name.strip().lower())
+
+
+class Lexer:
+    """Token table of one language compiled into a single alternation."""
+
+    __slots__ = ("name", "pattern", "tokens", "multiline")
+
+    def __init__(self, name: str, rules: list[tuple[str, str]], multiline) -> None:
+        self.name = name
+        self.pattern = QRegularExpression("|".join(f"({regex})" for _, regex in rules))
+        self.pattern.optimize()
+        # Group number -> token; group 0 is the whole match
+        self.tokens = (None, *(token for token, _ in rules))
+        self.multiline = tuple(multiline)
+
+
+@lru_cache(maxsize=None)
+def _compile_lexer(name: str) -> Lexer:
+    spec = _LANGUAGES[name]
+    return Lexer(name, spec["rules"], spec["multiline"])
+
+
+def get_lexer(name: str) -> Lexer | None:
+    """Return the compiled lexer for ``name``; compiled once per language."""
+    canonical = canonical_language(name)
+    if canonical not in _LANGUAGES:
+        return None
+    return _compile_lexer(canonical)
+
+
+class _LexingHighlighter(QSyntaxHighlighter):
+    """Shared formatting routines for the highlighters below."""
 
-class PythonHighlighter(QSyntaxHighlighter):
-    """Basic syntax highlighter for Python code."""
+    # Blocks longer than this are left unformatted; huge single-line outputs
+    # (minified files, base64 blobs) are not worth highlighting.
+    max_block_length = 10_000
 
     def __init__(self, document) -> None:
         super().__init__(document)
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor("blue"))
-        keywords = [
-            "and",
-            "as",
-            "assert",
-            "break",
-            "class",
-            "continue",
-            "def",
-            "del",
-            "elif",
-            "else",
-            "except",
-            "False",
-            "finally",
-            "for",
-            "from",
-            "global",
-            "if",
-            "import",
-            "in",
-            "is",
-            "lambda",
-            "None",
-            "nonlocal",
-            "not",
-            "or",
-            "pass",
-            "raise",
-            "return",
-            "True",
-            "try",
-            "while",
-            "with",
-            "yield",
-        ]
-        self.rules = [
-            (QRegularExpression(fr"\b{kw}\b"), keyword_format) for kw in keywords
-        ]
-
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("darkGreen"))
-        self.rules.append((QRegularExpression(r"#[^\n]*"), comment_format))
+        self.formats = token_formats()
+
+    @property
+    def keyword_format(self) -> QTextCharFormat:
+        return self.formats["keyword"]
+
+    @property
+    def comment_format(self) -> QTextCharFormat:
+        return self.formats["comment"]
+
+    @property
+    def string_format(self) -> QTextCharFormat:
+        return self.formats["string"]
+
+    def _highlight_code(self, text: str, lexer: Lexer, inner: int) -> int:
+        """Format ``text`` with ``lexer`` and return the new multi-line state.
+
+        ``inner`` is ``0`` outside multi-line constructs, otherwise the index
+        plus one of the entry in ``lexer.multiline`` that is still open.
+        """
+        offset = 0
+        if inner:
+            offset = self._close_multiline(text, 0, lexer.multiline[inner - 1])
+            if offset == -1:
+                return inner
+        if not text or len(text) > self.max_block_length:
+            return 0
+
+        tokens = lexer.tokens
+        it = lexer.pattern.globalMatch(text, offset)
+        while it.hasNext():
+            match = it.next()
+            token = tokens[match.lastCapturedIndex()]
+            start = match.capturedStart()
+            if token != "multiline":
+                self.setFormat(start, match.capturedLength(), self.formats[token])
+                continue
+            opener = match.captured()
+            # The block state stores which multiline construct is open
+            index, entry = next(
+                (i, e) for i, e in enumerate(lexer.multiline) if e[0] == opener
+            )
+            self.setFormat(start, len(opener), self.formats[entry[2]])
+            end = self._close_multiline(text, start + len(opener), entry)
+            if end == -1:
+                return index + 1
+            it = lexer.pattern.globalMatch(text, end)
+        return 0
+
+    def _close_multiline(self, text: str, start: int, entry: tuple) -> int:
+        """Format up to the closing delimiter of ``entry``.
+
+        Returns the offset after the delimiter, or ``-1`` if the construct
+        continues past this block.
+        """
+        _, close, token = entry
+        found = text.find(close, start)
+        end = len(text) if found == -1 else found + len(close)
+        self.setFormat(start, end - start, self.formats[token])
+        return -1 if found == -1 else end
+
+    def _highlight_diff_line(self, text: str) -> None:
+        if text.startswith(("+++", "---", "diff ", "index ", "Index: ")):
+            token = "diff_header"
+        elif text.startswith("@@"):
+            token = "diff_hunk"
+        elif text.startswith("+"):
+            token = "diff_added"
+        elif text.startswith("-"):
+            token = "diff_removed"
+        else:
+            return
+        self.setFormat(0, len(text), self.formats[token])
+
+
+class CodeHighlighter(_LexingHighlighter):
+    """Highlight a whole document as code in a single language."""
+
+    def __init__(self, document, language: str = "python") -> None:
+        super().__init__(document)
+        self.lexer = get_lexer(language)
+        if self.lexer is None:
+            raise ValueError(f"No lexer for language: {language}")
+
+    def highlightBlock(self, text: str) -> None:  # type: ignore[override]
+        inner = max(self.previousBlockState(), 0)
+        inner = self._highlight_code(text, self.lexer, inner)
+        self.setCurrentBlockState(inner or -1)
+
+
+class PythonHighlighter(CodeHighlighter):
+    """Basic syntax highlighter for Python code.
+
+    All rules are compiled into one alternation so each block is scanned in a
+    single left-to-right pass. Triple-quoted strings that span several lines
+    are tracked through the block state.
+    """
+
+    def __init__(self, document) -> None:
+        super().__init__(document, "python")
+
+
+def _fence_state(language_id: int, tilde: bool, inner: int) -> int:
+    return _STATE_FENCE + ((language_id << 3) | (int(tilde) << 2) | inner)
+
+
+def _split_fence_state(state: int) -> tuple[int, bool, int]:
+    value = state - _STATE_FENCE
+    return value >> 3, bool(value & 4), value & 3
+
+
+class OutputHighlighter(_LexingHighlighter):
+    """Highlighter for mixed Codex output.
+
+    Plain prose is left alone without running any regular expression. Fenced
+    code blocks (```` ```lang ````) are dispatched to the lexer of their
+    language and unified diffs, fenced or not, get per-line diff colors. The
+    current region is carried from block to block through the block state.
+    """
 
     def highlightBlock(self, text: str) -> None:  # type: ignore[override]
-        for pattern, fmt in self.rules:
-            it = pattern.globalMatch(text)
-            while it.hasNext():
-                match = it.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
+        state = self.previousBlockState()
+        if state >= _STATE_FENCE:
+            self.setCurrentBlockState(self._highlight_fenced(text, state))
+            return
+        if state == _STATE_DIFF and is_diff_continuation(text):
+            self._highlight_diff_line(text)
+            self.setCurrentBlockState(_STATE_DIFF)
+            return
+
+        self.setCurrentBlockState(_STATE_PROSE)
+        if not text:
+            return
+        stripped = text.lstrip()
+        if stripped.startswith(("```", "~~~")):
+            info = stripped[3:].strip(stripped[0]).split(maxsplit=1)
+            language = canonical_language(info[0]) if info else None
+            language_id = _LANGUAGE_IDS.index(language) if language else 0
+            self.setFormat(0, len(text), self.formats["fence"])
+            self.setCurrentBlockState(
+                _fence_state(language_id, stripped[0] == "~", 0)
+            )
+        elif is_diff_start(text):
+            self._highlight_diff_line(text)
+            self.setCurrentBlockState(_STATE_DIFF)
+
+    def _highlight_fenced(self, text: str, state: int) -> int:
+        language_id, tilde, inner = _split_fence_state(state)
+        stripped = text.strip()
+        fence_char = "~" if tilde else "`"
+        if stripped.startswith(fence_char * 3) and not stripped.strip(fence_char):
+            self.setFormat(0, len(text), self.formats["fence"])
+            return _STATE_PROSE
+
+        language = _LANGUAGE_IDS[language_id]
+        if language == "diff":
+            self._highlight_diff_line(text)
+        elif language is not None:
+            inner = self._highlight_code(text, get_lexer(language), inner)
+        return _fence_state(language_id, tilde, inner)
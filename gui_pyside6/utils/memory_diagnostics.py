@@ -0,0 +1,175 @@
+"""Memory snapshots and live object counts for long-running sessions."""
+
+from __future__ import annotations
+
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Allocations made by the profiler itself are left out of reports
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+def process_rss_mb() -> float | None:
+    """Return the resident memory of this process in MB, if it is known.
+
+    The resident set includes memory allocated by Qt and other native code,
+    which ``tracemalloc`` does not see.
+    """
+    try:
+        import psutil  # type: ignore
+
+        return psutil.Process().memory_info().rss / 1e6
+    except Exception:  # pylint: disable=broad-except
+        pass
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def start_tracing(frames: int = 10) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing() -> None:
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def traced_mb() -> float | None:
+    """Return the Python memory traced by ``tracemalloc``, or ``None``."""
+    if not tracemalloc.is_tracing():
+        return None
+    current, _peak = tracemalloc.get_traced_memory()
+    return current / 1e6
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    """Take a ``tracemalloc`` snapshot, starting tracing if necessary.
+
+    Allocations traced before tracing was started are not included, so
+    the first snapshot after starting is a baseline.
+    """
+    start_tracing()
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces(
+        [tracemalloc.Filter(False, name) for name in _IGNORED_FILES]
+    )
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, limit: int = 20) -> list[str]:
+    """Describe the source lines holding the most memory in ``snapshot``."""
+    stats = snapshot.statistics("lineno")
+    lines = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  "
+            f"{frame.filename}:{frame.lineno}"
+        )
+    return lines
+
+
+def diff_snapshots(
+    old: tracemalloc.Snapshot, new: tracemalloc.Snapshot, limit: int = 50
+) -> list[str]:
+    """Describe the source lines whose memory changed most between snapshots."""
+    stats = new.compare_to(old, "lineno")
+    lines = []
+    for stat in stats[:limit]:
+        if not stat.size_diff and not stat.count_diff:
+            continue
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks "
+            f"({stat.size / 1024:.1f} KiB total)  {frame.filename}:{frame.lineno}"
+        )
+    return lines
+
+
+def export_diff(
+    old: tracemalloc.Snapshot,
+    new: tracemalloc.Snapshot,
+    path: str | Path,
+    limit: int = 200,
+) -> Path:
+    """Write the difference between two snapshots to a text file."""
+    path = Path(path)
+    old_total = sum(stat.size for stat in old.statistics("filename"))
+    new_total = sum(stat.size for stat in new.statistics("filename"))
+    header = [
+        f"Snapshot diff written {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Traced memory: {old_total / 1e6:.2f} MB -> {new_total / 1e6:.2f} MB "
+        f"({(new_total - old_total) / 1e6:+.2f} MB)",
+        "",
+    ]
+    path.write_text(
+        "\n".join(header + diff_snapshots(old, new, limit)) + "\n", encoding="utf-8"
+    )
+    return path
+
+
+def live_instances(base: type) -> list:
+    """Return the live objects that are instances of ``base``.
+
+    This walks every object tracked by the garbage collector and is meant
+    for on-demand diagnostics, not for hot paths. Qt objects are only seen
+    while a Python wrapper for them exists.
+    """
+    return [obj for obj in gc.get_objects() if isinstance(obj, base)]
+
+
+def count_by_class(objects: list) -> Counter[str]:
+    return Counter(type(obj).__name__ for obj in objects)
+
+
+@dataclass(frozen=True)
+class MemorySample:
+    """Memory use and object counts at one point in time."""
+
+    timestamp: float
+    rss_mb: float | None
+    python_mb: float | None
+    objects: int
+    workers: int
+    running_workers: int
+
+    def summary(self) -> str:
+        rss = f"{self.rss_mb:.1f} MB" if self.rss_mb is not None else "n/a"
+        python = f"{self.python_mb:.1f} MB" if self.python_mb is not None else "off"
+        return (
+            f"{time.strftime('%H:%M:%S', time.localtime(self.timestamp))}  "
+            f"RSS {rss}  Python {python}  objects {self.objects}  "
+            f"workers {self.running_workers}/{self.workers} running"
+        )
+
+
+@dataclass
+class MemoryMonitor:
+    """Keep the most recent :class:`MemorySample` objects."""
+
+    max_samples: int = 360
+    samples: deque[MemorySample] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.samples = deque(maxlen=self.max_samples)
+
+    def sample(self, objects: int, workers: int, running_workers: int) -> MemorySample:
+        sample = MemorySample(
+            timestamp=time.time(),
+            rss_mb=process_rss_mb(),
+            python_mb=traced_mb(),
+            objects=objects,
+            workers=workers,
+            running_workers=running_workers,
+        )
+        self.samples.append(sample)
+        return sample